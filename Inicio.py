@@ -1,8 +1,15 @@
 import streamlit as st
 
+from estadistica import precargar
+from rendimiento import iniciar_pagina, mostrar_panel
+
 
 
 st.set_page_config(page_title="Calculadora Estadistica Inferencial")
+# Mientras se lee la portada se importan en segundo plano los módulos que
+# las páginas cargan al primer cálculo (pandas, scipy.optimize, altair)
+precargar()
+iniciar_pagina("inicio")
 
 
 st.title(":green[Aplicación Web Para Cálculo de Estadísticas Inferenciales]",
@@ -15,3 +22,5 @@ st.markdown("*Esta aplicación web esta desarrollada como proyecto final "
          "facilitar el cálculo de diversas medidas estadísticas en un solo lugar.*",
             text_alignment="justify"
          )
+
+mostrar_panel()
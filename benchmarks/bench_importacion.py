@@ -0,0 +1,83 @@
+"""
+Mide el arranque en frío: el tiempo de `import estadistica` en un proceso
+nuevo, los módulos que más tardan (python -X importtime) y los módulos
+diferidos, que no deben cargarse al importar el paquete.
+
+Uso:
+    python benchmarks/bench_importacion.py [repeticiones] [--maximo SEGUNDOS]
+
+Con --maximo termina con código 1 si la mediana supera ese tiempo o si
+algún módulo diferido se importa al arrancar.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from estadistica.precarga import MODULOS_DIFERIDOS  # noqa: E402
+
+# Además de los diferidos, scipy.stats no debe importarse: tarda más de un segundo
+PROHIBIDOS = ("scipy.stats", *MODULOS_DIFERIDOS)
+
+MEDIR = """
+import sys, time
+inicio = time.perf_counter()
+import estadistica
+print(time.perf_counter() - inicio)
+print(",".join(m for m in {prohibidos!r} if m in sys.modules))
+"""
+
+
+def ejecutar(*argumentos):
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ, capture_output=True, text=True, check=True)
+
+
+def medir_arranque():
+    """Segundos de `import estadistica` en un proceso nuevo y módulos prohibidos que quedaron cargados."""
+    salida = ejecutar("-c", MEDIR.format(prohibidos=PROHIBIDOS)).stdout.splitlines()
+    return float(salida[0]), [m for m in salida[1].split(",") if m]
+
+
+def perfil_importacion(cantidad=15):
+    """Los `cantidad` módulos con mayor tiempo acumulado según -X importtime, en segundos."""
+    filas = []
+    for linea in ejecutar("-X", "importtime", "-c", "import estadistica").stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea.split("|")
+        filas.append((int(acumulado) / 1e6, modulo.rstrip()))
+    return sorted(filas, reverse=True)[:cantidad]
+
+
+def main(repeticiones=5, maximo=None):
+    tiempos, cargados = [], set()
+    for _ in range(repeticiones):
+        segundos, prohibidos = medir_arranque()
+        tiempos.append(segundos)
+        cargados.update(prohibidos)
+    mediana = statistics.median(tiempos)
+    print(f"import estadistica: mediana {mediana * 1e3:.0f} ms, mínimo {min(tiempos) * 1e3:.0f} ms "
+          f"({repeticiones} procesos)")
+
+    print(f"\n{'Acumulado':>12}  Módulo")
+    for segundos, modulo in perfil_importacion():
+        print(f"{segundos * 1e3:>9.1f} ms  {modulo}")
+
+    if cargados:
+        print(f"\nMÓDULOS DIFERIDOS CARGADOS AL ARRANCAR: {', '.join(sorted(cargados))}")
+    if maximo is not None and (mediana > maximo or cargados):
+        print(f"\nREGRESIÓN: el límite es {maximo * 1e3:.0f} ms sin módulos diferidos.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("repeticiones", nargs="?", type=int, default=5)
+    parser.add_argument("--maximo", type=float, help="segundos máximos de la mediana")
+    argumentos = parser.parse_args()
+    sys.exit(main(argumentos.repeticiones, argumentos.maximo))
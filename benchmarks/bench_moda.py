@@ -0,0 +1,44 @@
+"""
+Compara el motor de moda (estadistica.moda) con scipy.stats.mode, que es
+lo que usaba mostrar_metrica.
+
+Uso:
+    python benchmarks/bench_moda.py [n]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estadistica.moda import calcular_moda  # noqa: E402
+
+
+def conjuntos(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return {
+        "enteros (0-100)": rng.integers(0, 100, n).astype(np.float64),
+        "discretos (1000 valores)": rng.choice(rng.normal(size=1000), n),
+        "continuos (normal)": rng.normal(size=n),
+    }
+
+
+def medir(funcion, repeticiones=3):
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def main(n=1_000_000):
+    print(f"n = {n:,}")
+    print(f"{'Datos':<26}{'scipy.stats.mode':>18}{'calcular_moda':>16}{'Método':>12}{'Mejora':>9}")
+    for nombre, datos in conjuntos(n).items():
+        t_scipy = medir(lambda: stats.mode(datos))
+        t_motor = medir(lambda: calcular_moda(datos))
+        metodo = calcular_moda(datos)["metodo"]
+        print(f"{nombre:<26}{t_scipy * 1e3:>15.1f} ms{t_motor * 1e3:>13.1f} ms{metodo:>12}{t_scipy / t_motor:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
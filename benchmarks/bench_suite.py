@@ -0,0 +1,445 @@
+"""
+Suite de rendimiento: cada cálculo del núcleo con datos sintéticos de
+varios tamaños, el rerun completo de cada página (con
+streamlit.testing.v1.AppTest, sin navegador) y el arranque en frío.
+
+Los resultados (mediana de varias repeticiones, en segundos, y su
+dispersión relativa) se guardan en JSON y se comparan con la línea base
+guardada en el repositorio: una medición cuya mediana supera la de la base
+en más de la tolerancia del grupo y en más de tres veces la dispersión
+observada cuenta como regresión y el script termina con código 1.
+
+Uso:
+    python benchmarks/bench_suite.py [--perfil rapido|completo] [--solo calculos|archivos|paginas|arranque]
+                                     [--salida resultados.json] [--guardar-base] [--tolerancia 0.3]
+
+El perfil "rapido" usa de 10^3 a 10^6 valores y archivos de 1 y 10 MB; el
+"completo", de 10^3 a 10^8 valores y archivos de 1, 10 y 100 MB (necesita
+varios GB de memoria).
+"""
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+# Las conversiones de los archivos de prueba no se mezclan con las de la aplicación
+DIRECTORIO_TEMPORAL = tempfile.mkdtemp(prefix="bench_estadistica_")
+atexit.register(shutil.rmtree, DIRECTORIO_TEMPORAL, ignore_errors=True)
+os.environ["ESTADISTICA_DIR_COLUMNAR"] = DIRECTORIO_TEMPORAL
+
+import estadistica  # noqa: E402
+from estadistica import (  # noqa: E402
+    cache_desactivada,
+    calcular_metricas,
+    calcular_moda,
+    grilla_tamano_muestra,
+    intervalo_bootstrap,
+    leer_numeros,
+    limpiar_caches,
+    mediana_aproximada,
+    metricas_grupos,
+    prueba_permutacion,
+    prueba_t_media,
+    pruebas_lote,
+    ruta_columnar,
+    simular_potencia,
+    tamano_muestra_potencia,
+)
+from estadistica.archivos import bloques_columna_archivo  # noqa: E402
+from estadistica.columnar import matriz_numerica  # noqa: E402
+from estadistica.streaming import resumir_bloques  # noqa: E402
+
+from bench_importacion import medir_arranque  # noqa: E402
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+
+PERFILES = {
+    "rapido": {"tamanos": (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6), "archivos_mb": (1, 10), "repeticiones": 5},
+    "completo": {"tamanos": tuple(10 ** k for k in range(3, 9)), "archivos_mb": (1, 10, 100), "repeticiones": 3},
+}
+
+# Las diferencias de menos de 10 ms se consideran ruido
+MINIMO_REGRESION = 0.010
+# Los reruns de páginas pasan por Streamlit y varían más entre ejecuciones
+TOLERANCIA_GRUPOS = {"paginas": 0.5}
+# Un cambio menor que esta cantidad de dispersiones relativas no cuenta como regresión
+DISPERSIONES_REGRESION = 3
+
+
+def resumir(tiempos):
+    """Mediana de los tiempos y su dispersión relativa (rango intercuartílico sobre la mediana)."""
+    mediana = statistics.median(tiempos)
+    q1, _, q3 = statistics.quantiles(tiempos, n=4) if len(tiempos) > 1 else (mediana,) * 3
+    return mediana, (q3 - q1) / mediana if mediana > 0 else 0.0
+
+
+def medir(funcion, preparar=None, repeticiones=3):
+    """
+    Mediana y dispersión relativa de `repeticiones` llamadas a
+    funcion(*preparar()); preparar() no se mide.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        argumentos = preparar() if preparar else ()
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append(time.perf_counter() - inicio)
+    return resumir(tiempos)
+
+
+def etiqueta_tamano(n):
+    exponente = int(round(np.log10(n)))
+    return f"10^{exponente}" if 10 ** exponente == n else f"{n:,}"
+
+
+# --- Cálculos puros ---
+
+def _sin_cache(funcion):
+    def llamar(*args, **kwargs):
+        with cache_desactivada():
+            return funcion(*args, **kwargs)
+    return llamar
+
+
+def casos_calculos(n, rng):
+    """(nombre, función, preparar, tamaño máximo) de cada cálculo con n valores."""
+    continuos = rng.normal(50, 10, n)
+    enteros = rng.integers(0, 100, n).astype(np.float64)
+    texto = "\n".join(f"{v:.3f}" for v in continuos[:min(n, 10 ** 7)]) if n <= 10 ** 7 else ""
+    medias = rng.normal(0.1, 1, n)
+    grupos = min(n // 100, 10 ** 5)
+    codigos = rng.integers(0, grupos, n)
+
+    def tabla_lote():
+        import pandas as pd
+
+        return (pd.DataFrame({"media_muestral": medias, "media_h0": 0.0, "desviacion": 1.0, "n": 30.0}),)
+
+    return [
+        # mostrar_metrica (página 1): la página crea el arreglo y la mediana lo reordena
+        ("metricas continuos", lambda d: calcular_metricas.sin_cache(d, "MUESTRAL", sobrescribir=True),
+         lambda: (continuos.copy(),), 10 ** 8),
+        ("metricas enteros", lambda d: calcular_metricas.sin_cache(d, "MUESTRAL", sobrescribir=True),
+         lambda: (enteros.copy(),), 10 ** 8),
+        ("moda enteros", calcular_moda, lambda: (enteros,), 10 ** 8),
+        (f"metricas_grupos ({grupos:,} grupos)", lambda c, d: metricas_grupos(c, d, grupos, "MUESTRAL"),
+         lambda: (codigos, enteros), 10 ** 8),
+        ("mediana aproximada", mediana_aproximada, lambda: (continuos,), 10 ** 8),
+        ("leer_numeros", leer_numeros, lambda: (texto,), 10 ** 7),
+        ("prueba_t_media en lote", _sin_cache(prueba_t_media), lambda: (medias, 0.0, 1.0, 30, 0.05), 10 ** 7),
+        ("pruebas_lote (t)", lambda t: pruebas_lote(t, "media", "t"), tabla_lote, 10 ** 6),
+        ("intervalo_bootstrap BCa", lambda d: intervalo_bootstrap.sin_cache((d,), metodo="bca", remuestras=2_000),
+         lambda: (continuos,), 10 ** 5),
+        ("prueba_permutacion", lambda d: prueba_permutacion.sin_cache((d[:n // 2], d[n // 2:]), permutaciones=2_000,
+                                                                      error_maximo=0),
+         lambda: (continuos,), 10 ** 4),
+    ]
+
+
+def casos_fijos():
+    """Cálculos que no dependen de un tamaño de datos."""
+    return [
+        ("grilla_tamano_muestra 20x5x50x50", _sin_cache(grilla_tamano_muestra),
+         lambda: (np.geomspace(100, 1e6, 20), np.linspace(0.9, 0.99, 5), np.linspace(0.05, 0.95, 50),
+                  np.linspace(0.01, 0.1, 50))),
+        ("tamano_muestra_potencia t 100x100", _sin_cache(tamano_muestra_potencia),
+         lambda: ("dos_medias", np.linspace(0.1, 1, 100)[:, None], np.linspace(0.5, 0.95, 100)[None, :])),
+        ("simular_potencia t 4x20", simular_potencia.sin_cache,
+         lambda: ("media", [10, 20, 50, 100], np.linspace(0, 1, 20), 0.0, 1.0, "normal", "t", 0.05, "bilateral",
+                  2_000)),
+    ]
+
+
+def medir_calculos(perfil):
+    rng = np.random.default_rng(0)
+    resultados = {}
+    for n in perfil["tamanos"]:
+        for nombre, funcion, preparar, maximo in casos_calculos(n, rng):
+            if n <= maximo:
+                resultados[f"calculos/{nombre}/n={etiqueta_tamano(n)}"] = medir(funcion, preparar,
+                                                                               perfil["repeticiones"])
+    for nombre, funcion, preparar in casos_fijos():
+        resultados[f"calculos/{nombre}"] = medir(funcion, preparar, perfil["repeticiones"])
+    return resultados
+
+
+# --- Archivos subidos ---
+
+def csv_sintetico(megabytes, semilla=0):
+    """Contenido (sin encabezado) de un CSV de dos columnas numéricas de unos `megabytes` MB."""
+    filas = megabytes * 1024 ** 2 // 20
+    rng = np.random.default_rng(semilla)
+    datos = np.column_stack((rng.normal(50, 10, filas), rng.lognormal(0, 1, filas)))
+    salida = io.BytesIO()
+    np.savetxt(salida, datos, fmt="%.6f", delimiter=",")
+    return salida.getvalue()
+
+
+def csv_mixto(megabytes):
+    """
+    CSV con encabezado de unos `megabytes` MB cuya columna "entero" recibe
+    un decimal en la última fila (cambia de tipo después del primer bloque
+    que lee Arrow) y con una columna de fechas, que no es numérica.
+    """
+    filas = megabytes * 1024 ** 2 // 20
+    enteros = np.arange(filas) % 1000
+    cuerpo = "\n".join(f"{e},{e / 7:.4f},2024-01-{e % 28 + 1:02d}" for e in enteros)
+    return f"entero,real,fecha\n{cuerpo}\n1.5,0.5,2024-02-01\n".encode("ascii")
+
+
+class _Subido(io.BytesIO):
+    """Imita el UploadedFile de Streamlit: BytesIO con nombre."""
+
+    def __init__(self, contenido, nombre="datos.csv"):
+        super().__init__(contenido)
+        self.name = nombre
+
+
+def _con_encabezado(cuerpo, repeticion):
+    # Un encabezado distinto cambia la huella y obliga a convertir de nuevo
+    return _Subido(f"x{repeticion},y\n".encode("ascii") + cuerpo)
+
+
+def medir_archivos(perfil):
+    resultados = {}
+    for megabytes in perfil["archivos_mb"]:
+        cuerpo = csv_sintetico(megabytes)
+        repeticion = iter(range(10 ** 6))
+
+        def nuevo():
+            return (_con_encabezado(cuerpo, next(repeticion)),)
+
+        resultados[f"archivos/conversion csv/{megabytes} MB"] = medir(ruta_columnar, nuevo, perfil["repeticiones"])
+        convertido = _con_encabezado(cuerpo, "caliente")
+        ruta_columnar(convertido)
+        resultados[f"archivos/resumen columna/{megabytes} MB"] = medir(
+            lambda: resumir_bloques(bloques_columna_archivo(convertido, "y")), repeticiones=perfil["repeticiones"])
+
+        # Un tipo que cambia a mitad del archivo no debe convertir las columnas numéricas en texto
+        mixto = csv_mixto(megabytes)
+        resultados[f"archivos/conversion csv mixto/{megabytes} MB"] = medir(
+            ruta_columnar, lambda: (_Subido(mixto.replace(b"entero", f"e{next(repeticion)}".encode("ascii"), 1)),),
+            perfil["repeticiones"])
+        nombres, _ = matriz_numerica(ruta_columnar(_Subido(mixto)))
+        if nombres != ["entero", "real"]:
+            raise RuntimeError(f"El CSV mixto de {megabytes} MB quedó con las columnas numéricas {nombres}.")
+    return resultados
+
+
+# --- Páginas ---
+
+def _pagina(nombre):
+    return os.path.join(RAIZ, "pages", nombre) if nombre != "Inicio.py" else os.path.join(RAIZ, nombre)
+
+
+def _con_archivo(pagina, ruta_csv):
+    """Script que reemplaza st.file_uploader por el CSV de `ruta_csv` y ejecuta la página."""
+    return f"""
+import io
+import streamlit as st
+archivo = io.BytesIO(open({ruta_csv!r}, "rb").read())
+archivo.name = "datos.csv"
+st.file_uploader = lambda *args, **kwargs: archivo
+exec(compile(open({_pagina(pagina)!r}, encoding="utf-8").read(), {pagina!r}, "exec"), {{"__name__": "__main__"}})
+"""
+
+
+def _correr(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"La página lanzó una excepción: {at.exception[0].value}")
+    return at
+
+
+def casos_paginas(perfil):
+    from streamlit.testing.v1 import AppTest
+
+    def cargar(nombre):
+        return lambda: _correr(AppTest.from_file(_pagina(nombre), default_timeout=600))
+
+    # paginas[k] es la página k
+    paginas = ["Inicio.py"] + sorted(n for n in os.listdir(os.path.join(RAIZ, "pages")) if n.endswith(".py"))
+    casos = [(f"paginas/carga/{nombre[:-3]}", cargar(nombre), None) for nombre in paginas]
+
+    def muestral(texto):
+        def interaccion():
+            at = _correr(AppTest.from_file(_pagina(paginas[1]), default_timeout=600))
+            at.text_area(key="input_muestral").set_value(texto)
+            at.button(key="btn_muestral").click()
+            _correr(at)
+        return interaccion
+
+    rng = np.random.default_rng(0)
+    for n in perfil["tamanos"]:
+        if n <= 10 ** 5:
+            texto = ", ".join(f"{v:.2f}" for v in rng.normal(50, 10, n))
+            casos.append((f"paginas/1 datos muestrales/n={etiqueta_tamano(n)}", muestral(texto), None))
+
+    def prueba_media():
+        at = _correr(AppTest.from_file(_pagina(paginas[8]), default_timeout=600))
+        at.button(key="btn_media").click()
+        _correr(at)
+
+    casos.append(("paginas/8 prueba para la media", prueba_media, None))
+
+    ruta = os.path.join(DIRECTORIO_TEMPORAL, "subido.csv")
+
+    def subir(cuerpo, repeticion):
+        # Cada repetición sube un archivo nuevo: se mide también la huella y la conversión
+        def preparar():
+            with open(ruta, "wb") as salida:
+                salida.write(_con_encabezado(cuerpo, next(repeticion)).getvalue())
+            return ()
+        return preparar
+
+    for megabytes in perfil["archivos_mb"]:
+        cuerpo = csv_sintetico(megabytes)
+        for pagina, boton in ((paginas[1], "btn_archivo"), (paginas[8], "btn_datos")):
+            def con_archivo(pagina=pagina, boton=boton):
+                at = _correr(AppTest.from_string(_con_archivo(pagina, ruta), default_timeout=600))
+                at.button(key=boton).click()
+                _correr(at)
+            casos.append((f"paginas/{pagina[0]} archivo/{megabytes} MB", con_archivo,
+                          subir(cuerpo, iter(range(10 ** 6)))))
+    return casos
+
+
+def medir_paginas(perfil):
+    warnings.filterwarnings("ignore")
+    # Las páginas llaman a precargar(); se espera a que termine para no medir
+    # las importaciones del hilo de fondo
+    hilo = estadistica.precargar()
+    if hilo is not None:
+        hilo.join()
+    resultados = {}
+    for nombre, interaccion, preparar in casos_paginas(perfil):
+        def antes(preparar=preparar):
+            # Las cachés se vacían para medir el cálculo y no un acierto
+            limpiar_caches()
+            return preparar() if preparar else ()
+        resultados[nombre] = medir(interaccion, antes, perfil["repeticiones"])
+    return resultados
+
+
+def medir_arranque_frio(perfil):
+    return {"arranque/import estadistica": resumir([medir_arranque()[0] for _ in range(perfil["repeticiones"])])}
+
+
+GRUPOS = {
+    "arranque": medir_arranque_frio,
+    "calculos": medir_calculos,
+    "archivos": medir_archivos,
+    "paginas": medir_paginas,
+}
+
+
+# --- Línea base ---
+
+def entorno():
+    import pandas
+    import scipy
+    import streamlit
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "pandas": pandas.__version__,
+        "streamlit": streamlit.__version__,
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": estadistica.procesos_disponibles(),
+    }
+
+
+def umbral_regresion(nombre, tolerancia, dispersiones):
+    """Aumento relativo de la mediana a partir del cual `nombre` cuenta como regresión."""
+    grupo = nombre.split("/", 1)[0]
+    return max(tolerancia, TOLERANCIA_GRUPOS.get(grupo, 0.0), DISPERSIONES_REGRESION * max(dispersiones))
+
+
+def comparar(actual, base, tolerancia, dispersion=None, dispersion_base=None):
+    """Imprime la comparación con la línea base y devuelve los nombres con regresión."""
+    dispersion, dispersion_base = dispersion or {}, dispersion_base or {}
+    regresiones = []
+    print(f"\n{'Medición':<58}{'Base':>11}{'Actual':>11}{'Cambio':>9}")
+    for nombre, segundos in actual.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            print(f"{nombre:<58}{'—':>11}{segundos * 1e3:>8.1f} ms")
+            continue
+        cambio = segundos / anterior - 1
+        umbral = umbral_regresion(nombre, tolerancia, (dispersion.get(nombre, 0.0), dispersion_base.get(nombre, 0.0)))
+        regresion = cambio > umbral and segundos - anterior > MINIMO_REGRESION
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"{nombre:<58}{anterior * 1e3:>8.1f} ms{segundos * 1e3:>8.1f} ms{cambio:>+8.0%}{marca}")
+        if regresion:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de la aplicación.")
+    parser.add_argument("--perfil", choices=PERFILES, default="rapido")
+    parser.add_argument("--solo", choices=GRUPOS, action="append", help="grupos a medir (por defecto, todos)")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--base", default=LINEA_BASE, help="línea base con la que comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="reemplaza la línea base con esta medición")
+    parser.add_argument("--tolerancia", type=float, default=0.3,
+                        help="aumento relativo de la mediana que cuenta como regresión (páginas: al menos 0.5)")
+    argumentos = parser.parse_args()
+
+    perfil = PERFILES[argumentos.perfil]
+    mediciones = {}
+    for grupo in argumentos.solo or GRUPOS:
+        print(f"Midiendo {grupo}...", flush=True)
+        mediciones.update(GRUPOS[grupo](perfil))
+    resultados = {nombre: mediana for nombre, (mediana, _) in mediciones.items()}
+    dispersion = {nombre: round(relativa, 4) for nombre, (_, relativa) in mediciones.items()}
+    informe = {"perfil": argumentos.perfil, "fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "entorno": entorno(),
+               "resultados": resultados, "dispersion": dispersion}
+
+    if argumentos.salida:
+        with open(argumentos.salida, "w", encoding="utf-8") as salida:
+            json.dump(informe, salida, indent=2, ensure_ascii=False)
+    if argumentos.guardar_base:
+        base = {}
+        if os.path.exists(argumentos.base):
+            with open(argumentos.base, encoding="utf-8") as entrada:
+                base = json.load(entrada)
+        # Cada perfil tiene su propia línea base
+        base[argumentos.perfil] = informe
+        with open(argumentos.base, "w", encoding="utf-8") as salida:
+            json.dump(base, salida, indent=2, ensure_ascii=False)
+            salida.write("\n")
+        print(f"Línea base del perfil {argumentos.perfil} guardada en {argumentos.base}.")
+        return 0
+
+    base = {}
+    if os.path.exists(argumentos.base):
+        with open(argumentos.base, encoding="utf-8") as entrada:
+            base = json.load(entrada).get(argumentos.perfil, {})
+    if base.get("entorno") and base["entorno"] != informe["entorno"]:
+        print(f"AVISO: la línea base se midió en otro entorno: {base['entorno']}")
+    regresiones = comparar(resultados, base.get("resultados", {}), argumentos.tolerancia, dispersion,
+                           base.get("dispersion", {}))
+    if regresiones:
+        print(f"\n{len(regresiones)} REGRESIONES (más de {argumentos.tolerancia:.0%} sobre la línea base "
+              f"y más que el ruido de las repeticiones).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
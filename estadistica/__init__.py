@@ -0,0 +1,133 @@
+"""
+Núcleo de cálculo de la aplicación de Estadística Inferencial.
+
+Contiene la lógica que no depende de Streamlit para que las páginas puedan
+reutilizarla.
+"""
+from .streaming import (
+    AcumuladorMomentos,
+    ContadorFrecuencias,
+    ResumenDescriptivo,
+    SketchCuantiles,
+    SumasSuficientes,
+    bloques_archivo,
+    resumir_archivo,
+    resumir_bloques,
+    sumar_bloques,
+)
+from .archivos import (
+    EXTENSIONES,
+    columnas_archivo,
+    huella_archivo,
+    leer_columna_archivo,
+    leer_columnas_archivo,
+    leer_tabla_archivo,
+    mediana_exacta_columna,
+    metricas_por_grupo,
+    metricas_todas_columnas,
+    resumen_columna,
+    ruta_columnar,
+    sumas_columna,
+    sumas_diferencias,
+    vista_previa,
+)
+from .cache import CacheLRU, cache_desactivada, info_caches, limpiar_caches, memoizar
+from .texto import DECIMALES, leer_numeros, resumen_invalidos
+from .moda import METODOS as METODOS_MODA, calcular_moda
+from .mediana import (
+    METODOS as METODOS_MEDIANA,
+    calcular_mediana,
+    mediana_aproximada,
+    mediana_exacta,
+    sketch_mediana,
+)
+from .descriptiva import calcular_metricas, metricas_columnas, metricas_grupos
+from .agrupados import metricas_frecuencias, metricas_intervalos
+from .conjuntos import AlmacenConjuntos, agregar_archivo, almacen_conjuntos
+from .inferencia import (
+    COLAS,
+    GL_TABLA,
+    NIVELES_COMUNES,
+    NIVELES_CONFIANZA,
+    cola_desde_etiqueta,
+    critico_normal,
+    critico_t,
+    critico_z,
+    error_estandar_diferencia_medias,
+    error_estandar_diferencia_proporciones,
+    error_estandar_media,
+    error_estandar_proporcion,
+    etiqueta_nivel,
+    grilla_tamano_muestra,
+    intervalo_diferencia_medias,
+    intervalo_diferencia_proporciones,
+    intervalo_media,
+    intervalo_proporcion,
+    nivel_desde_etiqueta,
+    probabilidad_acumulada,
+    prueba_dos_medias,
+    prueba_media,
+    prueba_proporcion,
+    prueba_t_dos_medias,
+    prueba_t_media,
+    tamano_muestra_finita,
+    tabla_criticos,
+    tamano_muestra_infinita,
+    valor_p_normal,
+    valor_p_t,
+    valor_t,
+    valor_z,
+    z_desde_probabilidad,
+)
+from .lotes import (
+    COLUMNAS_LOTE,
+    CORRECCIONES,
+    corregir_p_valores,
+    normalizar_colas,
+    pruebas_lote,
+)
+from .muestras import (
+    prueba_dos_muestras,
+    prueba_pareada,
+    prueba_proporcion_muestra,
+    prueba_una_muestra,
+)
+from .bootstrap import (
+    METODOS as METODOS_BOOTSTRAP,
+    REMUESTRAS_POR_DEFECTO,
+    intervalo_bootstrap,
+    remuestrear,
+)
+from .paralelo import procesos_disponibles
+from .permutaciones import (
+    ERROR_POR_DEFECTO as ERROR_PERMUTACION,
+    PERMUTACIONES_POR_DEFECTO,
+    prueba_permutacion,
+)
+from .simulacion import (
+    DISTRIBUCIONES as DISTRIBUCIONES_SIMULACION,
+    ESCENARIOS as ESCENARIOS_SIMULACION,
+    simular_cobertura,
+    simular_potencia,
+)
+from .potencia import (
+    ESCENARIOS as ESCENARIOS_POTENCIA,
+    efecto_minimo_detectable,
+    potencia_prueba,
+    tamano_muestra_potencia,
+)
+from .instrumentacion import (
+    RegistroTiempos,
+    activar_sesion,
+    contar,
+    instantanea,
+    medir,
+    memoria_actual,
+    memoria_maxima,
+    registrar,
+    registro as registro_tiempos,
+    sesion_activa,
+    texto_prometheus,
+)
+from .precarga import MODULOS_DIFERIDOS, precargar, tiempos_precarga
+from .resultados import AlmacenResultados, almacen as almacen_resultados, resultado_sesion
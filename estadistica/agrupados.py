@@ -0,0 +1,125 @@
+"""
+Medidas de tendencia central y dispersión desde tablas de frecuencias.
+
+Dos formatos de datos ya agregados:
+
+- Pares (valor, frecuencia): las métricas son exactas, las mismas que con
+  los datos expandidos fila por fila.
+- Intervalos de clase (límite inferior, límite superior, frecuencia): la
+  media y la varianza usan la marca de clase y la mediana y la moda las
+  fórmulas de datos agrupados (interpolación dentro de la clase).
+
+Todo se calcula sobre las k filas de la tabla, en O(k log k), sin expandir
+los datos: la memoria depende del número de grupos y no de la suma de las
+frecuencias.
+"""
+import numpy as np
+
+from .cache import memoizar
+
+
+def _columnas(frecuencias, *columnas):
+    frecuencias = np.asarray(frecuencias, dtype=np.float64).ravel()
+    columnas = [np.asarray(c, dtype=np.float64).ravel() for c in columnas]
+    if any(c.size != frecuencias.size for c in columnas):
+        raise ValueError("Las columnas de la tabla deben tener la misma cantidad de filas.")
+    if not all(np.isfinite(c).all() for c in (frecuencias, *columnas)):
+        raise ValueError("La tabla tiene celdas vacías, no numéricas o infinitas.")
+    if (frecuencias < 0).any():
+        raise ValueError("Las frecuencias no pueden ser negativas.")
+    if frecuencias.sum() <= 0:
+        raise ValueError("La suma de las frecuencias debe ser mayor que cero.")
+    return frecuencias, columnas
+
+
+def _total(frecuencias):
+    # Con frecuencias enteras n se informa como entero, igual que con los datos crudos
+    n = float(frecuencias.sum())
+    return int(n) if np.array_equal(frecuencias, np.floor(frecuencias)) and n < 2 ** 53 else n
+
+
+def _metricas(valores, frecuencias, tipo, mediana, modas, metodo, ancho_clase=None):
+    n = _total(frecuencias)
+    ddof_val = 1 if tipo == "MUESTRAL" else 0
+    media = float(np.dot(frecuencias, valores) / n)
+    m2 = float(np.dot(frecuencias, np.square(valores - media)))
+    varianza = m2 / (n - ddof_val) if n - ddof_val > 0 else np.nan
+    return {
+        "n": n,
+        "media": media,
+        "mediana": float(mediana),
+        "metodo_mediana": metodo,
+        "error_mediana": 0.0,
+        "moda": float(modas[0]),
+        "modas": modas,
+        "metodo_moda": metodo,
+        "ancho_clase": ancho_clase,
+        "varianza": varianza,
+        "desviacion_estandar": float(np.sqrt(varianza)),
+    }
+
+
+@memoizar(maxsize=64)
+def metricas_frecuencias(valores, frecuencias, tipo):
+    """
+    Las métricas de calcular_metricas para una tabla de pares (valor,
+    frecuencia). Los valores repetidos en la tabla se suman en un solo
+    grupo. Las frecuencias pueden no ser enteras (pesos); la varianza
+    muestral divide entre la suma de las frecuencias menos uno.
+    """
+    frecuencias, (valores,) = _columnas(frecuencias, valores)
+    valores, grupo = np.unique(valores, return_inverse=True)
+    frecuencias = np.bincount(grupo, weights=frecuencias, minlength=valores.size)
+
+    # Primer grupo que acumula la mitad del total; si la acumula justo, la
+    # mediana de los datos expandidos es el promedio con el grupo siguiente
+    acumuladas = np.cumsum(frecuencias)
+    mitad = acumuladas[-1] / 2
+    i = int(np.searchsorted(acumuladas, mitad))
+    siguiente = int(np.searchsorted(acumuladas, mitad, side="right"))
+    mediana = (valores[i] + valores[siguiente]) / 2 if acumuladas[i] == mitad else valores[i]
+
+    modas = valores[frecuencias == frecuencias.max()]
+    return _metricas(valores, frecuencias, tipo, mediana, modas, "frecuencias")
+
+
+@memoizar(maxsize=64)
+def metricas_intervalos(inferiores, superiores, frecuencias, tipo):
+    """
+    Las métricas de calcular_metricas para una tabla de intervalos de clase.
+
+    - Media y varianza con la marca de clase (punto medio) de cada intervalo.
+    - Mediana: L + (n/2 - F) / f · h en la clase que acumula la mitad del
+      total (F es la frecuencia acumulada anterior y h el ancho).
+    - Moda: L + d₁ / (d₁ + d₂) · h en la clase de mayor frecuencia, con d₁ y
+      d₂ sus diferencias con la clase anterior y la siguiente. Si varias
+      clases empatan se devuelven todas las modas.
+    """
+    frecuencias, (inferiores, superiores) = _columnas(frecuencias, inferiores, superiores)
+    if (superiores <= inferiores).any():
+        raise ValueError("Cada límite superior debe ser mayor que su límite inferior.")
+    orden = np.argsort(inferiores, kind="stable")
+    inferiores, superiores, frecuencias = inferiores[orden], superiores[orden], frecuencias[orden]
+    if (inferiores[1:] < superiores[:-1]).any():
+        raise ValueError("Los intervalos de clase no pueden superponerse.")
+    anchos = superiores - inferiores
+
+    acumuladas = np.cumsum(frecuencias)
+    mitad = acumuladas[-1] / 2
+    # La primera clase que llega a la mitad siempre tiene frecuencia positiva
+    i = int(np.searchsorted(acumuladas, mitad))
+    anterior = acumuladas[i] - frecuencias[i]
+    mediana = inferiores[i] + (mitad - anterior) / frecuencias[i] * anchos[i]
+
+    # Fuera de la tabla la frecuencia es cero
+    vecinas = np.concatenate(([0.0], frecuencias, [0.0]))
+    modales = np.flatnonzero(frecuencias == frecuencias.max())
+    d1 = frecuencias[modales] - vecinas[modales]
+    d2 = frecuencias[modales] - vecinas[modales + 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        proporcion = np.where(d1 + d2 > 0, d1 / (d1 + d2), 0.5)
+    # Dos clases modales contiguas dan la misma moda en el límite que comparten
+    modas = np.unique(inferiores[modales] + proporcion * anchos[modales])
+
+    ancho_clase = float(anchos[0]) if np.allclose(anchos, anchos[0]) else None
+    return _metricas((inferiores + superiores) / 2, frecuencias, tipo, mediana, modas, "agrupada", ancho_clase)
@@ -0,0 +1,342 @@
+"""
+API HTTP/JSON (ASGI) sobre las mismas funciones que usan las páginas.
+
+Rutas:
+
+- GET  /salud: comprobación de vida.
+- GET  /operaciones: operaciones disponibles con sus parámetros.
+- POST /operaciones/<nombre>: el cuerpo es un objeto JSON con los
+  argumentos de la función; responde {"resultado": ...}.
+- POST /lote: {"llamadas": [{"operacion": ..., "argumentos": {...}}, ...]};
+  responde {"resultados": [...]} en el mismo orden, con {"error": ...} en
+  las llamadas que fallan.
+- GET  /caches: aciertos y fallos de las cachés del proceso.
+- GET  /metricas: tiempos por operación, memoria y cachés en el formato de
+  texto de Prometheus.
+
+Las listas JSON llegan a las funciones como arreglos de NumPy, así que una
+sola llamada evalúa un lote completo con broadcasting (los null pasan a
+NaN); en las respuestas, NaN e infinito salen como null.
+
+Cada respuesta se guarda ya serializada en una caché LRU acotada por bytes
+con la clave de la operación y sus argumentos. Las funciones se evalúan con
+las cachés de memoizar desactivadas, para que los lotes grandes no las
+llenen. Las operaciones pesadas (bootstrap, permutaciones, simulaciones,
+grillas) y las llamadas con muchos valores se ejecutan en un grupo de
+hilos, fuera del bucle de eventos; los motores de remuestreo siguen
+repartiendo el trabajo grande entre procesos.
+
+No depende de ningún framework. Para servirla:
+
+    python -m estadistica.api --puerto 8000
+
+(usa uvicorn) o con cualquier servidor ASGI: `uvicorn estadistica.api:app`.
+"""
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import agrupados, bootstrap, inferencia, lotes, permutaciones, potencia, simulacion
+from .cache import CacheLRU, cache_desactivada, info_caches, registrar_cache
+from .instrumentacion import medir, texto_prometheus
+from .paralelo import procesos_disponibles
+from .precarga import precargar
+
+MAX_BYTES_RESPUESTAS = int(os.environ.get("ESTADISTICA_API_CACHE_MB", "64")) * 1024 ** 2
+MAX_BYTES_CUERPO = int(os.environ.get("ESTADISTICA_API_CUERPO_MB", "32")) * 1024 ** 2
+HILOS = int(os.environ.get("ESTADISTICA_API_HILOS", "0")) or procesos_disponibles()
+MAXIMO_LLAMADAS_LOTE = 10_000
+# Llamadas con más valores que esto no se evalúan en el bucle de eventos
+MAXIMO_EN_LINEA = 10_000
+
+_LIGERAS = (
+    inferencia.valor_z,
+    inferencia.probabilidad_acumulada,
+    inferencia.z_desde_probabilidad,
+    inferencia.valor_t,
+    inferencia.critico_z,
+    inferencia.critico_t,
+    inferencia.critico_normal,
+    inferencia.error_estandar_media,
+    inferencia.error_estandar_proporcion,
+    inferencia.error_estandar_diferencia_medias,
+    inferencia.error_estandar_diferencia_proporciones,
+    inferencia.intervalo_media,
+    inferencia.intervalo_proporcion,
+    inferencia.intervalo_diferencia_medias,
+    inferencia.intervalo_diferencia_proporciones,
+    inferencia.tamano_muestra_finita,
+    inferencia.tamano_muestra_infinita,
+    inferencia.valor_p_normal,
+    inferencia.valor_p_t,
+    inferencia.prueba_media,
+    inferencia.prueba_proporcion,
+    inferencia.prueba_dos_medias,
+    inferencia.prueba_t_media,
+    inferencia.prueba_t_dos_medias,
+    lotes.corregir_p_valores,
+    potencia.potencia_prueba,
+    potencia.tamano_muestra_potencia,
+    potencia.efecto_minimo_detectable,
+    agrupados.metricas_frecuencias,
+    agrupados.metricas_intervalos,
+)
+_PESADAS = (
+    inferencia.grilla_tamano_muestra,
+    bootstrap.intervalo_bootstrap,
+    permutaciones.prueba_permutacion,
+    simulacion.simular_potencia,
+    simulacion.simular_cobertura,
+)
+# Nombre de la operación -> (función, se ejecuta siempre en el grupo de hilos)
+OPERACIONES = {f.__name__: (f, False) for f in _LIGERAS} | {f.__name__: (f, True) for f in _PESADAS}
+
+_respuestas = registrar_cache("estadistica.api", CacheLRU(maxsize=100_000, max_bytes=MAX_BYTES_RESPUESTAS,
+                                                          medir=len))
+_hilos = None
+
+
+class ErrorSolicitud(Exception):
+    """Solicitud inválida; se responde con `estado` y el mensaje en JSON."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# --- Conversión entre JSON y NumPy ---
+
+def _argumento(valor):
+    """Listas JSON a arreglos (tuplas de arreglos si las filas tienen largos distintos)."""
+    if not isinstance(valor, list):
+        return valor
+    try:
+        arreglo = np.asarray(valor)
+    except ValueError:
+        return tuple(_argumento(v) for v in valor)
+    if arreglo.dtype == object:
+        # null dentro de una lista de números
+        try:
+            arreglo = arreglo.astype(np.float64)
+        except (TypeError, ValueError):
+            return tuple(_argumento(v) for v in valor)
+    return arreglo
+
+
+def _a_json(valor):
+    if isinstance(valor, dict):
+        return {str(k): _a_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_a_json(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind == "f" and not np.isfinite(valor).all():
+            valor = np.where(np.isfinite(valor), valor.astype(object), None)
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def _serializar(valor):
+    return json.dumps(valor, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _clave(nombre, argumentos):
+    """Clave de la caché de respuestas: no depende del orden de los argumentos en el JSON."""
+    texto = json.dumps([nombre, argumentos], sort_keys=True)
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).digest()
+
+
+def _valores(argumentos):
+    return sum(np.size(v) if isinstance(v, np.ndarray) else 1 for v in argumentos.values())
+
+
+# --- Evaluación ---
+
+def _grupo_hilos():
+    global _hilos
+    if _hilos is None:
+        _hilos = ThreadPoolExecutor(max_workers=HILOS, thread_name_prefix="estadistica-api")
+    return _hilos
+
+
+def _evaluar(funcion, argumentos):
+    """Resultado de la función serializado en JSON (bytes)."""
+    with cache_desactivada():
+        resultado = funcion(**argumentos)
+    return _serializar(_a_json(resultado))
+
+
+async def ejecutar(nombre, argumentos):
+    """
+    Resultado (JSON en bytes) de la operación `nombre` con los argumentos de
+    un objeto JSON ya decodificado. Lanza ErrorSolicitud si la operación no
+    existe o los argumentos no son válidos.
+    """
+    if not isinstance(nombre, str):
+        raise ErrorSolicitud(400, "La operación debe ser un texto.")
+    if nombre not in OPERACIONES:
+        raise ErrorSolicitud(404, f"Operación desconocida: {nombre}")
+    if not isinstance(argumentos, dict):
+        raise ErrorSolicitud(400, "Los argumentos deben ser un objeto JSON.")
+    funcion, pesada = OPERACIONES[nombre]
+    clave = _clave(nombre, argumentos)
+    cuerpo = _respuestas.consultar(clave)
+    if cuerpo is not None:
+        return cuerpo
+
+    argumentos = {k: _argumento(v) for k, v in argumentos.items()}
+    try:
+        # Se mide la latencia completa, incluida la espera en el grupo de hilos
+        with medir(nombre, pagina="api"):
+            if pesada or _valores(argumentos) > MAXIMO_EN_LINEA:
+                cuerpo = await asyncio.get_running_loop().run_in_executor(_grupo_hilos(), _evaluar, funcion,
+                                                                           argumentos)
+            else:
+                cuerpo = _evaluar(funcion, argumentos)
+    except (TypeError, ValueError) as e:
+        raise ErrorSolicitud(422, str(e)) from None
+    _respuestas.guardar(clave, cuerpo)
+    return cuerpo
+
+
+def _error(mensaje):
+    return _serializar({"error": mensaje})
+
+
+async def _lote(solicitud):
+    llamadas = solicitud.get("llamadas") if isinstance(solicitud, dict) else None
+    if not isinstance(llamadas, list):
+        raise ErrorSolicitud(400, 'Se esperaba {"llamadas": [...]}.')
+    if len(llamadas) > MAXIMO_LLAMADAS_LOTE:
+        raise ErrorSolicitud(413, f"El lote tiene {len(llamadas):,} llamadas; el máximo es {MAXIMO_LLAMADAS_LOTE:,}.")
+
+    async def una(llamada):
+        try:
+            if not isinstance(llamada, dict):
+                raise ErrorSolicitud(400, "Cada llamada debe ser un objeto JSON.")
+            return b'{"resultado":' + await ejecutar(llamada.get("operacion"), llamada.get("argumentos", {})) + b"}"
+        except ErrorSolicitud as e:
+            return _error(str(e))
+
+    partes = await asyncio.gather(*(una(llamada) for llamada in llamadas))
+    return b'{"resultados":[' + b",".join(partes) + b"]}"
+
+
+def _descripcion_operaciones():
+    return {
+        nombre: {
+            "parametros": list(inspect.signature(funcion).parameters),
+            "pesada": pesada,
+            "descripcion": (inspect.getdoc(funcion) or "").split("\n\n")[0].replace("\n", " "),
+        }
+        for nombre, (funcion, pesada) in OPERACIONES.items()
+    }
+
+
+# --- Protocolo ASGI ---
+
+async def _leer_cuerpo(receive):
+    partes, total = [], 0
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "http.disconnect":
+            raise ErrorSolicitud(400, "La conexión se cerró antes de recibir el cuerpo.")
+        total += len(mensaje.get("body", b""))
+        if total > MAX_BYTES_CUERPO:
+            raise ErrorSolicitud(413, f"El cuerpo supera {MAX_BYTES_CUERPO // 1024 ** 2} MB.")
+        partes.append(mensaje.get("body", b""))
+        if not mensaje.get("more_body", False):
+            return b"".join(partes)
+
+
+async def _leer_json(receive):
+    try:
+        return json.loads(await _leer_cuerpo(receive) or b"{}")
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ErrorSolicitud(400, "El cuerpo no es JSON válido.") from None
+
+
+class _Texto(bytes):
+    """Cuerpo de una respuesta en texto plano (formato de Prometheus) en lugar de JSON."""
+
+
+async def _responder(send, estado, cuerpo):
+    tipo = b"text/plain; version=0.0.4" if isinstance(cuerpo, _Texto) else b"application/json"
+    await send({
+        "type": "http.response.start",
+        "status": estado,
+        "headers": [(b"content-type", tipo + b"; charset=utf-8"),
+                    (b"content-length", str(len(cuerpo)).encode("ascii"))],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+async def _vida(receive, send):
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "lifespan.startup":
+            precargar()
+            await send({"type": "lifespan.startup.complete"})
+        elif mensaje["type"] == "lifespan.shutdown":
+            if _hilos is not None:
+                _hilos.shutdown(wait=False, cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _despachar(metodo, ruta, receive):
+    if ruta == "/salud" and metodo == "GET":
+        return _serializar({"estado": "ok"})
+    if ruta == "/operaciones" and metodo == "GET":
+        return _serializar(_descripcion_operaciones())
+    if ruta == "/caches" and metodo == "GET":
+        return _serializar(info_caches())
+    if ruta == "/metricas" and metodo == "GET":
+        return _Texto(texto_prometheus().encode("utf-8"))
+    if ruta.startswith("/operaciones/") and metodo == "POST":
+        return b'{"resultado":' + await ejecutar(ruta.removeprefix("/operaciones/"), await _leer_json(receive)) + b"}"
+    if ruta == "/lote" and metodo == "POST":
+        return await _lote(await _leer_json(receive))
+    if ruta in ("/salud", "/operaciones", "/caches", "/metricas", "/lote") or ruta.startswith("/operaciones/"):
+        raise ErrorSolicitud(405, f"Método no permitido: {metodo}")
+    raise ErrorSolicitud(404, f"Ruta desconocida: {ruta}")
+
+
+async def app(scope, receive, send):
+    """Aplicación ASGI."""
+    if scope["type"] == "lifespan":
+        await _vida(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    try:
+        cuerpo = await _despachar(scope["method"], scope["path"].rstrip("/") or "/", receive)
+        await _responder(send, 200, cuerpo)
+    except ErrorSolicitud as e:
+        await _responder(send, e.estado, _error(str(e)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sirve la API de estadística con uvicorn.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    argumentos = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Se necesita uvicorn (pip install uvicorn) u otro servidor ASGI.") from None
+    uvicorn.run(app, host=argumentos.host, port=argumentos.puerto)
+
+
+if __name__ == "__main__":
+    main()
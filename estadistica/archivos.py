@@ -0,0 +1,229 @@
+"""
+Lectura de los archivos subidos con caché por contenido.
+
+El archivo se identifica por el hash de sus bytes y se convierte una sola
+vez a Arrow IPC en disco (ver columnar.py), así que cambiar de columna o de
+tipo de cálculo (o subir el mismo archivo desde otra sesión) no vuelve a
+leerlo. Las conversiones se acotan por espacio en disco y se elimina primero
+la usada hace más tiempo.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from . import columnar
+from .cache import CacheLRU, registrar_cache
+from .descriptiva import metricas_columnas, metricas_grupos
+from .mediana import mediana_exacta
+from .streaming import resumir_bloques, sumar_bloques
+
+EXTENSIONES = columnar.EXTENSIONES
+
+DIRECTORIO_COLUMNAR = os.environ.get(
+    "ESTADISTICA_DIR_COLUMNAR", os.path.join(tempfile.gettempdir(), "estadistica_columnar")
+)
+MAX_BYTES_DISCO = int(os.environ.get("ESTADISTICA_CACHE_DISCO_MB", "2048")) * 1024 ** 2
+
+
+def _eliminar(ruta):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+_cache_columnar = registrar_cache(
+    "estadistica.archivos.columnar",
+    CacheLRU(maxsize=64, max_bytes=MAX_BYTES_DISCO, medir=os.path.getsize, al_descartar=_eliminar),
+)
+_cache_resumenes = registrar_cache("estadistica.archivos.resumenes", CacheLRU(maxsize=256))
+_cache_huellas = CacheLRU(maxsize=256)
+
+
+_existentes_registrados = False
+
+
+def _registrar_existentes():
+    # Conversiones hechas por un proceso anterior: se reutilizan en orden de
+    # antigüedad. Se buscan en la primera conversión y no al importar, y un
+    # archivo que otro proceso borra a mitad de la búsqueda se omite.
+    global _existentes_registrados
+    if _existentes_registrados:
+        return
+    _existentes_registrados = True
+    try:
+        nombres = os.listdir(DIRECTORIO_COLUMNAR)
+    except OSError:
+        return
+    fechas = {}
+    for nombre in nombres:
+        if nombre.endswith(".arrow"):
+            ruta = os.path.join(DIRECTORIO_COLUMNAR, nombre)
+            try:
+                fechas[ruta] = os.path.getmtime(ruta)
+            except OSError:
+                continue
+    for ruta in sorted(fechas, key=fechas.get):
+        try:
+            _cache_columnar.guardar(os.path.basename(ruta)[:-len(".arrow")], ruta)
+        except OSError:
+            continue
+
+
+def huella_archivo(archivo):
+    """
+    Hash BLAKE2 del contenido del archivo subido. Los UploadedFile de
+    Streamlit conservan su file_id entre reruns, así que el hash se calcula
+    una sola vez por subida.
+    """
+    if hasattr(archivo, "file_id"):
+        return _cache_huellas.obtener((archivo.file_id, archivo.size), lambda: _calcular_huella(archivo))
+    return _calcular_huella(archivo)
+
+
+def _calcular_huella(archivo):
+    huella = hashlib.blake2b(digest_size=16)
+    if hasattr(archivo, "getbuffer"):
+        huella.update(archivo.getbuffer())
+    else:
+        archivo.seek(0)
+        for trozo in iter(lambda: archivo.read(1 << 20), b""):
+            huella.update(trozo)
+    archivo.seek(0)
+    return huella.hexdigest()
+
+
+def ruta_columnar(archivo, huella=None):
+    """Ruta del archivo Arrow IPC del archivo subido; lo convierte la primera vez."""
+    huella = huella or huella_archivo(archivo)
+    _registrar_existentes()
+
+    def convertir():
+        destino = os.path.join(DIRECTORIO_COLUMNAR, f"{huella}.arrow")
+        if not os.path.exists(destino):
+            os.makedirs(DIRECTORIO_COLUMNAR, exist_ok=True)
+            columnar.convertir(archivo, destino)
+        return destino
+
+    ruta = _cache_columnar.obtener(huella, convertir)
+    if not os.path.exists(ruta):
+        # Otro proceso la eliminó: se vuelve a convertir
+        _cache_columnar.guardar(huella, convertir())
+    return ruta
+
+
+def columnas_archivo(archivo, huella=None):
+    return columnar.columnas(ruta_columnar(archivo, huella))
+
+
+def vista_previa(archivo, huella=None, filas=5):
+    return columnar.vista_previa(ruta_columnar(archivo, huella), filas)
+
+
+def bloques_columna_archivo(archivo, columna, huella=None):
+    return columnar.bloques_columna(ruta_columnar(archivo, huella), columna)
+
+
+def leer_columna_archivo(archivo, columna, huella=None):
+    """Columna completa como float64, leída desde la copia columnar."""
+    bloques = list(bloques_columna_archivo(archivo, columna, huella))
+    return np.concatenate(bloques) if bloques else np.empty(0)
+
+
+def leer_columnas_archivo(archivo, columnas, huella=None):
+    """
+    Varias columnas como arreglos float64 alineados por fila (por ejemplo,
+    valor y frecuencia); se omiten las filas con algún faltante.
+    """
+    bloques = list(columnar.bloques_alineados(ruta_columnar(archivo, huella), columnas))
+    if not bloques:
+        return tuple(np.empty(0) for _ in columnas)
+    return tuple(np.concatenate(partes) for partes in zip(*bloques))
+
+
+def leer_tabla_archivo(archivo, huella=None):
+    """Todas las columnas del archivo como DataFrame, leídas desde la copia columnar."""
+    return columnar.tabla(ruta_columnar(archivo, huella))
+
+
+def sumas_columna(archivo, columna, huella=None):
+    """n, suma y suma de cuadrados de una columna (SumasSuficientes), en una sola pasada."""
+    huella = huella or huella_archivo(archivo)
+    return _cache_resumenes.obtener(
+        (huella, columna, "sumas"),
+        lambda: sumar_bloques(bloques_columna_archivo(archivo, columna, huella)),
+    )
+
+
+def sumas_diferencias(archivo, columna_1, columna_2, huella=None):
+    """
+    SumasSuficientes de las diferencias columna_1 - columna_2 fila por fila
+    (prueba pareada); se omiten las filas con algún faltante.
+    """
+    huella = huella or huella_archivo(archivo)
+
+    def calcular():
+        pares = columnar.bloques_pares(ruta_columnar(archivo, huella), columna_1, columna_2)
+        return sumar_bloques(x - y for x, y in pares)
+
+    return _cache_resumenes.obtener((huella, (columna_1, columna_2), "diferencias"), calcular)
+
+
+def resumen_columna(archivo, columna, huella=None, error_mediana=None):
+    """
+    Resumen descriptivo de una columna, guardado por (huella, columna,
+    error_mediana). `error_mediana` fija el error de rango del sketch de la
+    mediana (por defecto, el de ResumenDescriptivo).
+    """
+    huella = huella or huella_archivo(archivo)
+    return _cache_resumenes.obtener(
+        (huella, columna, error_mediana),
+        lambda: resumir_bloques(bloques_columna_archivo(archivo, columna, huella), error_mediana=error_mediana),
+    )
+
+
+def mediana_exacta_columna(archivo, columna, huella=None):
+    """
+    Mediana exacta de una columna. La columna se lee una sola vez y se
+    particiona en su lugar, sin la copia adicional de np.median.
+    """
+    huella = huella or huella_archivo(archivo)
+
+    def calcular():
+        # Las vistas de solo lectura del archivo mapeado se copian en mediana_exacta
+        return mediana_exacta(leer_columna_archivo(archivo, columna, huella), sobrescribir=True)
+
+    return _cache_resumenes.obtener((huella, columna, "mediana"), calcular)
+
+
+def metricas_todas_columnas(archivo, tipo, huella=None):
+    """
+    Métricas de todas las columnas numéricas en una sola pasada vectorizada.
+    Devuelve (nombres, métricas) con un arreglo por métrica.
+    """
+    huella = huella or huella_archivo(archivo)
+
+    def calcular():
+        nombres, matriz = columnar.matriz_numerica(ruta_columnar(archivo, huella))
+        return nombres, metricas_columnas(matriz, tipo)
+
+    return _cache_resumenes.obtener((huella, "*", tipo), calcular)
+
+
+def metricas_por_grupo(archivo, columna_grupo, columna_valor, tipo, huella=None):
+    """
+    Métricas de `columna_valor` para cada categoría de `columna_grupo`, con
+    una codificación hash de las categorías y un solo ordenamiento.
+    Devuelve (etiquetas, métricas) con un arreglo por métrica.
+    """
+    huella = huella or huella_archivo(archivo)
+
+    def calcular():
+        etiquetas, codigos, valores = columnar.grupos_y_valores(
+            ruta_columnar(archivo, huella), columna_grupo, columna_valor
+        )
+        return etiquetas, metricas_grupos(codigos, valores, len(etiquetas), tipo)
+
+    return _cache_resumenes.obtener((huella, (columna_grupo, columna_valor), "grupos", tipo), calcular)
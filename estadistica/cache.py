@@ -0,0 +1,211 @@
+"""
+Caché LRU acotada para las funciones del núcleo.
+
+Streamlit ejecuta todas las sesiones en el mismo proceso, así que una caché a
+nivel de módulo se comparte entre sesiones: si dos usuarios piden el mismo
+cálculo, el segundo recibe el resultado guardado. Cada caché de memoizar
+se acota por cantidad y por bytes (ESTADISTICA_MEMOIZAR_MB por función).
+"""
+import functools
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+MAX_BYTES_MEMOIZAR = int(os.environ.get("ESTADISTICA_MEMOIZAR_MB", "32")) * 1024 ** 2
+
+_CACHES = {}
+_FALTA = object()
+_estado = threading.local()
+
+
+class CacheLRU:
+    """
+    Diccionario acotado que descarta el elemento usado hace más tiempo.
+    Opcionalmente también se acota por bytes: `medir` devuelve el tamaño de
+    cada resultado y se descartan los más antiguos hasta volver a `max_bytes`
+    (el resultado más reciente siempre se conserva).
+    `al_descartar` se llama con cada resultado que sale de la caché.
+    """
+
+    def __init__(self, maxsize=1024, max_bytes=None, medir=None, al_descartar=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.medir = medir
+        self.al_descartar = al_descartar
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._tamanos = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def obtener(self, clave, calcular):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+
+        # El cálculo se hace fuera del candado para no bloquear otras sesiones
+        resultado = _solo_lectura(calcular())
+        self.guardar(clave, resultado)
+        return resultado
+
+    def consultar(self, clave, defecto=None):
+        """El valor guardado con `clave` (lo marca como usado) o `defecto`, sin calcular nada."""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave, resultado):
+        tamano = self.medir(resultado) if self.medir else 0
+        descartados = []
+        with self._lock:
+            if clave in self._datos:
+                self.bytes -= self._tamanos[clave]
+            self._datos[clave] = resultado
+            self._tamanos[clave] = tamano
+            self.bytes += tamano
+            self._datos.move_to_end(clave)
+            # Nunca se descarta el resultado recién guardado
+            while len(self._datos) > 1 and (len(self._datos) > self.maxsize or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes)):
+                antigua, valor = self._datos.popitem(last=False)
+                self.bytes -= self._tamanos.pop(antigua)
+                descartados.append(valor)
+
+        if self.al_descartar:
+            for valor in descartados:
+                self.al_descartar(valor)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._tamanos.clear()
+            self.bytes = 0
+            self.aciertos = 0
+            self.fallos = 0
+
+    def info(self):
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tamano": len(self._datos),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+        }
+
+
+def tamano_resultado(valor):
+    """Bytes aproximados de un resultado: arreglos, DataFrames y sus contenedores."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if hasattr(valor, "memory_usage"):
+        return int(np.sum(valor.memory_usage(deep=True)))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_resultado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_resultado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+def _solo_lectura(resultado):
+    # Los arreglos compartidos entre sesiones no deben modificarse
+    if isinstance(resultado, np.ndarray):
+        resultado.flags.writeable = False
+    elif isinstance(resultado, dict):
+        for valor in resultado.values():
+            _solo_lectura(valor)
+    elif isinstance(resultado, tuple):
+        for valor in resultado:
+            _solo_lectura(valor)
+    return resultado
+
+
+def clave_cache(valor):
+    """Convierte argumentos (incluidos arreglos de NumPy) en una clave hashable."""
+    if isinstance(valor, np.ndarray) and valor.dtype == object:
+        return ("ndarray", valor.shape, tuple(valor.ravel().tolist()))
+    if isinstance(valor, np.ndarray):
+        resumen = hashlib.blake2b(np.ascontiguousarray(valor).data, digest_size=16).hexdigest()
+        return ("ndarray", valor.dtype.str, valor.shape, resumen)
+    if isinstance(valor, (list, tuple)):
+        return tuple(clave_cache(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, clave_cache(v)) for k, v in valor.items()))
+    return valor
+
+
+def memoizar(maxsize=1024, max_bytes=MAX_BYTES_MEMOIZAR):
+    """
+    Decorador que guarda los resultados de una función pura en una CacheLRU
+    de a lo sumo `maxsize` resultados y `max_bytes` bytes. Un resultado más
+    grande que `max_bytes` se devuelve sin guardarlo. Para arreglos grandes
+    de un solo uso conviene llamar a .sin_cache: la clave obliga a leer
+    todos los argumentos.
+    """
+    def decorador(funcion):
+        cache = registrar_cache(f"{funcion.__module__}.{funcion.__qualname__}",
+                                CacheLRU(maxsize, max_bytes=max_bytes, medir=tamano_resultado))
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if getattr(_estado, "desactivada", False):
+                return funcion(*args, **kwargs)
+            clave = (clave_cache(args), clave_cache(kwargs))
+            resultado = cache.consultar(clave, _FALTA)
+            if resultado is _FALTA:
+                # El cálculo se hace fuera del candado para no bloquear otras sesiones
+                resultado = _solo_lectura(funcion(*args, **kwargs))
+                if tamano_resultado(resultado) <= max_bytes:
+                    cache.guardar(clave, resultado)
+            return resultado
+
+        envoltura.cache = cache
+        envoltura.sin_cache = funcion
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def cache_desactivada():
+    """
+    Desactiva las cachés de memoizar en el hilo actual, incluidas las de las
+    funciones que se llaman entre sí. Sirve para aplicar las fórmulas a
+    arreglos grandes de un solo uso (simulaciones) sin llenar las cachés.
+    """
+    anterior = getattr(_estado, "desactivada", False)
+    _estado.desactivada = True
+    try:
+        yield
+    finally:
+        _estado.desactivada = anterior
+
+
+def registrar_cache(nombre, cache):
+    """Incluye una caché en los reportes de info_caches()."""
+    _CACHES[nombre] = cache
+    return cache
+
+
+def info_caches():
+    """Aciertos, fallos y tamaño de cada caché registrada."""
+    return {nombre: cache.info() for nombre, cache in _CACHES.items()}
+
+
+def limpiar_caches():
+    for cache in _CACHES.values():
+        cache.limpiar()
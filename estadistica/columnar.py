@@ -0,0 +1,326 @@
+"""
+Conversión de los archivos subidos a formato columnar (Arrow IPC).
+
+Cada archivo CSV, XLSX, Parquet o Arrow se convierte una sola vez, por
+lotes, a un archivo Arrow IPC en disco. Después, las estadísticas de una
+columna leen solo esa columna a través de un mapeo en memoria del archivo,
+sin copiar los buffers cuando la columna ya es float64.
+"""
+import os
+import re
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from .instrumentacion import contar, medir
+from .streaming import TAMANO_BLOQUE, limpiar_bloque
+
+EXTENSIONES = ["csv", "xlsx", "parquet", "arrow", "feather"]
+
+
+def extension(nombre):
+    return nombre.rsplit(".", 1)[-1].lower()
+
+
+def _escribir(esquema, lotes, destino):
+    with pa.OSFile(destino, "wb") as salida, ipc.new_file(salida, esquema) as escritor:
+        for lote in lotes:
+            escritor.write_batch(lote)
+
+
+# --- Conversión por formato ---
+
+def _convertir_csv(archivo, destino):
+    # Los tipos se infieren del primer bloque. Si una columna cambia de tipo
+    # más adelante (un entero seguido de "1.5"), se vuelve a leer con esa
+    # columna como float64 y, si tampoco es numérica, como texto; las demás
+    # conservan su tipo.
+    tipos = {}
+    archivo.seek(0)
+    nombres = pacsv.open_csv(archivo).schema.names
+    for _ in range(2 * len(nombres) + 1):
+        archivo.seek(0)
+        try:
+            lector = pacsv.open_csv(archivo, convert_options=pacsv.ConvertOptions(column_types=tipos))
+            _escribir(lector.schema, lector, destino)
+            return
+        except pa.ArrowInvalid as e:
+            columna = re.search(r"CSV column #(\d+)", str(e))
+            if columna is None:
+                break
+            nombre = nombres[int(columna.group(1))]
+            tipos[nombre] = pa.string() if nombre in tipos else pa.float64()
+
+    # Error sin columna identificable: se guardan todas como texto y se
+    # convierten a número al leerlas
+    archivo.seek(0)
+    opciones = pacsv.ConvertOptions(column_types={nombre: pa.string() for nombre in nombres})
+    lector = pacsv.open_csv(archivo, convert_options=opciones)
+    _escribir(lector.schema, lector, destino)
+
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _lote_xlsx(filas, esquema):
+    import pandas as pd
+
+    columnas = []
+    for i, campo in enumerate(esquema):
+        valores = [fila[i] if i < len(fila) else None for fila in filas]
+        if pa.types.is_floating(campo.type):
+            numeros = pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+            columnas.append(pa.array(numeros, mask=np.isnan(numeros)))
+        else:
+            columnas.append(pa.array([None if v is None else str(v) for v in valores], type=pa.string()))
+    return pa.record_batch(columnas, schema=esquema)
+
+
+def _convertir_xlsx(archivo, destino, filas_por_lote=50_000):
+    from openpyxl import load_workbook
+
+    archivo.seek(0)
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [f"Unnamed: {i}" if c is None else str(c) for i, c in enumerate(next(filas, ()))]
+
+        primeras = []
+        for fila in filas:
+            primeras.append(fila)
+            if len(primeras) >= filas_por_lote:
+                break
+
+        # El tipo de cada columna se decide con el primer lote: float64 si
+        # todos sus valores son numéricos, texto en otro caso.
+        campos = []
+        for i, nombre in enumerate(encabezado):
+            valores = [fila[i] for fila in primeras if i < len(fila) and fila[i] is not None]
+            tipo = pa.float64() if all(_es_numero(v) for v in valores) else pa.string()
+            campos.append(pa.field(nombre, tipo))
+        esquema = pa.schema(campos)
+
+        def lotes():
+            if primeras:
+                yield _lote_xlsx(primeras, esquema)
+            buffer = []
+            for fila in filas:
+                buffer.append(fila)
+                if len(buffer) >= filas_por_lote:
+                    yield _lote_xlsx(buffer, esquema)
+                    buffer = []
+            if buffer:
+                yield _lote_xlsx(buffer, esquema)
+
+        _escribir(esquema, lotes(), destino)
+    finally:
+        libro.close()
+
+
+def _convertir_parquet(archivo, destino):
+    archivo.seek(0)
+    origen = pq.ParquetFile(archivo)
+    _escribir(origen.schema_arrow, origen.iter_batches(batch_size=TAMANO_BLOQUE), destino)
+
+
+def _convertir_arrow(archivo, destino):
+    archivo.seek(0)
+    try:
+        lector = ipc.open_file(archivo)
+        lotes = (lector.get_batch(i) for i in range(lector.num_record_batches))
+    except pa.ArrowInvalid:
+        archivo.seek(0)
+        lector = ipc.open_stream(archivo)
+        lotes = lector
+    # Se reescribe sin compresión para poder mapearlo en memoria sin copias
+    _escribir(lector.schema, lotes, destino)
+
+
+_CONVERSORES = {
+    "csv": _convertir_csv,
+    "xlsx": _convertir_xlsx,
+    "parquet": _convertir_parquet,
+    "arrow": _convertir_arrow,
+    "feather": _convertir_arrow,
+}
+
+
+@medir("conversion")
+def convertir(archivo, destino):
+    """
+    Convierte el archivo subido a Arrow IPC en `destino`. Se escribe primero
+    en un archivo temporal para que otra sesión nunca lea una conversión a
+    medias.
+    """
+    ext = extension(archivo.name)
+    if ext not in _CONVERSORES:
+        raise ValueError(f"Formato no soportado: .{ext}")
+    # Cada sesión (un hilo del mismo proceso) escribe en su propio temporal
+    descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(destino) or None)
+    os.close(descriptor)
+    try:
+        _CONVERSORES[ext](archivo, temporal)
+        os.replace(temporal, destino)
+        contar("archivos_convertidos")
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return destino
+
+
+# --- Lectura ---
+
+def abrir(ruta):
+    """Lector Arrow IPC sobre un mapeo en memoria del archivo."""
+    return ipc.open_file(pa.memory_map(ruta, "r"))
+
+
+def columnas(ruta):
+    return abrir(ruta).schema.names
+
+
+def vista_previa(ruta, filas=5):
+    lector = abrir(ruta)
+    if lector.num_record_batches == 0:
+        return lector.schema.empty_table().to_pandas()
+    return lector.get_batch(0).slice(0, filas).to_pandas()
+
+
+def tabla(ruta, columnas=None):
+    """Archivo completo (o solo `columnas`) como DataFrame de pandas."""
+    datos = abrir(ruta).read_all()
+    return (datos.select(columnas) if columnas is not None else datos).to_pandas()
+
+
+def a_float64(arreglo):
+    """
+    Convierte una columna Arrow a float64 sin valores faltantes. Las columnas
+    float64 sin nulos se devuelven sin copiar (arreglo de solo lectura).
+    """
+    tipo = arreglo.type
+    if pa.types.is_temporal(tipo):
+        # Fechas y horas no son datos numéricos (no se convierten a segundos desde 1970)
+        return np.empty(0)
+    if pa.types.is_floating(tipo) or pa.types.is_integer(tipo) or pa.types.is_boolean(tipo):
+        if tipo != pa.float64():
+            arreglo = arreglo.cast(pa.float64())
+        valores = arreglo.to_numpy(zero_copy_only=False)
+        faltantes = np.isnan(valores)
+        return valores[~faltantes] if faltantes.any() else valores
+    return limpiar_bloque(arreglo.to_numpy(zero_copy_only=False))
+
+
+def bloques_columna(ruta, columna):
+    """Itera una sola columna del archivo columnar, lote por lote."""
+    lector = abrir(ruta)
+    indice = lector.schema.get_field_index(columna)
+    if indice < 0:
+        raise KeyError(columna)
+    for i in range(lector.num_record_batches):
+        yield a_float64(lector.get_batch(i).column(indice))
+
+
+def _con_faltantes(arreglo):
+    """Columna Arrow como float64 con NaN en los nulos y en lo que no sea numérico."""
+    tipo = arreglo.type
+    if pa.types.is_temporal(tipo):
+        return np.full(len(arreglo), np.nan)
+    if pa.types.is_floating(tipo) or pa.types.is_integer(tipo) or pa.types.is_boolean(tipo):
+        return arreglo.cast(pa.float64()).to_numpy(zero_copy_only=False)
+    import pandas as pd
+
+    with medir("limpieza"):
+        serie = pd.to_numeric(pd.Series(arreglo.to_numpy(zero_copy_only=False), copy=False), errors="coerce")
+        return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def bloques_alineados(ruta, columnas):
+    """
+    Itera varias columnas a la vez, lote por lote, como tuplas de arreglos
+    alineados por fila. Se omiten las filas con un faltante en cualquiera de
+    las columnas.
+    """
+    lector = abrir(ruta)
+    indices = [lector.schema.get_field_index(c) for c in columnas]
+    for columna, indice in zip(columnas, indices):
+        if indice < 0:
+            raise KeyError(columna)
+    for i in range(lector.num_record_batches):
+        lote = lector.get_batch(i)
+        valores = [_con_faltantes(lote.column(indice)) for indice in indices]
+        completas = ~np.logical_or.reduce([np.isnan(v) for v in valores])
+        yield tuple(v[completas] for v in valores)
+
+
+def bloques_pares(ruta, columna_1, columna_2):
+    """Itera dos columnas a la vez como pares (x, y) alineados por fila (ver bloques_alineados)."""
+    return bloques_alineados(ruta, (columna_1, columna_2))
+
+
+def _es_numerica(tipo):
+    return pa.types.is_floating(tipo) or pa.types.is_integer(tipo)
+
+
+def matriz_numerica(ruta):
+    """
+    Devuelve (nombres, matriz) con todas las columnas numéricas del archivo
+    en una matriz float64 (filas x columnas), con NaN en los faltantes.
+    """
+    lector = abrir(ruta)
+    indices = [i for i, campo in enumerate(lector.schema) if _es_numerica(campo.type)]
+    nombres = [lector.schema.field(i).name for i in indices]
+    filas = sum(lector.get_batch(i).num_rows for i in range(lector.num_record_batches))
+    matriz = np.empty((filas, len(indices)), dtype=np.float64)
+    inicio = 0
+    for i in range(lector.num_record_batches):
+        lote = lector.get_batch(i)
+        fin = inicio + lote.num_rows
+        for j, indice in enumerate(indices):
+            matriz[inicio:fin, j] = lote.column(indice).cast(pa.float64()).to_numpy(zero_copy_only=False)
+        inicio = fin
+    return nombres, matriz
+
+
+def grupos_y_valores(ruta, columna_grupo, columna_valor):
+    """
+    Devuelve (etiquetas, codigos, valores): las categorías de `columna_grupo`
+    ordenadas, el código (posición en `etiquetas`) de cada fila y los
+    valores de `columna_valor` como float64. La codificación usa la tabla
+    hash de Arrow, sin crear objetos de Python por fila. Se omiten las filas
+    sin categoría o sin un valor numérico; una categoría cuyas filas no
+    tienen valores numéricos queda en `etiquetas` sin ninguna fila.
+    """
+    tabla = abrir(ruta).read_all()
+    for columna in (columna_grupo, columna_valor):
+        if tabla.schema.get_field_index(columna) < 0:
+            raise KeyError(columna)
+    codificada = tabla.column(columna_grupo).combine_chunks().dictionary_encode()
+    if len(codificada.dictionary) == 0:
+        return [], np.empty(0, dtype=np.int64), np.empty(0)
+    valores = _con_faltantes(tabla.column(columna_valor).combine_chunks())
+
+    # Las categorías se ordenan (son pocas comparadas con las filas) y los
+    # códigos se traducen a su posición en el orden. Una celda de texto
+    # vacía del CSV cuenta como fila sin categoría.
+    diccionario = codificada.dictionary
+    orden = pc.sort_indices(diccionario).to_numpy()
+    vacia = np.zeros(orden.size, dtype=bool)
+    if pa.types.is_string(diccionario.type) or pa.types.is_large_string(diccionario.type):
+        vacia = pc.equal(diccionario, "").to_numpy(zero_copy_only=False)
+    orden = orden[~vacia[orden]]
+    etiquetas = diccionario.take(orden).to_pylist()
+    posicion = np.full(vacia.size, -1, dtype=np.int64)
+    posicion[orden] = np.arange(orden.size)
+
+    indices = codificada.indices
+    codigos = posicion[indices.fill_null(0).to_numpy(zero_copy_only=False)]
+    validas = ~np.isnan(valores) & (codigos >= 0)
+    if indices.null_count:
+        validas &= indices.is_valid().to_numpy(zero_copy_only=False)
+    return etiquetas, codigos[validas], valores[validas]
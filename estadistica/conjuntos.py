@@ -0,0 +1,214 @@
+"""
+Conjuntos de datos incrementales guardados en SQLite.
+
+Un conjunto es una serie de lotes (por ejemplo, uno por día) con las mismas
+columnas. De cada lote se guarda solo el ResumenDescriptivo serializado de
+cada columna (momentos, sketch de cuantiles y frecuencias), nunca los datos,
+y el conjunto guarda además el resumen combinado de todos sus lotes.
+
+- Agregar un lote lee solo el archivo nuevo y combina su resumen con el
+  total guardado: el costo depende del tamaño del lote, no del conjunto.
+- Deshacer un lote lo borra y vuelve a combinar los resúmenes de los lotes
+  restantes, sin releer ningún archivo.
+
+La base se guarda en ESTADISTICA_CONJUNTOS_DB (por defecto,
+~/.estadistica/conjuntos.db) y la comparten todas las sesiones.
+"""
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from .archivos import columnas_archivo, huella_archivo, resumen_columna
+from .instrumentacion import contar, medir
+from .streaming import ResumenDescriptivo
+
+RUTA_CONJUNTOS_DB = os.environ.get("ESTADISTICA_CONJUNTOS_DB") or os.path.join(
+    os.path.expanduser("~"), ".estadistica", "conjuntos.db"
+)
+
+_ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS conjuntos (nombre TEXT PRIMARY KEY, creado REAL)",
+    "CREATE TABLE IF NOT EXISTS lotes (id INTEGER PRIMARY KEY AUTOINCREMENT, conjunto TEXT, huella TEXT, "
+    "archivo TEXT, agregado REAL, UNIQUE (conjunto, huella))",
+    "CREATE TABLE IF NOT EXISTS resumenes_lote (lote INTEGER, columna TEXT, n INTEGER, estado BLOB, "
+    "PRIMARY KEY (lote, columna))",
+    "CREATE TABLE IF NOT EXISTS totales (conjunto TEXT, columna TEXT, estado BLOB, PRIMARY KEY (conjunto, columna))",
+)
+
+
+class AlmacenConjuntos:
+    """Conjuntos, lotes y resúmenes serializados en una base SQLite."""
+
+    def __init__(self, ruta=RUTA_CONJUNTOS_DB):
+        self.ruta = ruta
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        with self._conectar() as conexion:
+            for sentencia in _ESQUEMA:
+                conexion.execute(sentencia)
+
+    def _conectar(self):
+        # Una conexión por operación: las sesiones corren en hilos distintos
+        return closing(sqlite3.connect(self.ruta, timeout=30, isolation_level=None))
+
+    def conjuntos(self):
+        """Nombres de los conjuntos, en orden alfabético."""
+        with self._conectar() as conexion:
+            return [fila[0] for fila in conexion.execute("SELECT nombre FROM conjuntos ORDER BY nombre")]
+
+    def crear(self, nombre):
+        nombre = nombre.strip()
+        if not nombre:
+            raise ValueError("El conjunto necesita un nombre.")
+        with self._conectar() as conexion:
+            try:
+                conexion.execute("INSERT INTO conjuntos VALUES (?, ?)", (nombre, time.time()))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Ya existe un conjunto llamado '{nombre}'.") from None
+        return nombre
+
+    def eliminar(self, nombre):
+        """Borra el conjunto con todos sus lotes y resúmenes."""
+        with self._conectar() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                conexion.execute("DELETE FROM resumenes_lote WHERE lote IN "
+                                 "(SELECT id FROM lotes WHERE conjunto = ?)", (nombre,))
+                for tabla, columna in (("lotes", "conjunto"), ("totales", "conjunto"), ("conjuntos", "nombre")):
+                    conexion.execute(f"DELETE FROM {tabla} WHERE {columna} = ?", (nombre,))
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+
+    def lotes(self, nombre):
+        """Un diccionario por lote (id, archivo, huella, fecha y valores por columna), del más antiguo al último."""
+        with self._conectar() as conexion:
+            filas = conexion.execute(
+                "SELECT l.id, l.archivo, l.huella, l.agregado, r.columna, r.n FROM lotes l "
+                "JOIN resumenes_lote r ON r.lote = l.id WHERE l.conjunto = ? ORDER BY l.id, r.columna",
+                (nombre,),
+            ).fetchall()
+        lotes = {}
+        for lote, archivo, huella, agregado, columna, n in filas:
+            datos = lotes.setdefault(lote, {"id": lote, "archivo": archivo, "huella": huella, "agregado": agregado,
+                                            "valores": {}})
+            datos["valores"][columna] = n
+        return list(lotes.values())
+
+    def columnas(self, nombre):
+        """Columnas del conjunto, las del primer lote (vacía si todavía no tiene lotes)."""
+        with self._conectar() as conexion:
+            return self._columnas(conexion, nombre)
+
+    def resumenes(self, nombre):
+        """ResumenDescriptivo combinado de cada columna del conjunto."""
+        with self._conectar() as conexion:
+            filas = conexion.execute("SELECT columna, estado FROM totales WHERE conjunto = ? ORDER BY columna",
+                                     (nombre,)).fetchall()
+        return {columna: ResumenDescriptivo.desde_bytes(estado) for columna, estado in filas}
+
+    def agregar_lote(self, nombre, resumenes, huella, archivo=""):
+        """
+        Guarda los resúmenes de un lote nuevo ({columna: ResumenDescriptivo})
+        y los combina con el total del conjunto. Devuelve el id del lote.
+        Un lote con la misma huella no se agrega dos veces.
+        """
+        with self._conectar() as conexion:
+            # La transacción bloquea la base: dos sesiones no pueden combinar el mismo total a la vez
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                if conexion.execute("SELECT 1 FROM conjuntos WHERE nombre = ?", (nombre,)).fetchone() is None:
+                    raise ValueError(f"No existe el conjunto '{nombre}'.")
+                columnas = set(self._columnas(conexion, nombre)) or set(resumenes)
+                if set(resumenes) != columnas:
+                    raise ValueError(f"El lote debe tener las columnas del conjunto: {', '.join(sorted(columnas))}.")
+                try:
+                    lote = conexion.execute("INSERT INTO lotes (conjunto, huella, archivo, agregado) "
+                                            "VALUES (?, ?, ?, ?)", (nombre, huella, archivo, time.time())).lastrowid
+                except sqlite3.IntegrityError:
+                    raise ValueError("Este archivo ya se agregó al conjunto.") from None
+
+                totales = dict(conexion.execute("SELECT columna, estado FROM totales WHERE conjunto = ?", (nombre,)))
+                for columna, resumen in resumenes.items():
+                    conexion.execute("INSERT INTO resumenes_lote VALUES (?, ?, ?, ?)",
+                                     (lote, columna, resumen.n, resumen.a_bytes()))
+                    total = ResumenDescriptivo()
+                    if columna in totales:
+                        total = ResumenDescriptivo.desde_bytes(totales[columna])
+                    conexion.execute("INSERT OR REPLACE INTO totales VALUES (?, ?, ?)",
+                                     (nombre, columna, total.combinar(resumen).a_bytes()))
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+        contar("lotes_agregados")
+        return lote
+
+    def deshacer_lote(self, nombre, lote=None):
+        """
+        Quita un lote (por defecto, el último) y recalcula el total con los
+        resúmenes de los lotes restantes. Devuelve el id del lote quitado.
+        """
+        with self._conectar() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                if lote is None:
+                    lote = conexion.execute("SELECT MAX(id) FROM lotes WHERE conjunto = ?", (nombre,)).fetchone()[0]
+                if lote is None or conexion.execute("SELECT 1 FROM lotes WHERE id = ? AND conjunto = ?",
+                                                    (lote, nombre)).fetchone() is None:
+                    raise ValueError("El conjunto no tiene ese lote.")
+                conexion.execute("DELETE FROM resumenes_lote WHERE lote = ?", (lote,))
+                conexion.execute("DELETE FROM lotes WHERE id = ?", (lote,))
+
+                totales = {}
+                for columna, estado in conexion.execute(
+                        "SELECT r.columna, r.estado FROM resumenes_lote r JOIN lotes l ON r.lote = l.id "
+                        "WHERE l.conjunto = ? ORDER BY l.id", (nombre,)):
+                    totales.setdefault(columna, ResumenDescriptivo()).combinar(ResumenDescriptivo.desde_bytes(estado))
+                conexion.execute("DELETE FROM totales WHERE conjunto = ?", (nombre,))
+                conexion.executemany("INSERT INTO totales VALUES (?, ?, ?)",
+                                     [(nombre, columna, total.a_bytes()) for columna, total in totales.items()])
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+        contar("lotes_deshechos")
+        return lote
+
+    @staticmethod
+    def _columnas(conexion, nombre):
+        return [fila[0] for fila in conexion.execute(
+            "SELECT columna FROM resumenes_lote WHERE lote = (SELECT MIN(id) FROM lotes WHERE conjunto = ?) "
+            "ORDER BY columna", (nombre,))]
+
+
+_almacen = None
+
+
+def almacen_conjuntos():
+    """Almacén de RUTA_CONJUNTOS_DB, creado la primera vez que se usa."""
+    global _almacen
+    if _almacen is None:
+        _almacen = AlmacenConjuntos()
+    return _almacen
+
+
+@medir("lote")
+def agregar_archivo(nombre, archivo, columnas=None, huella=None, almacen=None):
+    """
+    Resume las columnas de un archivo (por defecto, las del conjunto) y las
+    agrega al conjunto `nombre` como un lote nuevo. Devuelve el id del lote.
+    """
+    almacen = almacen or almacen_conjuntos()
+    huella = huella or huella_archivo(archivo)
+    columnas = columnas or almacen.columnas(nombre)
+    if not columnas:
+        raise ValueError("Elige las columnas del conjunto.")
+    disponibles = columnas_archivo(archivo, huella)
+    faltantes = [c for c in columnas if c not in disponibles]
+    if faltantes:
+        raise ValueError(f"Al archivo le faltan las columnas del conjunto: {', '.join(faltantes)}.")
+    resumenes = {columna: resumen_columna(archivo, columna, huella) for columna in columnas}
+    return almacen.agregar_lote(nombre, resumenes, huella, getattr(archivo, "name", ""))
@@ -0,0 +1,200 @@
+"""
+Medidas de tendencia central y dispersión de la página 1.
+"""
+import numpy as np
+
+from .cache import memoizar
+from .instrumentacion import medir
+from .mediana import ERROR_POR_DEFECTO, calcular_mediana
+from .moda import calcular_moda
+
+
+@memoizar(maxsize=64)
+def calcular_metricas(datos, tipo, metodo_moda="auto", ancho_clase=None,
+                      metodo_mediana="exacta", error_mediana=ERROR_POR_DEFECTO, sobrescribir=False):
+    """
+    Calcula n, media, mediana, moda, varianza y desviación estándar.
+    `tipo` es "MUESTRAL" (ddof=1) o "POBLACIONAL" (ddof=0); `metodo_moda`
+    y `ancho_clase` se pasan a calcular_moda, y `metodo_mediana` y
+    `error_mediana` a calcular_mediana. Con `sobrescribir=True` la mediana
+    exacta reordena `datos` en su lugar en vez de copiarlos.
+    """
+    data_array = np.asarray(datos, dtype=np.float64)
+    with medir("moda"):
+        moda = calcular_moda(data_array, metodo_moda, ancho_clase)
+
+    ddof_val = 1 if tipo == "MUESTRAL" else 0
+    with medir("momentos"):
+        varianza = float(np.var(data_array, ddof=ddof_val))
+        media = float(np.mean(data_array))
+    # La mediana va al final porque puede reordenar el arreglo
+    with medir("mediana"):
+        mediana, error_rango = calcular_mediana(data_array, metodo_mediana, error_mediana, sobrescribir)
+    return {
+        "n": int(data_array.size),
+        "media": media,
+        "mediana": mediana,
+        "metodo_mediana": metodo_mediana,
+        "error_mediana": error_rango,
+        "moda": moda["moda"] if data_array.size > 0 else "N/A",
+        "modas": moda["modas"],
+        "metodo_moda": moda["metodo"],
+        "ancho_clase": moda["ancho_clase"],
+        "varianza": varianza,
+        "desviacion_estandar": float(np.sqrt(varianza)),
+    }
+
+
+def metricas_columnas(matriz, tipo):
+    """
+    Las mismas métricas que calcular_metricas para cada columna de una
+    matriz 2-D (filas x columnas), con NaN en los valores faltantes.
+    Todo se calcula con reducciones por columna, sin ciclos de Python.
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    filas, n_columnas = matriz.shape
+    ddof_val = 1 if tipo == "MUESTRAL" else 0
+
+    n = np.count_nonzero(~np.isnan(matriz), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.nansum(matriz, axis=0) / n
+        varianza = np.nansum(np.square(matriz - media), axis=0) / (n - ddof_val)
+    varianza[n - ddof_val <= 0] = np.nan
+
+    # Al ordenar cada columna los NaN quedan al final y los valores
+    # repetidos quedan contiguos. Se ordena la transpuesta contigua porque
+    # ordenar filas contiguas es más rápido que ordenar columnas.
+    ordenada = np.sort(np.ascontiguousarray(matriz.T), axis=1)
+    mediana = np.full(n_columnas, np.nan)
+    if filas > 0:
+        bajo = np.take_along_axis(ordenada, np.maximum((n - 1) // 2, 0)[:, None], axis=1)[:, 0]
+        alto = np.take_along_axis(ordenada, np.minimum(n // 2, filas - 1)[:, None], axis=1)[:, 0]
+        mediana = np.where(n > 0, (bajo + alto) / 2, np.nan)
+
+    return {
+        "n": n,
+        "media": media,
+        "mediana": mediana,
+        "moda": _moda_filas(ordenada),
+        "varianza": varianza,
+        "desviacion_estandar": np.sqrt(varianza),
+    }
+
+
+def _moda_filas(ordenada):
+    """
+    Moda de cada fila de una matriz ya ordenada por fila. Se recorren las
+    rachas de valores iguales de todas las filas a la vez; ante empate gana
+    el menor valor, igual que scipy.stats.mode.
+    """
+    n_filas, largo = ordenada.shape
+    moda = np.full(n_filas, np.nan)
+    if largo == 0:
+        return moda
+
+    plana = ordenada.ravel()
+    inicio = np.ones(plana.size, dtype=bool)
+    inicio[1:] = plana[1:] != plana[:-1]
+    inicio[::largo] = True
+    posiciones = np.flatnonzero(inicio)
+    largos = np.diff(np.append(posiciones, plana.size))
+    valores = plana[posiciones]
+    largos[np.isnan(valores)] = 0
+    filas = posiciones // largo
+
+    # La primera racha de cada fila empieza en un múltiplo de `largo`
+    primeras = np.flatnonzero(posiciones % largo == 0)
+    maximos = np.maximum.reduceat(largos, primeras)
+    # Las rachas están en orden creciente de valor: la primera con el
+    # largo máximo es la del menor valor
+    candidatas = np.flatnonzero((largos == maximos[filas]) & (largos > 0))
+    filas_candidatas = filas[candidatas]
+    primera = np.ones(candidatas.size, dtype=bool)
+    primera[1:] = filas_candidatas[1:] != filas_candidatas[:-1]
+    moda[filas_candidatas[primera]] = valores[candidatas[primera]]
+    return moda
+
+
+def metricas_grupos(codigos, valores, n_grupos, tipo):
+    """
+    Las mismas métricas que metricas_columnas para cada grupo: `codigos`
+    es el número de grupo (0 .. n_grupos - 1) de cada valor. Se ordena una
+    sola vez por (grupo, valor) y todas las métricas salen de reducciones
+    por grupo, sin ciclos de Python; los grupos sin valores quedan con n = 0
+    y NaN en las demás métricas.
+    """
+    codigos = np.asarray(codigos, dtype=np.int64)
+    valores = np.asarray(valores, dtype=np.float64)
+    ddof_val = 1 if tipo == "MUESTRAL" else 0
+
+    n = np.bincount(codigos, minlength=n_grupos)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.bincount(codigos, weights=valores, minlength=n_grupos) / n
+        m2 = np.bincount(codigos, weights=np.square(valores - media[codigos]), minlength=n_grupos)
+        varianza = m2 / (n - ddof_val)
+    varianza[n - ddof_val <= 0] = np.nan
+
+    ordenados, grupos = _ordenar_por_grupo(codigos, valores, n_grupos)
+    inicios = np.cumsum(n) - n
+    mediana = np.full(n_grupos, np.nan)
+    con_datos = n > 0
+    bajo = ordenados[(inicios + (n - 1) // 2)[con_datos]]
+    alto = ordenados[(inicios + n // 2)[con_datos]]
+    mediana[con_datos] = (bajo + alto) / 2
+
+    return {
+        "n": n,
+        "media": media,
+        "mediana": mediana,
+        "moda": _moda_grupos(ordenados, grupos, n_grupos),
+        "varianza": varianza,
+        "desviacion_estandar": np.sqrt(varianza),
+    }
+
+
+def _ordenar_por_grupo(codigos, valores, n_grupos):
+    """
+    Valores ordenados por (grupo, valor) y el grupo de cada uno. En vez de
+    np.lexsort (dos ordenamientos indirectos) se ordena una sola vez una
+    clave entera que combina el grupo con el rango del valor, unas tres
+    veces más rápido con 10^7 valores.
+    """
+    tamano = valores.size
+    if n_grupos * tamano >= 2 ** 62:
+        orden = np.lexsort((valores, codigos))
+        return valores[orden], codigos[orden]
+    orden_valores = np.argsort(valores)
+    rangos = np.empty(tamano, dtype=np.int64)
+    rangos[orden_valores] = np.arange(tamano)
+    claves = np.sort(codigos * tamano + rangos)
+    return valores[orden_valores[claves % tamano]], claves // tamano
+
+
+def _moda_grupos(ordenados, grupos, n_grupos):
+    """
+    Moda de cada grupo con los valores ordenados por (grupo, valor). Igual
+    que _moda_filas, pero los grupos pueden tener distinto tamaño: ante
+    empate gana el menor valor.
+    """
+    moda = np.full(n_grupos, np.nan)
+    if ordenados.size == 0:
+        return moda
+
+    inicio = np.ones(ordenados.size, dtype=bool)
+    inicio[1:] = (ordenados[1:] != ordenados[:-1]) | (grupos[1:] != grupos[:-1])
+    posiciones = np.flatnonzero(inicio)
+    largos = np.diff(np.append(posiciones, ordenados.size))
+    valores = ordenados[posiciones]
+    grupo_racha = grupos[posiciones]
+
+    # Las rachas de cada grupo son contiguas y van en orden creciente de valor
+    primera_del_grupo = np.ones(posiciones.size, dtype=bool)
+    primera_del_grupo[1:] = grupo_racha[1:] != grupo_racha[:-1]
+    primeras = np.flatnonzero(primera_del_grupo)
+    maximos = np.maximum.reduceat(largos, primeras)
+    bloque = np.cumsum(primera_del_grupo) - 1
+    candidatas = np.flatnonzero(largos == maximos[bloque])
+    primera = np.ones(candidatas.size, dtype=bool)
+    primera[1:] = bloque[candidatas[1:]] != bloque[candidatas[:-1]]
+    moda[grupo_racha[candidatas[primera]]] = valores[candidatas[primera]]
+    return moda
@@ -0,0 +1,397 @@
+"""
+Fórmulas de estadística inferencial compartidas por las páginas 2 a 8.
+
+Todas las funciones aceptan escalares o arreglos de NumPy (se aplican las
+reglas de broadcasting) y devuelven un float cuando las entradas son
+escalares. Están memoizadas con una caché LRU compartida entre sesiones.
+"""
+import numpy as np
+from scipy.special import ndtr, ndtri, stdtr, stdtrit
+
+from .cache import memoizar
+
+# Opciones de los selectbox de nivel de confianza; se acepta cualquier otro
+NIVELES_CONFIANZA = ("90%", "95%", "97.5%", "99%")
+
+# Niveles de la tabla precalculada de valores críticos
+NIVELES_COMUNES = (0.80, 0.85, 0.90, 0.95, 0.975, 0.98, 0.99, 0.995, 0.999)
+GL_TABLA = 1000
+
+COLAS = ("bilateral", "derecha", "izquierda")
+
+
+def _escalar(valor):
+    valor = np.asarray(valor, dtype=np.float64)
+    return float(valor) if valor.ndim == 0 else valor
+
+
+def _validar_positivo(valor, mensaje):
+    if np.any(np.asarray(valor) <= 0):
+        raise ValueError(mensaje)
+
+
+def _validar_cola(cola):
+    cola = np.asarray(cola)
+    if not np.isin(cola, COLAS).all():
+        raise ValueError(f"Tipo de prueba no válido: se esperaba uno de {COLAS}.")
+    return cola
+
+
+def cola_desde_etiqueta(etiqueta):
+    """Traduce las etiquetas de los selectbox ("Bilateral (≠)", ...) a COLAS."""
+    etiqueta = etiqueta.lower()
+    for cola in COLAS:
+        if cola in etiqueta:
+            return cola
+    raise ValueError(f"Tipo de prueba no reconocido: {etiqueta}")
+
+
+# --- Valores críticos ---
+
+def nivel_desde_etiqueta(etiqueta):
+    """Convierte "95%", "95", "0.95" o "97,5 %" en un nivel de confianza entre 0 y 1."""
+    texto = str(etiqueta).replace("%", "").replace(",", ".").strip()
+    try:
+        nivel = float(texto)
+    except ValueError:
+        raise ValueError(f"Nivel de confianza no válido: {etiqueta}") from None
+    if nivel >= 1:
+        nivel /= 100
+    if not 0 < nivel < 1:
+        raise ValueError("El nivel de confianza debe estar entre 0% y 100%.")
+    return nivel
+
+
+def etiqueta_nivel(nivel):
+    return f"{nivel * 100:.4g}%"
+
+
+@memoizar(maxsize=1)
+def tabla_criticos():
+    """
+    Tabla de cuantiles superiores para las probabilidades de cola de
+    NIVELES_COMUNES (bilaterales y unilaterales). Devuelve (colas, tabla_t,
+    fila_z): tabla_t tiene una fila por grado de libertad, de 1 a GL_TABLA.
+    """
+    alpha = 1 - np.asarray(NIVELES_COMUNES)
+    colas = np.unique(np.round(np.concatenate((alpha / 2, alpha)), 12))
+    gl = np.arange(1, GL_TABLA + 1, dtype=np.float64)
+    return colas, -stdtrit(gl[:, None], colas[None, :]), -ndtri(colas)
+
+
+def _cuantil_superior(prob_cola, gl):
+    """
+    Valor con probabilidad `prob_cola` a su derecha en una t con `gl` grados
+    de libertad (gl = inf es la normal). Las colas de la tabla se leen
+    directamente, o se interpolan en 1/gl por encima de GL_TABLA; el resto
+    usa la inversa exacta.
+    """
+    prob_cola, gl = np.broadcast_arrays(np.asarray(prob_cola, dtype=np.float64),
+                                        np.asarray(gl, dtype=np.float64))
+    colas, tabla_t, fila_z = tabla_criticos()
+    # Se redondea para que 1 - 0.95 encuentre la cola 0.05 de la tabla
+    clave = np.round(prob_cola, 12)
+    j = np.minimum(np.searchsorted(colas, clave), colas.size - 1)
+    en_tabla = colas[j] == clave
+    infinito = np.isinf(gl)
+    entero = (gl == np.round(gl)) & (gl >= 1) & (gl <= GL_TABLA)
+    grande = (gl > GL_TABLA) & ~infinito
+
+    resultado = np.full(prob_cola.shape, np.nan)
+    m = en_tabla & entero
+    resultado[m] = tabla_t[gl[m].astype(np.int64) - 1, j[m]]
+    m = en_tabla & infinito
+    resultado[m] = fila_z[j[m]]
+    # El cuantil de la t es casi lineal en 1/gl entre la última fila y la normal
+    m = en_tabla & grande
+    if m.any():
+        resultado[m] = fila_z[j[m]] + GL_TABLA / gl[m] * (tabla_t[-1, j[m]] - fila_z[j[m]])
+    m = ~en_tabla & infinito
+    if m.any():
+        resultado[m] = -ndtri(prob_cola[m])
+    m = ~(en_tabla & (entero | grande) | infinito) & ~np.isnan(gl)
+    if m.any():
+        resultado[m] = -stdtrit(gl[m], prob_cola[m])
+    return resultado
+
+
+def _critico(nivel, gl, cola):
+    nivel = np.asarray(nivel, dtype=np.float64)
+    if np.any((nivel <= 0) | (nivel >= 1)):
+        raise ValueError("El nivel de confianza debe estar entre 0 y 1.")
+    _validar_positivo(gl, "Los grados de libertad deben ser mayores que cero.")
+    cola = _validar_cola(cola)
+    alpha = 1 - nivel
+    valor = _cuantil_superior(np.where(cola == "bilateral", alpha / 2, alpha), gl)
+    return _escalar(np.where(cola == "izquierda", -valor, valor))
+
+
+@memoizar()
+def critico_z(nivel, cola="bilateral"):
+    """
+    Valor crítico normal para el nivel de confianza `nivel` (entre 0 y 1).
+    Acepta arreglos: muchos niveles se resuelven en una sola llamada.
+    """
+    return _critico(nivel, np.inf, cola)
+
+
+@memoizar()
+def critico_t(nivel, gl, cola="bilateral"):
+    """Valor crítico t de Student para `nivel` y `gl` grados de libertad (escalares o arreglos)."""
+    return _critico(nivel, gl, cola)
+
+
+# --- Valor Z y t ---
+
+@memoizar()
+def valor_z(x, media, desviacion):
+    _validar_positivo(np.abs(desviacion), "La Desviación Estándar no puede ser cero.")
+    return _escalar((np.asarray(x, dtype=np.float64) - media) / desviacion)
+
+
+@memoizar()
+def probabilidad_acumulada(z):
+    return _escalar(ndtr(z))
+
+
+@memoizar()
+def z_desde_probabilidad(p):
+    return _escalar(ndtri(p))
+
+
+@memoizar()
+def valor_t(media_muestral, media_poblacional, desviacion, n):
+    _validar_positivo(np.asarray(n) - 1, "El tamaño de la muestra debe ser mayor que uno.")
+    error_estandar = error_estandar_media(desviacion, n)
+    _validar_positivo(np.abs(error_estandar), "El error estándar no puede ser cero.")
+    return _escalar((np.asarray(media_muestral, dtype=np.float64) - media_poblacional) / error_estandar)
+
+
+# --- Errores estándar ---
+
+@memoizar()
+def error_estandar_media(desviacion, n):
+    _validar_positivo(n, "El tamaño muestral debe ser mayor que cero.")
+    return _escalar(np.asarray(desviacion, dtype=np.float64) / np.sqrt(n))
+
+
+@memoizar()
+def error_estandar_proporcion(p, n):
+    _validar_positivo(n, "El tamaño muestral debe ser mayor que cero.")
+    p = np.asarray(p, dtype=np.float64)
+    return _escalar(np.sqrt(p * (1 - p) / n))
+
+
+@memoizar()
+def error_estandar_diferencia_medias(varianza_1, n_1, varianza_2, n_2):
+    _validar_positivo(n_1, "El tamaño muestral debe ser mayor que cero.")
+    _validar_positivo(n_2, "El tamaño muestral debe ser mayor que cero.")
+    return _escalar(np.sqrt(np.asarray(varianza_1, dtype=np.float64) / n_1
+                            + np.asarray(varianza_2, dtype=np.float64) / n_2))
+
+
+@memoizar()
+def error_estandar_diferencia_proporciones(p_1, n_1, p_2, n_2):
+    _validar_positivo(n_1, "El tamaño muestral debe ser mayor que cero.")
+    _validar_positivo(n_2, "El tamaño muestral debe ser mayor que cero.")
+    p_1 = np.asarray(p_1, dtype=np.float64)
+    p_2 = np.asarray(p_2, dtype=np.float64)
+    return _escalar(np.sqrt(p_1 * (1 - p_1) / n_1 + p_2 * (1 - p_2) / n_2))
+
+
+# --- Intervalos de confianza ---
+
+def _intervalo(centro, z, error_estandar):
+    margen = np.asarray(z, dtype=np.float64) * error_estandar
+    return _escalar(centro - margen), _escalar(centro + margen)
+
+
+@memoizar()
+def intervalo_media(media, desviacion, n, z):
+    """Devuelve (límite inferior, límite superior) de x̄ ± z·s/√n."""
+    return _intervalo(np.asarray(media, dtype=np.float64), z, error_estandar_media(desviacion, n))
+
+
+@memoizar()
+def intervalo_proporcion(exitos, n, z):
+    """Devuelve (límite inferior, límite superior) de p̂ ± z·√(p̂q̂/n), con p̂ = x/n."""
+    _validar_positivo(n, "El tamaño muestral debe ser mayor que cero.")
+    p_hat = np.asarray(exitos, dtype=np.float64) / n
+    return _intervalo(p_hat, z, error_estandar_proporcion(p_hat, n))
+
+
+@memoizar()
+def intervalo_diferencia_medias(media_1, varianza_1, n_1, media_2, varianza_2, n_2, z):
+    """Devuelve (diferencia, error estándar, límite inferior, límite superior)."""
+    diferencia = np.asarray(media_1, dtype=np.float64) - media_2
+    error = error_estandar_diferencia_medias(varianza_1, n_1, varianza_2, n_2)
+    return (_escalar(diferencia), error) + _intervalo(diferencia, z, error)
+
+
+@memoizar()
+def intervalo_diferencia_proporciones(p_1, n_1, p_2, n_2, z):
+    """Devuelve (diferencia, error estándar, límite inferior, límite superior)."""
+    diferencia = np.asarray(p_1, dtype=np.float64) - p_2
+    error = error_estandar_diferencia_proporciones(p_1, n_1, p_2, n_2)
+    return (_escalar(diferencia), error) + _intervalo(diferencia, z, error)
+
+
+# --- Tamaño de muestra ---
+
+@memoizar()
+def tamano_muestra_finita(N, z, p, e):
+    """Fórmula de Cochran con corrección para población finita."""
+    z2pq = np.square(z) * np.asarray(p, dtype=np.float64) * (1 - np.asarray(p, dtype=np.float64))
+    numerador = np.asarray(N, dtype=np.float64) * z2pq
+    denominador = np.square(e) * (np.asarray(N, dtype=np.float64) - 1) + z2pq
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _escalar(np.where(denominador != 0, numerador / denominador, 0))
+
+
+@memoizar()
+def tamano_muestra_infinita(z, p, e):
+    p = np.asarray(p, dtype=np.float64)
+    numerador = np.square(z) * p * (1 - p)
+    denominador = np.square(np.asarray(e, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _escalar(np.where(denominador != 0, numerador / denominador, 0))
+
+
+MAXIMO_CELDAS_GRILLA = 10_000_000
+
+
+@memoizar(maxsize=8)
+def grilla_tamano_muestra(poblaciones, confianzas, proporciones, errores):
+    """
+    Tamaño de muestra para todas las combinaciones de N, nivel de confianza,
+    p y E en una sola evaluación con broadcasting. Devuelve un arreglo con
+    forma (len(poblaciones), len(confianzas), len(proporciones), len(errores));
+    las poblaciones infinitas (np.inf) usan la fórmula sin corrección.
+    """
+    poblaciones = np.asarray(poblaciones, dtype=np.float64).ravel()
+    confianzas = np.asarray(confianzas, dtype=np.float64).ravel()
+    proporciones = np.asarray(proporciones, dtype=np.float64).ravel()
+    errores = np.asarray(errores, dtype=np.float64).ravel()
+    _validar_positivo(poblaciones, "El tamaño de la población debe ser mayor que cero.")
+    _validar_positivo(errores, "El margen de error debe ser mayor que cero.")
+    if np.any((confianzas <= 0) | (confianzas >= 1)):
+        raise ValueError("El nivel de confianza debe estar entre 0 y 1.")
+    if np.any((proporciones <= 0) | (proporciones >= 1)):
+        raise ValueError("La proporción esperada (p) debe estar entre 0 y 1.")
+    celdas = poblaciones.size * confianzas.size * proporciones.size * errores.size
+    if celdas > MAXIMO_CELDAS_GRILLA:
+        raise ValueError(f"La grilla tiene {celdas:,} celdas; el máximo es {MAXIMO_CELDAS_GRILLA:,}.")
+
+    N = poblaciones[:, None, None, None]
+    z = critico_normal.sin_cache(1 - confianzas, "bilateral")[None, :, None, None]
+    p = proporciones[None, None, :, None]
+    e = errores[None, None, None, :]
+    infinita = tamano_muestra_infinita.sin_cache(z, p, e)
+    with np.errstate(invalid="ignore"):
+        finita = tamano_muestra_finita.sin_cache(N, z, p, e)
+    return np.where(np.isinf(N), infinita, finita)
+
+
+# --- Pruebas de hipótesis (estadístico Z) ---
+
+@memoizar()
+def valor_p_normal(z, cola="bilateral"):
+    z = np.asarray(z, dtype=np.float64)
+    cola = _validar_cola(cola)
+    return _escalar(np.select(
+        [cola == "bilateral", cola == "derecha"],
+        [2 * ndtr(-np.abs(z)), ndtr(-z)],
+        ndtr(z),
+    ))
+
+
+@memoizar()
+def valor_p_t(t, gl, cola="bilateral"):
+    t = np.asarray(t, dtype=np.float64)
+    cola = _validar_cola(cola)
+    return _escalar(np.select(
+        [cola == "bilateral", cola == "derecha"],
+        [2 * stdtr(gl, -np.abs(t)), stdtr(gl, -t)],
+        stdtr(gl, t),
+    ))
+
+
+@memoizar()
+def critico_normal(alpha, cola="bilateral"):
+    """Valor crítico normal para el nivel de significancia `alpha`."""
+    return _critico(1 - np.asarray(alpha, dtype=np.float64), np.inf, cola)
+
+
+def _prueba_z(z, alpha, cola):
+    p_valor = valor_p_normal(z, cola)
+    rechazar = np.asarray(p_valor) < alpha
+    return {
+        "estadistico": _escalar(z),
+        "p_valor": p_valor,
+        "critico": critico_normal(alpha, cola),
+        "rechazar": bool(rechazar) if rechazar.ndim == 0 else rechazar,
+    }
+
+
+@memoizar()
+def prueba_media(media_muestral, media_h0, desviacion, n, alpha, cola="bilateral"):
+    z = (np.asarray(media_muestral, dtype=np.float64) - media_h0) / error_estandar_media(desviacion, n)
+    return _prueba_z(z, alpha, cola)
+
+
+@memoizar()
+def prueba_proporcion(exitos, n, p_h0, alpha, cola="bilateral"):
+    _validar_positivo(n, "El tamaño muestral debe ser mayor que cero.")
+    p_hat = np.asarray(exitos, dtype=np.float64) / n
+    z = (p_hat - p_h0) / error_estandar_proporcion(p_h0, n)
+    resultado = _prueba_z(z, alpha, cola)
+    resultado["proporcion_muestral"] = _escalar(p_hat)
+    return resultado
+
+
+@memoizar()
+def prueba_dos_medias(media_1, desviacion_1, n_1, media_2, desviacion_2, n_2, alpha, cola="bilateral"):
+    diferencia = np.asarray(media_1, dtype=np.float64) - media_2
+    error = error_estandar_diferencia_medias(np.square(desviacion_1), n_1, np.square(desviacion_2), n_2)
+    resultado = _prueba_z(diferencia / error, alpha, cola)
+    resultado["diferencia"] = _escalar(diferencia)
+    resultado["error_estandar"] = error
+    return resultado
+
+
+def _prueba_t(t, gl, alpha, cola):
+    p_valor = valor_p_t(t, gl, cola)
+    rechazar = np.asarray(p_valor) < alpha
+    return {
+        "estadistico": _escalar(t),
+        "p_valor": p_valor,
+        "critico": critico_t(1 - np.asarray(alpha, dtype=np.float64), gl, cola),
+        "gl": _escalar(gl),
+        "rechazar": bool(rechazar) if rechazar.ndim == 0 else rechazar,
+    }
+
+
+@memoizar()
+def prueba_t_media(media_muestral, media_h0, desviacion, n, alpha, cola="bilateral"):
+    """Prueba t de una muestra con la desviación muestral y n - 1 grados de libertad."""
+    _validar_positivo(np.asarray(n) - 1, "Se necesitan al menos dos observaciones.")
+    _validar_positivo(desviacion, "La Desviación Estándar debe ser mayor que cero.")
+    t = (np.asarray(media_muestral, dtype=np.float64) - media_h0) / error_estandar_media(desviacion, n)
+    return _prueba_t(t, np.asarray(n, dtype=np.float64) - 1, alpha, cola)
+
+
+@memoizar()
+def prueba_t_dos_medias(media_1, desviacion_1, n_1, media_2, desviacion_2, n_2, alpha, cola="bilateral"):
+    """Prueba t de Welch (varianzas distintas) con los grados de libertad de Welch-Satterthwaite."""
+    _validar_positivo(np.asarray(n_1) - 1, "Se necesitan al menos dos observaciones por muestra.")
+    _validar_positivo(np.asarray(n_2) - 1, "Se necesitan al menos dos observaciones por muestra.")
+    v_1 = np.square(np.asarray(desviacion_1, dtype=np.float64)) / n_1
+    v_2 = np.square(np.asarray(desviacion_2, dtype=np.float64)) / n_2
+    _validar_positivo(v_1 + v_2, "Las dos muestras no pueden tener varianza cero.")
+    gl = np.square(v_1 + v_2) / (np.square(v_1) / (np.asarray(n_1) - 1) + np.square(v_2) / (np.asarray(n_2) - 1))
+    diferencia = np.asarray(media_1, dtype=np.float64) - media_2
+    error = np.sqrt(v_1 + v_2)
+    resultado = _prueba_t(diferencia / error, gl, alpha, cola)
+    resultado["diferencia"] = _escalar(diferencia)
+    resultado["error_estandar"] = _escalar(error)
+    return resultado
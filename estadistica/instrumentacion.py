@@ -0,0 +1,267 @@
+"""
+Instrumentación ligera de las etapas de cálculo.
+
+medir(etapa) es un administrador de contexto (también sirve como
+decorador) que mide la duración de una etapa (lectura, limpieza, cálculo,
+dibujo...) y la memoria residente al terminarla. Cada medición se guarda en
+el registro del proceso y, si la página activó uno con activar_sesion(), en
+el registro de la sesión, así que las funciones del núcleo que se llaman
+desde una página quedan atribuidas a esa página y a esa sesión.
+
+Cada registro conserva, por página y etapa, las llamadas, los errores, el
+tiempo total y una ventana con las últimas duraciones para los percentiles.
+Se exporta en formato de texto de Prometheus (texto_prometheus) o como
+diccionario JSON (instantanea). Si se define ESTADISTICA_METRICAS_LOG, cada
+medición se agrega además como una línea JSON a ese archivo.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from .cache import info_caches
+
+try:
+    import resource
+except ImportError:
+    # Windows: solo se informa la memoria si el sistema tiene /proc
+    resource = None
+
+RUTA_LOG = os.environ.get("ESTADISTICA_METRICAS_LOG") or None
+VENTANA = 1024
+PERCENTILES = (50, 90, 99)
+# Leer la memoria cuesta unos 15 µs: en las etapas más cortas que esto no se lee
+MINIMO_MEMORIA = 0.001
+CLAVE_SESION = "_instrumentacion"
+
+_PAGINA_MEMORIA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_hilo = threading.local()
+_bloqueo_log = threading.Lock()
+
+
+def memoria_actual():
+    """Memoria residente del proceso en bytes (el pico si no se puede leer la actual; None si tampoco)."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGINA_MEMORIA
+    except (OSError, ValueError, IndexError):
+        return memoria_maxima()
+
+
+def memoria_maxima():
+    """Pico de memoria residente del proceso en bytes, o None."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la informa en KiB y macOS en bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class _Etapa:
+    __slots__ = ("llamadas", "errores", "total", "duraciones", "memoria")
+
+    def __init__(self, ventana):
+        self.llamadas = 0
+        self.errores = 0
+        self.total = 0.0
+        self.duraciones = deque(maxlen=ventana)
+        self.memoria = 0
+
+
+class RegistroTiempos:
+    """
+    Duraciones por (página, etapa) y contadores con nombre. Los percentiles
+    se calculan sobre las últimas `ventana` duraciones de cada etapa.
+    """
+
+    def __init__(self, ventana=VENTANA):
+        self.ventana = ventana
+        self.memoria_maxima = 0
+        self._etapas = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, pagina, etapa, segundos, error=False, memoria=None):
+        with self._lock:
+            datos = self._etapas.get((pagina, etapa))
+            if datos is None:
+                datos = self._etapas[(pagina, etapa)] = _Etapa(self.ventana)
+            datos.llamadas += 1
+            datos.errores += error
+            datos.total += segundos
+            datos.duraciones.append(segundos)
+            if memoria is not None:
+                datos.memoria = max(datos.memoria, memoria)
+                self.memoria_maxima = max(self.memoria_maxima, memoria)
+
+    def contar(self, nombre, cantidad=1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def contadores(self):
+        with self._lock:
+            return dict(self._contadores)
+
+    def resumen(self):
+        """Una fila por página y etapa, con tiempos en segundos y memoria en bytes."""
+        with self._lock:
+            etapas = [(clave, datos.llamadas, datos.errores, datos.total, np.array(datos.duraciones), datos.memoria)
+                      for clave, datos in sorted(self._etapas.items())]
+        filas = []
+        for (pagina, etapa), llamadas, errores, total, duraciones, memoria in etapas:
+            fila = {"pagina": pagina, "etapa": etapa, "llamadas": llamadas, "errores": errores, "total": total}
+            for percentil, valor in zip(PERCENTILES, np.percentile(duraciones, PERCENTILES)):
+                fila[f"p{percentil}"] = float(valor)
+            fila["maximo"] = float(duraciones.max())
+            fila["memoria_maxima"] = memoria
+            filas.append(fila)
+        return filas
+
+    def limpiar(self):
+        with self._lock:
+            self._etapas.clear()
+            self._contadores.clear()
+            self.memoria_maxima = 0
+
+
+registro = RegistroTiempos()
+
+
+def activar_sesion(estado, pagina):
+    """
+    Registro de la sesión guardado en `estado` (st.session_state o cualquier
+    diccionario; se crea la primera vez). Lo activa en el hilo actual junto
+    con el nombre de la página: las mediciones siguientes de este hilo se
+    guardan también ahí.
+    """
+    sesion = estado.get(CLAVE_SESION)
+    if sesion is None:
+        sesion = estado[CLAVE_SESION] = RegistroTiempos()
+    _hilo.sesion = sesion
+    _hilo.pagina = pagina
+    return sesion
+
+
+def sesion_activa():
+    """Registro de la sesión activado en el hilo actual, o None."""
+    return getattr(_hilo, "sesion", None)
+
+
+def _escribir_log(evento):
+    linea = json.dumps(evento, ensure_ascii=False) + "\n"
+    try:
+        with _bloqueo_log, open(RUTA_LOG, "a", encoding="utf-8") as log:
+            log.write(linea)
+    except OSError:
+        # El registro no debe interrumpir el cálculo
+        pass
+
+
+def registrar(etapa, segundos, pagina=None, error=False):
+    """
+    Guarda una duración ya medida en el registro del proceso, en el de la
+    sesión activa y en el log. `pagina` es la de activar_sesion() si no se
+    indica.
+    """
+    pagina = pagina if pagina is not None else getattr(_hilo, "pagina", "")
+    memoria = memoria_actual() if segundos >= MINIMO_MEMORIA else None
+    registro.registrar(pagina, etapa, segundos, error, memoria)
+    sesion = getattr(_hilo, "sesion", None)
+    if sesion is not None:
+        sesion.registrar(pagina, etapa, segundos, error, memoria)
+    if RUTA_LOG:
+        _escribir_log({"tiempo": time.time(), "pid": os.getpid(), "pagina": pagina, "etapa": etapa,
+                       "segundos": segundos, "error": error, "memoria": memoria})
+
+
+@contextmanager
+def medir(etapa, pagina=None):
+    """
+    Mide la etapa del bloque `with` (o de la función decorada) y la guarda
+    con registrar(). Una excepción se cuenta como error de la etapa y se
+    vuelve a lanzar.
+    """
+    error = False
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        registrar(etapa, time.perf_counter() - inicio, pagina, error)
+
+
+def contar(nombre, cantidad=1):
+    """Suma `cantidad` al contador `nombre` del proceso y de la sesión activa."""
+    registro.contar(nombre, cantidad)
+    sesion = getattr(_hilo, "sesion", None)
+    if sesion is not None:
+        sesion.contar(nombre, cantidad)
+
+
+def instantanea(fuente=registro):
+    """Estado de un registro (por defecto el del proceso) como diccionario serializable en JSON."""
+    return {
+        "tiempo": time.time(),
+        "pid": os.getpid(),
+        "memoria_actual": memoria_actual(),
+        "memoria_maxima": memoria_maxima(),
+        # Pico de la memoria residente observada al terminar las etapas de este registro
+        "memoria_maxima_etapas": fuente.memoria_maxima,
+        "etapas": fuente.resumen(),
+        "contadores": fuente.contadores(),
+        "caches": info_caches(),
+    }
+
+
+def _etiquetas(**valores):
+    escapados = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in valores.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(valores, escapados)) + "}"
+
+
+def texto_prometheus(fuente=registro):
+    """Métricas de un registro (por defecto el del proceso) en el formato de texto de Prometheus."""
+    lineas = [
+        "# HELP estadistica_etapa_segundos Duración de cada etapa (cuantiles de las últimas mediciones).",
+        "# TYPE estadistica_etapa_segundos summary",
+    ]
+    filas = fuente.resumen()
+    for fila in filas:
+        for percentil in PERCENTILES:
+            etiquetas = _etiquetas(pagina=fila["pagina"], etapa=fila["etapa"], quantile=percentil / 100)
+            lineas.append(f"estadistica_etapa_segundos{etiquetas} {fila[f'p{percentil}']!r}")
+        etiquetas = _etiquetas(pagina=fila["pagina"], etapa=fila["etapa"])
+        lineas.append(f"estadistica_etapa_segundos_sum{etiquetas} {fila['total']!r}")
+        lineas.append(f"estadistica_etapa_segundos_count{etiquetas} {fila['llamadas']}")
+
+    lineas += ["# HELP estadistica_etapa_errores_total Etapas que terminaron con una excepción.",
+               "# TYPE estadistica_etapa_errores_total counter"]
+    lineas += [f"estadistica_etapa_errores_total{_etiquetas(pagina=f['pagina'], etapa=f['etapa'])} {f['errores']}"
+               for f in filas]
+
+    lineas += ["# HELP estadistica_eventos_total Contadores de las etapas (valores leídos, bloques limpiados...).",
+               "# TYPE estadistica_eventos_total counter"]
+    lineas += [f"estadistica_eventos_total{_etiquetas(nombre=nombre)} {cantidad}"
+               for nombre, cantidad in sorted(fuente.contadores().items())]
+
+    for nombre, valor, ayuda in (("memoria_residente_bytes", memoria_actual(), "Memoria residente del proceso."),
+                                 ("memoria_maxima_bytes", memoria_maxima(), "Pico de memoria residente del proceso.")):
+        if valor is not None:
+            lineas += [f"# HELP estadistica_{nombre} {ayuda}", f"# TYPE estadistica_{nombre} gauge",
+                       f"estadistica_{nombre} {valor}"]
+
+    caches = info_caches()
+    for campo, nombre, tipo in (("aciertos", "cache_aciertos_total", "counter"),
+                                ("fallos", "cache_fallos_total", "counter"),
+                                ("tamano", "cache_elementos", "gauge"),
+                                ("bytes", "cache_bytes", "gauge")):
+        lineas.append(f"# TYPE estadistica_{nombre} {tipo}")
+        lineas += [f"estadistica_{nombre}{_etiquetas(cache=cache)} {info.get(campo, 0)}"
+                   for cache, info in sorted(caches.items())]
+    return "\n".join(lineas) + "\n"
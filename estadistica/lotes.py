@@ -0,0 +1,180 @@
+"""
+Pruebas de hipótesis en lote.
+
+Evalúa una prueba Z o t por fila de una tabla con las fórmulas vectorizadas
+de inferencia.py (una sola llamada a ndtr o stdtr para todas las filas) y
+agrega los p-valores corregidos por comparaciones múltiples. Las filas con
+datos inválidos (n <= 0, desviación <= 0, éxitos fuera de [0, n], α fuera
+de (0, 1), tipo de prueba no reconocido, ...) quedan con NaN en lugar de
+detener el lote.
+"""
+import numpy as np
+
+from .inferencia import (
+    cola_desde_etiqueta,
+    critico_normal,
+    critico_t,
+    valor_p_normal,
+    valor_p_t,
+)
+
+CORRECCIONES = ("bonferroni", "holm", "bh")
+
+DISTRIBUCIONES = ("z", "t")
+
+# Columnas obligatorias de cada tipo de prueba; "alpha" y "cola" son
+# opcionales y, si faltan, se usan los valores por defecto de pruebas_lote.
+COLUMNAS_LOTE = {
+    "media": ("media_muestral", "media_h0", "desviacion", "n"),
+    "proporcion": ("exitos", "n", "p_h0"),
+    "dos_medias": ("media_1", "desviacion_1", "n_1", "media_2", "desviacion_2", "n_2"),
+}
+
+_SIMBOLOS_COLA = {"≠": "bilateral", "!=": "bilateral", "<>": "bilateral", ">": "derecha", "<": "izquierda"}
+
+
+def _traducir_cola(etiqueta):
+    try:
+        return _SIMBOLOS_COLA.get(etiqueta) or cola_desde_etiqueta(etiqueta)
+    except ValueError:
+        return None
+
+
+def normalizar_colas(colas, defecto="bilateral"):
+    """
+    Traduce una columna de tipos de prueba ("bilateral", "Cola derecha (>)",
+    "<", ...) a COLAS. Las celdas vacías toman `defecto` y las etiquetas no
+    reconocidas quedan como NaN (la fila es inválida).
+    """
+    import pandas as pd
+
+    valores = pd.Series(colas, dtype=object)
+    vacias = valores.isna() | (valores.astype(str).str.strip() == "")
+    valores = valores.where(~vacias, defecto).astype(str).str.strip()
+    # Se traducen solo los valores distintos, no cada fila
+    traduccion = {v: _traducir_cola(v) for v in valores.unique()}
+    return valores.map(traduccion).to_numpy(dtype=object)
+
+
+def corregir_p_valores(p_valores, metodo):
+    """
+    P-valores ajustados por comparaciones múltiples: Bonferroni, Holm
+    (escalonado) o Benjamini-Hochberg ("bh", tasa de falsos descubrimientos).
+    Los NaN no cuentan como pruebas y se conservan.
+    """
+    if metodo not in CORRECCIONES:
+        raise ValueError(f"Corrección no válida: se esperaba una de {CORRECCIONES}.")
+    p_valores = np.asarray(p_valores, dtype=np.float64)
+    ajustados = np.full(p_valores.shape, np.nan)
+    validos = np.flatnonzero(~np.isnan(p_valores))
+    m = validos.size
+    if m == 0:
+        return ajustados
+    if metodo == "bonferroni":
+        ajustados[validos] = np.minimum(p_valores[validos] * m, 1)
+        return ajustados
+
+    orden = validos[np.argsort(p_valores[validos], kind="stable")]
+    ordenados = p_valores[orden]
+    rango = np.arange(1, m + 1)
+    if metodo == "holm":
+        corregidos = np.maximum.accumulate((m - rango + 1) * ordenados)
+    else:
+        corregidos = np.minimum.accumulate((m / rango * ordenados)[::-1])[::-1]
+    ajustados[orden] = np.minimum(corregidos, 1)
+    return ajustados
+
+
+def _columna(tabla, nombre):
+    import pandas as pd
+
+    # Copia escribible: las filas inválidas se marcan con NaN
+    return np.array(pd.to_numeric(tabla[nombre], errors="coerce"), dtype=np.float64)
+
+
+def _estadistico(c, tipo, distribucion):
+    """Devuelve (estadístico, error estándar, grados de libertad) por fila."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if tipo == "media":
+            invalida = (c["n"] <= 0) | (c["desviacion"] <= 0)
+            error = c["desviacion"] / np.sqrt(c["n"])
+            estadistico = (c["media_muestral"] - c["media_h0"]) / error
+            gl = c["n"] - 1
+        elif tipo == "proporcion":
+            invalida = ((c["n"] <= 0) | (c["p_h0"] <= 0) | (c["p_h0"] >= 1)
+                        | (c["exitos"] < 0) | (c["exitos"] > c["n"]))
+            error = np.sqrt(c["p_h0"] * (1 - c["p_h0"]) / c["n"])
+            estadistico = (c["exitos"] / c["n"] - c["p_h0"]) / error
+            gl = np.full(error.shape, np.inf)
+        else:
+            invalida = (c["n_1"] <= 0) | (c["n_2"] <= 0) | (c["desviacion_1"] <= 0) | (c["desviacion_2"] <= 0)
+            v_1 = np.square(c["desviacion_1"]) / c["n_1"]
+            v_2 = np.square(c["desviacion_2"]) / c["n_2"]
+            error = np.sqrt(v_1 + v_2)
+            estadistico = (c["media_1"] - c["media_2"]) / error
+            # Grados de libertad de Welch-Satterthwaite
+            gl = np.square(v_1 + v_2) / (np.square(v_1) / (c["n_1"] - 1) + np.square(v_2) / (c["n_2"] - 1))
+    if distribucion == "t":
+        invalida |= ~(gl > 0)
+    estadistico[invalida] = np.nan
+    error[invalida] = np.nan
+    return estadistico, error, gl
+
+
+def pruebas_lote(tabla, tipo, distribucion="z", alpha=0.05, cola="bilateral"):
+    """
+    Evalúa una prueba por fila de `tabla` (DataFrame con las columnas de
+    COLUMNAS_LOTE[tipo] y, opcionalmente, "alpha" y "cola"). Con
+    `distribucion="t"` (solo medias) la desviación es la muestral y se usan
+    n - 1 o los grados de libertad de Welch.
+
+    Devuelve un DataFrame con el estadístico, el p-valor, el valor crítico y
+    la decisión de cada fila, más el p-valor corregido y la decisión con cada
+    método de CORRECCIONES.
+    """
+    if tipo not in COLUMNAS_LOTE:
+        raise ValueError(f"Tipo de prueba no válido: se esperaba uno de {tuple(COLUMNAS_LOTE)}.")
+    if distribucion not in DISTRIBUCIONES or (distribucion == "t" and tipo == "proporcion"):
+        raise ValueError("La prueba de proporciones solo admite la distribución Z.")
+
+    tabla = tabla.rename(columns=lambda c: str(c).strip().lower())
+    faltantes = [c for c in COLUMNAS_LOTE[tipo] if c not in tabla.columns]
+    if faltantes:
+        raise ValueError(f"Faltan las columnas: {', '.join(faltantes)}.")
+
+    columnas = {nombre: _columna(tabla, nombre) for nombre in COLUMNAS_LOTE[tipo]}
+    filas = len(tabla)
+    alphas = _columna(tabla, "alpha") if "alpha" in tabla.columns else np.full(filas, float(alpha))
+    alphas[(alphas <= 0) | (alphas >= 1)] = np.nan
+    colas = normalizar_colas(tabla["cola"], cola) if "cola" in tabla.columns else np.full(filas, cola, dtype=object)
+    # Las filas con un tipo de prueba no reconocido se evalúan con la cola
+    # por defecto y después quedan sin resultado
+    cola_invalida = np.array([not isinstance(c, str) for c in colas], dtype=bool)
+    calculo_colas = np.where(cola_invalida, cola, colas)
+
+    estadistico, error, gl = _estadistico(columnas, tipo, distribucion)
+    estadistico[cola_invalida] = np.nan
+    error[cola_invalida] = np.nan
+    if distribucion == "t":
+        p_valor = valor_p_t.sin_cache(estadistico, gl, calculo_colas)
+        critico = critico_t.sin_cache(1 - alphas, np.where(gl > 0, gl, np.nan), calculo_colas)
+    else:
+        p_valor = valor_p_normal.sin_cache(estadistico, calculo_colas)
+        critico = critico_normal.sin_cache(alphas, calculo_colas)
+    critico[cola_invalida] = np.nan
+
+    resultado = tabla.copy()
+    resultado["cola"] = colas
+    resultado["alpha"] = alphas
+    resultado["error_estandar"] = error
+    if distribucion == "t":
+        resultado["gl"] = gl
+    resultado["estadistico"] = estadistico
+    resultado["p_valor"] = p_valor
+    resultado["critico"] = critico
+    resultado["rechazar"] = p_valor < alphas
+    for metodo in CORRECCIONES:
+        ajustados = corregir_p_valores(p_valor, metodo)
+        resultado[f"p_{metodo}"] = ajustados
+        resultado[f"rechazar_{metodo}"] = ajustados < alphas
+    return resultado
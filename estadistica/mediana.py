@@ -0,0 +1,69 @@
+"""
+Cálculo de la mediana: exacta por selección o aproximada con un sketch KLL.
+
+- Exacta: np.partition sobre el propio arreglo (sin la copia que hace
+  np.median) cuando el llamador permite reordenarlo.
+- Aproximada: sketch KLL de streaming.py con `k` elegido a partir del error
+  de rango deseado. Los sketches se pueden combinar, así que la mediana de
+  un archivo procesado por bloques, o de varios archivos, se obtiene sin
+  tener todos los valores en memoria.
+"""
+import numpy as np
+
+from .streaming import TAMANO_BLOQUE, SketchCuantiles
+
+METODOS = ("exacta", "aproximada")
+
+ERROR_POR_DEFECTO = 0.01
+
+
+def mediana_exacta(valores, sobrescribir=False):
+    """
+    Mediana exacta con np.partition. Con `sobrescribir=True` el arreglo se
+    reordena en su lugar (sus valores no cambian); si no, se trabaja sobre
+    una copia.
+    """
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    if valores.size == 0:
+        return np.nan
+    if not (sobrescribir and valores.flags.writeable):
+        valores = valores.copy()
+    mitad = valores.size // 2
+    valores.partition(mitad)
+    if valores.size % 2:
+        return float(valores[mitad])
+    # Tras la partición, el otro valor central es el máximo de la mitad inferior
+    return float((valores[:mitad].max() + valores[mitad]) / 2)
+
+
+def sketch_mediana(bloques, error=ERROR_POR_DEFECTO, semilla=None):
+    """
+    Sketch KLL alimentado bloque a bloque. Los sketches de varios archivos
+    se unen con `.combinar()` y la mediana se obtiene con `.mediana()`.
+    """
+    sketch = SketchCuantiles.desde_error(error, semilla)
+    for bloque in bloques:
+        sketch.agregar(bloque)
+    return sketch
+
+
+def mediana_aproximada(valores, error=ERROR_POR_DEFECTO, semilla=None):
+    """
+    Devuelve (mediana, error) con un error de rango de a lo sumo `error`
+    (fracción de n). El error devuelto es 0 si el sketch no llegó a
+    compactar, es decir, si la mediana es exacta.
+    """
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    bloques = (valores[i:i + TAMANO_BLOQUE] for i in range(0, valores.size, TAMANO_BLOQUE))
+    sketch = sketch_mediana(bloques, error, semilla)
+    return sketch.mediana(), sketch.error
+
+
+def calcular_mediana(valores, metodo="exacta", error=ERROR_POR_DEFECTO, sobrescribir=False):
+    """Devuelve (mediana, error de rango); el error es 0 para la exacta."""
+    if metodo not in METODOS:
+        raise ValueError(f"Método de mediana no válido: se esperaba uno de {METODOS}.")
+    if metodo == "aproximada":
+        # Semilla fija para que el resultado guardado en caché sea reproducible
+        return mediana_aproximada(valores, error, semilla=0)
+    return mediana_exacta(valores, sobrescribir), 0.0
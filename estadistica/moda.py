@@ -0,0 +1,180 @@
+"""
+Motor de cálculo de la moda.
+
+- Datos enteros en un rango acotado: conteo directo con np.bincount, sin
+  ordenar.
+- Datos discretos: un solo ordenamiento y conteo de rachas de valores
+  iguales.
+- Datos continuos (ningún valor se repite): pico del histograma o de una
+  estimación de densidad por kernel (KDE) calculada sobre el histograma.
+
+Todas las funciones devuelven todas las modas (distribuciones multimodales)
+en orden creciente; la primera coincide con la de scipy.stats.mode en datos
+discretos.
+"""
+import numpy as np
+
+METODOS = ("auto", "conteo", "histograma", "kde")
+
+# Rango máximo (max - min) para usar np.bincount con datos enteros
+RANGO_MAXIMO_BINCOUNT = 10_000_000
+BLOQUE_BINCOUNT = 65_536
+# Por debajo de este tamaño no tiene sentido estimar una densidad
+MINIMO_CONTINUO = 30
+MAXIMO_CLASES = 1_000_000
+
+
+def _resultado(modas, frecuencia, metodo, ancho_clase=None):
+    modas = np.asarray(modas, dtype=np.float64)
+    return {
+        "moda": float(modas[0]) if modas.size else np.nan,
+        "modas": modas,
+        "frecuencia": int(frecuencia),
+        "metodo": metodo,
+        "ancho_clase": ancho_clase,
+    }
+
+
+def conteo_enteros(valores):
+    """
+    Frecuencias de datos enteros con np.bincount. Devuelve (mínimo, conteos)
+    o None si algún valor no es entero o el rango es demasiado grande. Con
+    pocas clases se recorre por bloques que caben en la caché del procesador.
+    """
+    # Una muestra basta para descartar rápido los datos con decimales
+    muestra = valores[::max(1, valores.size // 1000)]
+    if not np.array_equal(np.floor(muestra), muestra):
+        return None
+    minimo, maximo = valores.min(), valores.max()
+    if maximo - minimo > RANGO_MAXIMO_BINCOUNT or max(abs(minimo), abs(maximo)) > 2 ** 53:
+        return None
+
+    minimo = int(minimo)
+    clases = int(maximo) - minimo + 1
+    bloque = BLOQUE_BINCOUNT if clases <= BLOQUE_BINCOUNT else valores.size
+    conteos = np.zeros(clases, dtype=np.int64)
+    for inicio in range(0, valores.size, bloque):
+        parte = valores[inicio:inicio + bloque]
+        enteros = parte.astype(np.int64)
+        if not np.array_equal(enteros, parte):
+            return None
+        if minimo != 0:
+            enteros -= minimo
+        conteos += np.bincount(enteros, minlength=clases)
+    return minimo, conteos
+
+
+def moda_enteros(minimo, conteos):
+    """Moda a partir de las frecuencias de conteo_enteros, sin ordenar."""
+    maximo = conteos.max()
+    return _resultado(np.flatnonzero(conteos == maximo) + minimo, maximo, "bincount")
+
+
+def moda_conteo(ordenados):
+    """Moda de datos ya ordenados a partir del largo de cada racha de valores iguales."""
+    distintos = ordenados[1:] != ordenados[:-1]
+    if distintos.all():
+        # Ningún valor se repite: se evita construir las rachas
+        return _resultado(ordenados, 1, "conteo")
+    posiciones = np.concatenate(([0], np.flatnonzero(distintos) + 1))
+    largos = np.diff(np.append(posiciones, ordenados.size))
+    maximo = largos.max()
+    return _resultado(ordenados[posiciones[largos == maximo]], maximo, "conteo")
+
+
+def _cuantil_ordenado(ordenados, q):
+    posicion = q * (ordenados.size - 1)
+    i = int(posicion)
+    j = min(i + 1, ordenados.size - 1)
+    return ordenados[i] + (posicion - i) * (ordenados[j] - ordenados[i])
+
+
+def ancho_freedman_diaconis(valores, ordenados=False):
+    """Ancho de clase de Freedman-Diaconis: 2·IQR / n^(1/3)."""
+    if ordenados:
+        q25, q75 = _cuantil_ordenado(valores, 0.25), _cuantil_ordenado(valores, 0.75)
+    else:
+        q25, q75 = np.percentile(valores, [25, 75])
+    ancho = 2 * (q75 - q25) / np.cbrt(valores.size)
+    if ancho <= 0:
+        ancho = (valores.max() - valores.min()) / np.sqrt(valores.size)
+    return float(ancho) if ancho > 0 else 1.0
+
+
+def _histograma(valores, ancho_clase, ordenados=False):
+    minimo = valores[0] if ordenados else valores.min()
+    maximo = valores[-1] if ordenados else valores.max()
+    if (maximo - minimo) / ancho_clase >= MAXIMO_CLASES:
+        # Ancho demasiado pequeño para el rango: se limita el número de clases
+        ancho_clase = (maximo - minimo) / (MAXIMO_CLASES - 1)
+    clases = int(np.ceil((maximo - minimo) / ancho_clase)) + 1
+    if ordenados:
+        # Con los datos ordenados basta una búsqueda binaria por borde de clase
+        bordes = np.searchsorted(valores, minimo + np.arange(1, clases) * ancho_clase, side="left")
+        return minimo, ancho_clase, np.diff(bordes, prepend=0, append=valores.size)
+    indices = ((valores - minimo) / ancho_clase).astype(np.int64)
+    return minimo, ancho_clase, np.bincount(indices, minlength=clases)
+
+
+def moda_histograma(valores, ancho_clase=None, ordenados=False):
+    """Centro de la clase (o clases empatadas) con mayor frecuencia."""
+    ancho_clase = ancho_clase or ancho_freedman_diaconis(valores, ordenados)
+    minimo, ancho_clase, conteos = _histograma(valores, ancho_clase, ordenados)
+    maximo = conteos.max()
+    centros = minimo + (np.flatnonzero(conteos == maximo) + 0.5) * ancho_clase
+    return _resultado(centros, maximo, "histograma", ancho_clase)
+
+
+def moda_kde(valores, ancho_clase=None, umbral_picos=0.5):
+    """
+    Picos de una densidad por kernel gaussiano (ancho de banda de Scott)
+    calculada sobre el histograma. Se reportan los máximos locales con al
+    menos `umbral_picos` veces la altura del pico principal.
+    """
+    ancho_clase = ancho_clase or ancho_freedman_diaconis(valores) / 4
+    minimo, ancho_clase, conteos = _histograma(valores, ancho_clase)
+
+    banda = 1.06 * np.std(valores) * valores.size ** (-1 / 5)
+    sigma = max(banda / ancho_clase, 1e-9)
+    radio = int(np.ceil(4 * sigma))
+    kernel = np.exp(-0.5 * (np.arange(-radio, radio + 1) / sigma) ** 2)
+    densidad = np.convolve(conteos.astype(np.float64), kernel / kernel.sum())[radio:radio + conteos.size]
+
+    relleno = np.concatenate(([-np.inf], densidad, [-np.inf]))
+    locales = (relleno[1:-1] >= relleno[:-2]) & (relleno[1:-1] > relleno[2:])
+    picos = np.flatnonzero(locales & (densidad >= umbral_picos * densidad.max()))
+    # El pico principal va primero, el resto en orden creciente
+    principal = picos[np.argmax(densidad[picos])]
+    picos = np.concatenate(([principal], picos[picos != principal]))
+    centros = minimo + (picos + 0.5) * ancho_clase
+    return _resultado(centros, conteos[principal], "kde", ancho_clase)
+
+
+def calcular_moda(valores, metodo="auto", ancho_clase=None):
+    """
+    Calcula la moda con el método indicado. En modo "auto" se usa bincount
+    para enteros, conteo de rachas para datos discretos y el histograma
+    cuando ningún valor se repite (datos continuos).
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método de moda no válido: se esperaba uno de {METODOS}.")
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    if valores.size == 0:
+        return _resultado([], 0, metodo)
+    if metodo == "histograma":
+        return moda_histograma(valores, ancho_clase)
+    if metodo == "kde":
+        return moda_kde(valores, ancho_clase)
+
+    conteo = conteo_enteros(valores)
+    if conteo is not None:
+        resultado = moda_enteros(*conteo)
+        ordenados = False
+    else:
+        valores = np.sort(valores)
+        resultado = moda_conteo(valores)
+        ordenados = True
+
+    if metodo == "auto" and resultado["frecuencia"] == 1 and valores.size >= MINIMO_CONTINUO:
+        return moda_histograma(valores, ancho_clase, ordenados)
+    return resultado
@@ -0,0 +1,44 @@
+"""
+Pruebas de hipótesis a partir de los datos crudos.
+
+Cada muestra se resume en una sola pasada por bloques con SumasSuficientes
+(n, suma y suma de cuadrados) y las pruebas se calculan a partir de esos
+resúmenes con las fórmulas de inferencia.py, sin tener los datos en memoria.
+"""
+import numpy as np
+
+from .inferencia import prueba_proporcion, prueba_t_dos_medias, prueba_t_media
+
+
+def _desviacion(sumas):
+    return float(np.sqrt(sumas.varianza(ddof=1)))
+
+
+def prueba_una_muestra(sumas, media_h0, alpha, cola="bilateral"):
+    """Prueba t de una muestra para la media."""
+    resultado = dict(prueba_t_media(sumas.media, media_h0, _desviacion(sumas), sumas.n, alpha, cola))
+    resultado.update(n=sumas.n, media=sumas.media, desviacion=_desviacion(sumas))
+    return resultado
+
+
+def prueba_dos_muestras(sumas_1, sumas_2, alpha, cola="bilateral"):
+    """Prueba t de Welch para la diferencia de medias de dos muestras independientes."""
+    resultado = dict(prueba_t_dos_medias(sumas_1.media, _desviacion(sumas_1), sumas_1.n,
+                                         sumas_2.media, _desviacion(sumas_2), sumas_2.n, alpha, cola))
+    resultado.update(n=(sumas_1.n, sumas_2.n), media=(sumas_1.media, sumas_2.media),
+                     desviacion=(_desviacion(sumas_1), _desviacion(sumas_2)))
+    return resultado
+
+
+def prueba_pareada(sumas_diferencias, diferencia_h0, alpha, cola="bilateral"):
+    """Prueba t pareada: prueba t de una muestra sobre las diferencias por fila."""
+    return prueba_una_muestra(sumas_diferencias, diferencia_h0, alpha, cola)
+
+
+def prueba_proporcion_muestra(sumas, p_h0, alpha, cola="bilateral"):
+    """Prueba Z para la proporción de unos en una columna de ceros y unos."""
+    if not sumas.binaria:
+        raise ValueError("La columna debe contener solo ceros y unos (1 = éxito).")
+    resultado = dict(prueba_proporcion(sumas.suma, sumas.n, p_h0, alpha, cola))
+    resultado.update(n=sumas.n, exitos=int(sumas.suma))
+    return resultado
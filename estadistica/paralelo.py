@@ -0,0 +1,47 @@
+"""
+Grupo de procesos compartido por los motores de remuestreo (bootstrap y
+permutaciones).
+
+Se usa el método forkserver: los procesos hijos no copian el estado de los
+hilos del servidor de Streamlit, cosa que sí haría fork.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Por debajo de este trabajo (valores generados o leídos por todas las
+# tareas, por ejemplo remuestras x n) no conviene levantar procesos
+MINIMO_PARALELO = 50_000_000
+
+# Datos que el grupo envió a este proceso hijo al crearlo
+_compartidos = None
+
+
+def procesos_disponibles():
+    """Procesos del grupo: ESTADISTICA_PROCESOS o los núcleos asignados al proceso."""
+    configurados = int(os.environ.get("ESTADISTICA_PROCESOS", "0"))
+    if configurados > 0:
+        return configurados
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _recibir_compartidos(datos):
+    global _compartidos
+    _compartidos = datos
+
+
+def datos_compartidos():
+    """En un proceso hijo, los `compartidos` con que se creó su grupo."""
+    return _compartidos
+
+
+def grupo_procesos(procesos, compartidos=None):
+    """
+    ProcessPoolExecutor con `procesos` procesos; se usa como administrador de
+    contexto. `compartidos` se envía una sola vez a cada proceso al crearlo
+    (no con cada tarea) y las tareas lo leen con datos_compartidos().
+    """
+    return ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("forkserver"),
+                               initializer=_recibir_compartidos, initargs=(compartidos,))
@@ -0,0 +1,228 @@
+"""
+Prueba de permutación para comparar dos muestras (diferencia de medias,
+medianas o proporciones).
+
+- Exacta: con datos de ceros y unos la diferencia de proporciones solo
+  depende de los éxitos de la primera muestra, que bajo H₀ siguen una
+  distribución hipergeométrica (prueba exacta de Fisher). Con muestras
+  pequeñas se recorren todas las particiones posibles.
+- Monte Carlo: las dos muestras se concatenan una sola vez y cada bloque
+  baraja en su lugar la misma matriz de índices (permutaciones x N), sin
+  copiar los datos. Los bloques se reparten en tareas con semillas de
+  SeedSequence.spawn, en un grupo de procesos si el trabajo es grande, y
+  se detiene en cuanto el error de Monte Carlo del p-valor baja de
+  `error_maximo` y ya se vieron MINIMO_EXTREMOS permutaciones tan extremas
+  como la observada (error relativo de un 10%), así un p-valor pequeño no
+  se corta en unas pocas permutaciones.
+"""
+import itertools
+import math
+import time
+
+import numpy as np
+from scipy.special import gammaln
+
+from .bootstrap import MAX_BYTES_BLOQUE
+from .cache import memoizar
+from .inferencia import COLAS
+from .paralelo import MINIMO_PARALELO, datos_compartidos, grupo_procesos, procesos_disponibles
+
+ESTADISTICOS = ("media", "mediana")
+
+PERMUTACIONES_POR_DEFECTO = 100_000
+PERMUTACIONES_POR_TAREA = 2_000
+MINIMO_PERMUTACIONES = 1_000
+MINIMO_EXTREMOS = 100
+ERROR_POR_DEFECTO = 0.001
+# Hasta esta cantidad de particiones posibles (y de valores en total) la
+# prueba es exacta
+MAXIMO_EXACTO = 100_000
+MAXIMO_VALORES_EXACTO = 64
+
+
+def _mediana_filas(matriz):
+    mitad = matriz.shape[1] // 2
+    if matriz.shape[1] % 2:
+        return np.partition(matriz, mitad, axis=1)[:, mitad]
+    particion = np.partition(matriz, (mitad - 1, mitad), axis=1)
+    return (particion[:, mitad - 1] + particion[:, mitad]) / 2
+
+
+def _diferencias(datos, ordenes, n_1, estadistico):
+    """Diferencia del estadístico para cada fila de `ordenes` (la primera muestra son sus n_1 primeros índices)."""
+    if estadistico == "media":
+        suma_1 = datos[ordenes[:, :n_1]].sum(axis=1)
+        return suma_1 / n_1 - (datos.sum() - suma_1) / (datos.size - n_1)
+    matriz = datos[ordenes]
+    return _mediana_filas(matriz[:, :n_1]) - _mediana_filas(matriz[:, n_1:])
+
+
+def _estadistico(muestra_1, muestra_2, estadistico):
+    funcion = np.mean if estadistico == "media" else np.median
+    return float(funcion(muestra_1) - funcion(muestra_2))
+
+
+def _conteos(diferencias, observado):
+    # Tolerancia relativa para que los empates numéricos cuenten como iguales
+    gamma = abs(observado) * 1e-12
+    return np.count_nonzero(diferencias <= observado + gamma), np.count_nonzero(diferencias >= observado - gamma)
+
+
+def _p_valor(menores, mayores, total, cola, ajuste):
+    p_izquierda = (menores + ajuste) / (total + ajuste)
+    p_derecha = (mayores + ajuste) / (total + ajuste)
+    if cola == "izquierda":
+        return p_izquierda
+    if cola == "derecha":
+        return p_derecha
+    # Bilateral: el doble de la cola menor, como scipy.stats.permutation_test
+    # (con datos 0/1 puede diferir del bilateral de fisher_exact)
+    return min(1.0, 2 * min(p_izquierda, p_derecha))
+
+
+def _tarea(datos, n_1, estadistico, observado, permutaciones, semilla):
+    """Cuenta las permutaciones con diferencia <= y >= la observada."""
+    rng = np.random.default_rng(semilla)
+    total = datos.size
+    bytes_permutacion = total * (4 if estadistico == "media" else 12)
+    bloque = int(min(permutaciones, max(1, MAX_BYTES_BLOQUE // bytes_permutacion)))
+    # Una sola matriz de índices que se vuelve a barajar en cada bloque
+    ordenes = np.tile(np.arange(total, dtype=np.int32), (bloque, 1))
+    menores = mayores = 0
+    for inicio in range(0, permutaciones, bloque):
+        filas = ordenes[:min(bloque, permutaciones - inicio)]
+        rng.permuted(filas, axis=1, out=filas)
+        m, M = _conteos(_diferencias(datos, filas, n_1, estadistico), observado)
+        menores += m
+        mayores += M
+    return menores, mayores
+
+
+def _tarea_compartida(permutaciones, semilla):
+    # Los datos llegan una vez por proceso, con el grupo; cada tarea recibe solo su tamaño y su semilla
+    return _tarea(*datos_compartidos(), permutaciones, semilla)
+
+
+def _hipergeometrica(soporte, n_1, n_2, exitos):
+    """
+    Probabilidades hipergeométricas de cada valor del soporte completo:
+    proporcionales a C(n_1, k)·C(n_2, exitos - k), normalizadas para sumar 1.
+    """
+    def log_comb(n, k):
+        return gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+
+    logaritmos = log_comb(n_1, soporte) + log_comb(n_2, exitos - soporte)
+    probabilidades = np.exp(logaritmos - logaritmos.max())
+    return probabilidades / probabilidades.sum()
+
+
+def _exacta_hipergeometrica(muestra_1, muestra_2, cola):
+    """Prueba exacta de Fisher para la diferencia de proporciones de datos 0/1."""
+    n_1, n_2 = muestra_1.size, muestra_2.size
+    exitos = int(muestra_1.sum() + muestra_2.sum())
+    observado = int(muestra_1.sum())
+    soporte = np.arange(max(0, exitos - n_2), min(exitos, n_1) + 1)
+    diferencias = soporte / n_1 - (exitos - soporte) / n_2
+    probabilidades = _hipergeometrica(soporte, n_1, n_2, exitos)
+    diferencia = observado / n_1 - (exitos - observado) / n_2
+    menores = probabilidades[diferencias <= diferencia + 1e-12].sum()
+    mayores = probabilidades[diferencias >= diferencia - 1e-12].sum()
+    # Se evalúa un valor por cantidad posible de éxitos en la primera muestra
+    return _p_valor(menores, mayores, 1.0, cola, 0), soporte.size
+
+
+def _exacta_enumerada(datos, n_1, estadistico, observado, cola):
+    """Recorre todas las formas de elegir la primera muestra."""
+    total = datos.size
+    combinaciones = math.comb(total, n_1)
+    elegidos = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(total), n_1)),
+                           dtype=np.int32, count=combinaciones * n_1).reshape(combinaciones, n_1)
+    primera = np.zeros((combinaciones, total), dtype=bool)
+    np.put_along_axis(primera, elegidos, True, axis=1)
+    # Orden estable: primero los elegidos, después el resto
+    ordenes = np.argsort(~primera, axis=1, kind="stable").astype(np.int32)
+    menores, mayores = _conteos(_diferencias(datos, ordenes, n_1, estadistico), observado)
+    return _p_valor(menores, mayores, combinaciones, cola, 0), combinaciones
+
+
+def _binarias(*muestras):
+    return all(np.isin(m, (0, 1)).all() for m in muestras)
+
+
+@memoizar(maxsize=16)
+def prueba_permutacion(muestras, estadistico="media", cola="bilateral", permutaciones=PERMUTACIONES_POR_DEFECTO,
+                       error_maximo=ERROR_POR_DEFECTO, semilla=0, procesos=None):
+    """
+    Prueba de permutación de H₀: las dos muestras vienen de la misma
+    distribución, con la diferencia (primera - segunda) de medias o medianas
+    como estadístico. Con Monte Carlo se usan a lo sumo `permutaciones` y se
+    para antes si el error estándar del p-valor baja de `error_maximo` y ya
+    hubo MINIMO_EXTREMOS permutaciones en la cola del p-valor.
+
+    Devuelve un diccionario con el estadístico observado, el p-valor, su
+    error de Monte Carlo (0 si es exacto), las permutaciones usadas, el
+    método, los segundos y las permutaciones por segundo. Los tiempos son
+    los del cálculo original: una llamada repetida devuelve el resultado
+    memoizado con los mismos tiempos.
+    """
+    if estadistico not in ESTADISTICOS:
+        raise ValueError(f"Estadístico no válido: se esperaba uno de {ESTADISTICOS}.")
+    if cola not in COLAS:
+        raise ValueError(f"Tipo de prueba no válido: se esperaba uno de {COLAS}.")
+    muestra_1, muestra_2 = (np.asarray(m, dtype=np.float64).ravel() for m in muestras)
+    if muestra_1.size < 1 or muestra_2.size < 1 or muestra_1.size + muestra_2.size < 3:
+        raise ValueError("Cada muestra necesita al menos un valor y en total al menos tres.")
+
+    inicio = time.perf_counter()
+    observado = _estadistico(muestra_1, muestra_2, estadistico)
+    datos = np.concatenate((muestra_1, muestra_2))
+    n_1 = muestra_1.size
+    resultado = {"estadistico": observado, "error_p": 0.0}
+
+    if estadistico == "media" and _binarias(muestra_1, muestra_2):
+        p_valor, usadas = _exacta_hipergeometrica(muestra_1, muestra_2, cola)
+        resultado.update(p_valor=float(p_valor), permutaciones=usadas, metodo="exacta (hipergeométrica)")
+    elif datos.size <= MAXIMO_VALORES_EXACTO and math.comb(datos.size, n_1) <= MAXIMO_EXACTO:
+        p_valor, usadas = _exacta_enumerada(datos, n_1, estadistico, observado, cola)
+        resultado.update(p_valor=float(p_valor), permutaciones=usadas, metodo="exacta")
+    else:
+        tamanos = [PERMUTACIONES_POR_TAREA] * (permutaciones // PERMUTACIONES_POR_TAREA)
+        if permutaciones % PERMUTACIONES_POR_TAREA:
+            tamanos.append(permutaciones % PERMUTACIONES_POR_TAREA)
+        semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+        procesos = min(procesos or procesos_disponibles(), len(tamanos))
+        if procesos > 1 and permutaciones * datos.size < MINIMO_PARALELO:
+            procesos = 1
+
+        menores = mayores = usadas = 0
+        p_valor = error = np.nan
+
+        def acumular(conteo, tamano):
+            # Devuelve True cuando el error de Monte Carlo ya es suficiente
+            nonlocal menores, mayores, usadas, p_valor, error
+            menores += conteo[0]
+            mayores += conteo[1]
+            usadas += tamano
+            p_valor = float(_p_valor(menores, mayores, usadas, cola, 1))
+            error = float(np.sqrt(p_valor * (1 - p_valor) / usadas))
+            extremos = {"izquierda": menores, "derecha": mayores}.get(cola, min(menores, mayores))
+            return usadas >= MINIMO_PERMUTACIONES and error < error_maximo and extremos >= MINIMO_EXTREMOS
+
+        if procesos <= 1:
+            for tamano, semilla_tarea in zip(tamanos, semillas):
+                if acumular(_tarea(datos, n_1, estadistico, observado, tamano, semilla_tarea), tamano):
+                    break
+        else:
+            # Se procesan `procesos` tareas por ronda y se acumulan en orden,
+            # así el corte (y el resultado) no depende del número de procesos
+            with grupo_procesos(procesos, (datos, n_1, estadistico, observado)) as grupo:
+                for ronda in range(0, len(tamanos), procesos):
+                    lote = list(zip(tamanos, semillas))[ronda:ronda + procesos]
+                    futuros = [grupo.submit(_tarea_compartida, t, s) for t, s in lote]
+                    if any(acumular(f.result(), t) for f, (t, _) in zip(futuros, lote)):
+                        break
+        resultado.update(p_valor=p_valor, error_p=error, permutaciones=usadas, metodo="Monte Carlo")
+
+    segundos = time.perf_counter() - inicio
+    resultado.update(segundos=segundos, permutaciones_por_segundo=resultado["permutaciones"] / max(segundos, 1e-9))
+    return resultado
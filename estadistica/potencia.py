@@ -0,0 +1,189 @@
+"""
+Potencia analítica y tamaño de muestra para las pruebas de medias y
+proporciones (una y dos muestras).
+
+La potencia se calcula con la aproximación normal (prueba Z), o con la t no
+central para las pruebas t de medias. Los problemas inversos (n para una
+potencia dada y efecto mínimo detectable para un n dado) se resuelven con
+el buscador de raíces elemento a elemento de scipy (Chandrupatla), que
+itera todas las celdas de una grilla a la vez en lugar de llamar a brentq
+en un bucle de Python. Todos los argumentos admiten broadcasting.
+"""
+import numpy as np
+from scipy.special import ndtr, ndtri, nctdtr, stdtrit
+
+from .cache import memoizar
+from .inferencia import COLAS, _escalar, _validar_cola
+
+ESCENARIOS = ("media", "dos_medias", "proporcion", "dos_proporciones")
+PRUEBAS = ("z", "t")
+
+TAMANO_MINIMO = 2
+TAMANO_MAXIMO = 1e9
+
+
+def _validar(escenario, prueba, alpha, desviacion, base, razon):
+    if escenario not in ESCENARIOS:
+        raise ValueError(f"Escenario no válido: se esperaba uno de {ESCENARIOS}.")
+    if prueba not in PRUEBAS or (prueba == "t" and escenario not in ("media", "dos_medias")):
+        raise ValueError("La prueba t solo se aplica a medias.")
+    if np.any((np.asarray(alpha) <= 0) | (np.asarray(alpha) >= 1)):
+        raise ValueError("El nivel de significancia debe estar entre 0 y 1.")
+    if np.any(np.asarray(desviacion) <= 0):
+        raise ValueError("La desviación estándar debe ser mayor que cero.")
+    if np.any((np.asarray(base) <= 0) | (np.asarray(base) >= 1)):
+        raise ValueError("La proporción base debe estar entre 0 y 1.")
+    if np.any(np.asarray(razon) <= 0):
+        raise ValueError("La razón entre los tamaños de muestra debe ser mayor que cero.")
+
+
+def _potencia(n, efecto, escenario, alpha, cola, desviacion, base, razon, prueba):
+    """Potencia sin validar; n es el tamaño del primer grupo y n₂ = razon·n. `cola` es el índice en COLAS."""
+    alpha_cola = np.where(cola == 0, alpha / 2, alpha)
+    derecha = cola != 2
+    izquierda = cola != 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if escenario in ("media", "dos_medias"):
+            if escenario == "media":
+                error, gl = desviacion / np.sqrt(n), n - 1
+            else:
+                error, gl = desviacion * np.sqrt(1 / n + 1 / (razon * n)), n + razon * n - 2
+            no_centralidad = efecto / error
+            critico = ndtri(1 - alpha_cola) if prueba == "z" else -stdtrit(gl, alpha_cola)
+            normal = (np.where(derecha, ndtr(no_centralidad - critico), 0)
+                      + np.where(izquierda, ndtr(-no_centralidad - critico), 0))
+            if prueba == "z":
+                return normal
+            exacta = (np.where(derecha, 1 - nctdtr(gl, no_centralidad, critico), 0)
+                      + np.where(izquierda, nctdtr(gl, no_centralidad, -critico), 0))
+            # Con muchos grados de libertad la t no central devuelve NaN y
+            # coincide con la normal
+            return np.where(np.isnan(exacta), normal, exacta)
+
+        # Proporciones: bajo H₀ el error usa p₀ (o la proporción combinada)
+        p_1 = base + efecto
+        if escenario == "proporcion":
+            error_h0 = np.sqrt(base * (1 - base) / n)
+            error_h1 = np.sqrt(p_1 * (1 - p_1) / n)
+        else:
+            n_2 = razon * n
+            combinada = (p_1 * n + base * n_2) / (n + n_2)
+            error_h0 = np.sqrt(combinada * (1 - combinada) * (1 / n + 1 / n_2))
+            error_h1 = np.sqrt(p_1 * (1 - p_1) / n + base * (1 - base) / n_2)
+        critico = ndtri(1 - alpha_cola)
+        return (np.where(derecha, ndtr((efecto - critico * error_h0) / error_h1), 0)
+                + np.where(izquierda, ndtr((-efecto - critico * error_h0) / error_h1), 0))
+
+
+def _argumentos(escenario, efecto, alpha, cola, desviacion, base, razon, prueba):
+    _validar(escenario, prueba, alpha, desviacion, base, razon)
+    # find_root solo acepta argumentos numéricos: la cola pasa a su índice en COLAS
+    cola = np.select([_validar_cola(cola) == c for c in COLAS], np.arange(len(COLAS), dtype=np.float64))
+    efecto = np.asarray(efecto, dtype=np.float64)
+    if escenario in ("proporcion", "dos_proporciones"):
+        p_1 = np.asarray(base) + efecto
+        if np.any((p_1 < 0) | (p_1 > 1)):
+            raise ValueError("La proporción alternativa (base + efecto) debe estar entre 0 y 1.")
+    return (efecto, np.asarray(alpha, dtype=np.float64), cola, np.asarray(desviacion, dtype=np.float64),
+            np.asarray(base, dtype=np.float64), np.asarray(razon, dtype=np.float64))
+
+
+@memoizar()
+def potencia_prueba(escenario, efecto, n, alpha=0.05, cola="bilateral", desviacion=1.0, base=0.5, razon=1.0,
+                    prueba="z"):
+    """
+    Potencia de la prueba para un efecto verdadero y un tamaño de muestra:
+
+    - "media" y "dos_medias": `efecto` es μ - μ₀ (o μ₁ - μ₂) en las unidades
+      de `desviacion` (σ, común a los dos grupos).
+    - "proporcion" y "dos_proporciones": `efecto` es p - p₀ (o p₁ - p₂) y
+      `base` es p₀ (o p₂).
+
+    `n` es el tamaño de la muestra (del primer grupo; el segundo tiene
+    razon·n). `prueba="t"` usa la distribución t no central.
+    """
+    efecto, alpha, cola, desviacion, base, razon = _argumentos(escenario, efecto, alpha, cola, desviacion, base,
+                                                               razon, prueba)
+    n = np.asarray(n, dtype=np.float64)
+    if np.any(n < TAMANO_MINIMO):
+        raise ValueError(f"El tamaño de muestra debe ser al menos {TAMANO_MINIMO}.")
+    return _escalar(_potencia(n, efecto, escenario, alpha, cola, desviacion, base, razon, prueba))
+
+
+def _resolver(funcion, inferior, superior, objetivo, args):
+    """
+    Raíz de funcion(x, *args) = objetivo en [inferior, superior] para cada
+    celda. Las celdas donde el objetivo ya se cumple en `inferior` devuelven
+    `inferior`, y las que no lo alcanzan en `superior` quedan con NaN.
+    """
+    # scipy.optimize tarda en importarse y solo se necesita aquí
+    from scipy.optimize.elementwise import find_root
+
+    def diferencia(x, objetivo, *args):
+        return funcion(x, *args) - objetivo
+
+    inferior, superior, objetivo, *args = np.broadcast_arrays(inferior, superior, objetivo, *args)
+    en_inferior = diferencia(inferior, objetivo, *args)
+    en_superior = diferencia(superior, objetivo, *args)
+    raiz = np.full(objetivo.shape, np.nan)
+    raiz[en_inferior >= 0] = inferior[en_inferior >= 0]
+    buscar = (en_inferior < 0) & (en_superior > 0)
+    if buscar.any():
+        resultado = find_root(diferencia, (inferior[buscar], superior[buscar]),
+                              args=(objetivo[buscar], *(a[buscar] for a in args)))
+        raiz[buscar] = resultado.x
+    return raiz
+
+
+@memoizar()
+def tamano_muestra_potencia(escenario, efecto, potencia=0.8, alpha=0.05, cola="bilateral", desviacion=1.0, base=0.5,
+                            razon=1.0, prueba="z"):
+    """
+    Tamaño de muestra (del primer grupo, redondeado hacia arriba) para
+    alcanzar la `potencia` indicada con el `efecto` verdadero; el segundo
+    grupo necesita ceil(razon·n). Los argumentos son los de potencia_prueba.
+    Es NaN si el efecto es nulo o va en la dirección contraria a la cola.
+    """
+    efecto, alpha, cola, desviacion, base, razon = _argumentos(escenario, efecto, alpha, cola, desviacion, base,
+                                                               razon, prueba)
+    potencia = np.asarray(potencia, dtype=np.float64)
+    if np.any((potencia <= 0) | (potencia >= 1)):
+        raise ValueError("La potencia debe estar entre 0 y 1.")
+
+    def funcion(n, efecto, alpha, cola, desviacion, base, razon):
+        return _potencia(n, efecto, escenario, alpha, cola, desviacion, base, razon, prueba)
+
+    n = _resolver(funcion, TAMANO_MINIMO, TAMANO_MAXIMO, potencia, (efecto, alpha, cola, desviacion, base, razon))
+    # La tolerancia evita que 100.0000001 se redondee a 101
+    return _escalar(np.ceil(n - 1e-6))
+
+
+@memoizar()
+def efecto_minimo_detectable(escenario, n, potencia=0.8, alpha=0.05, cola="bilateral", desviacion=1.0, base=0.5,
+                             razon=1.0, prueba="z"):
+    """
+    Menor efecto que la prueba detecta con la `potencia` indicada y un
+    tamaño de muestra `n`: positivo para las colas bilateral y derecha,
+    negativo para la izquierda. Para proporciones es NaN si ni p = 0 o
+    p = 1 alcanzan la potencia.
+    """
+    efecto, alpha, cola, desviacion, base, razon = _argumentos(escenario, 0.0, alpha, cola, desviacion, base, razon,
+                                                               prueba)
+    n = np.asarray(n, dtype=np.float64)
+    potencia = np.asarray(potencia, dtype=np.float64)
+    if np.any(n < TAMANO_MINIMO):
+        raise ValueError(f"El tamaño de muestra debe ser al menos {TAMANO_MINIMO}.")
+    if np.any((potencia <= 0) | (potencia >= 1)):
+        raise ValueError("La potencia debe estar entre 0 y 1.")
+    signo = np.where(cola == 2, -1.0, 1.0)
+
+    # Se busca el tamaño del efecto |δ| en la dirección de la cola
+    def funcion(magnitud, n, alpha, cola, desviacion, base, razon, signo):
+        return _potencia(n, signo * magnitud, escenario, alpha, cola, desviacion, base, razon, prueba)
+
+    if escenario in ("media", "dos_medias"):
+        superior = 100 * desviacion
+    else:
+        superior = np.where(signo > 0, 1 - base, base)
+    magnitud = _resolver(funcion, 0.0, superior, potencia, (n, alpha, cola, desviacion, base, razon, signo))
+    return _escalar(signo * magnitud)
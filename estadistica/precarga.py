@@ -0,0 +1,51 @@
+"""
+Precarga de los módulos que se importan al usarlos por primera vez.
+
+`import estadistica` solo carga NumPy, scipy.special y pyarrow; pandas,
+scipy.optimize, openpyxl y altair se importan dentro de las funciones que
+los usan, para que la primera página se dibuje antes. precargar() los
+importa en un hilo de fondo mientras el usuario mira esa primera página,
+de modo que el primer cálculo no pague la importación.
+"""
+import importlib
+import threading
+import time
+
+# En orden de uso probable; altair es de los gráficos de las páginas
+MODULOS_DIFERIDOS = ("pandas", "scipy.optimize.elementwise", "openpyxl", "altair")
+
+_bloqueo = threading.Lock()
+_pedidos = set()
+_tiempos = {}
+
+
+def _importar(modulos):
+    for nombre in modulos:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nombre)
+        except ImportError:
+            # Dependencia opcional: se importará (y fallará) al usarla
+            continue
+        _tiempos[nombre] = time.perf_counter() - inicio
+
+
+def precargar(modulos=MODULOS_DIFERIDOS):
+    """
+    Importa en un hilo de fondo los `modulos` que todavía no se pidieron en
+    este proceso. Se puede llamar en cada rerun: las llamadas siguientes no
+    hacen nada. Devuelve el hilo iniciado o None.
+    """
+    with _bloqueo:
+        nuevos = [m for m in modulos if m not in _pedidos]
+        _pedidos.update(nuevos)
+    if not nuevos:
+        return None
+    hilo = threading.Thread(target=_importar, args=(nuevos,), name="estadistica-precarga", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def tiempos_precarga():
+    """Segundos que tardó cada módulo precargado (0 si ya estaba importado)."""
+    return dict(_tiempos)
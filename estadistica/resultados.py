@@ -0,0 +1,155 @@
+"""
+Almacén de los resultados que muestran las páginas.
+
+Streamlit vuelve a ejecutar la página completa en cada interacción, y lo
+calculado al pulsar un botón se pierde en el siguiente rerun. Cada resultado
+se guarda aquí con la clave de sus entradas y la sesión solo recuerda esa
+clave, así que los reruns vuelven a dibujar el resultado sin recalcularlo.
+
+Todas las sesiones de Streamlit corren en el mismo proceso y comparten el
+almacén: los arreglos se guardan una sola vez, en solo lectura, y no se
+copian ni se serializan por sesión. La memoria se acota por bytes con
+descarte LRU. Si se define ESTADISTICA_RESULTADOS_DB, los resultados
+descartados pasan a una base SQLite (también acotada, LRU) y se recuperan
+de ahí antes de recalcularlos.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+
+from .cache import CacheLRU, _solo_lectura, clave_cache, registrar_cache, tamano_resultado
+from .instrumentacion import medir
+
+MAX_BYTES_RESULTADOS = int(os.environ.get("ESTADISTICA_RESULTADOS_MB", "256")) * 1024 ** 2
+RUTA_RESULTADOS_DB = os.environ.get("ESTADISTICA_RESULTADOS_DB") or None
+MAX_BYTES_RESULTADOS_DB = int(os.environ.get("ESTADISTICA_RESULTADOS_DB_MB", "1024")) * 1024 ** 2
+
+
+class _Disco:
+    """Resultados serializados en una tabla SQLite, acotados por bytes (se borra primero el usado hace más tiempo)."""
+
+    def __init__(self, ruta, max_bytes):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        with self._conectar() as conexion:
+            conexion.execute("CREATE TABLE IF NOT EXISTS resultados "
+                             "(clave TEXT PRIMARY KEY, datos BLOB, bytes INTEGER, usado REAL)")
+
+    def _conectar(self):
+        # Una conexión por operación: las sesiones corren en hilos distintos
+        return closing(sqlite3.connect(self.ruta, timeout=30, isolation_level=None))
+
+    def guardar(self, clave, resultado):
+        try:
+            datos = pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        if len(datos) > self.max_bytes:
+            return
+        with self._conectar() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            conexion.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+                             (clave, datos, len(datos), time.time()))
+            total = conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM resultados").fetchone()[0]
+            for antigua, tamano in conexion.execute("SELECT clave, bytes FROM resultados ORDER BY usado").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conexion.execute("DELETE FROM resultados WHERE clave = ?", (antigua,))
+                total -= tamano
+            conexion.execute("COMMIT")
+
+    def obtener(self, clave):
+        with self._conectar() as conexion:
+            fila = conexion.execute("SELECT datos FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return None
+            conexion.execute("UPDATE resultados SET usado = ? WHERE clave = ?", (time.time(), clave))
+        return pickle.loads(fila[0])
+
+
+class AlmacenResultados:
+    """
+    Resultados por clave de entradas, en memoria (LRU acotado por
+    `max_bytes`) y, si se da `ruta_db`, en SQLite para los descartados.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES_RESULTADOS, ruta_db=RUTA_RESULTADOS_DB,
+                 max_bytes_db=MAX_BYTES_RESULTADOS_DB):
+        self.disco = _Disco(ruta_db, max_bytes_db) if ruta_db else None
+        # Se guardan pares (clave, resultado) para saber qué clave se descarta
+        self.memoria = CacheLRU(maxsize=10_000, max_bytes=max_bytes, medir=lambda par: tamano_resultado(par[1]),
+                                al_descartar=self._al_descartar)
+
+    def _al_descartar(self, par):
+        # El disco es un nivel de respaldo: si falla, el resultado se recalculará
+        if self.disco is not None:
+            try:
+                self.disco.guardar(*par)
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def clave(nombre, entradas):
+        """Clave estable (también entre procesos) de un cálculo y sus entradas."""
+        return hashlib.blake2b(repr((nombre, clave_cache(entradas))).encode("utf-8"), digest_size=16).hexdigest()
+
+    def guardar(self, clave, resultado):
+        resultado = _solo_lectura(resultado)
+        self.memoria.guardar(clave, (clave, resultado))
+        return resultado
+
+    def obtener(self, clave):
+        """El resultado guardado o None."""
+        par = self.memoria.consultar(clave)
+        if par is not None:
+            return par[1]
+        if self.disco is not None:
+            try:
+                resultado = self.disco.obtener(clave)
+            except sqlite3.Error:
+                resultado = None
+            if resultado is not None:
+                return self.guardar(clave, resultado)
+        return None
+
+    def calcular(self, clave, calcular):
+        """El resultado guardado con `clave` o, si no está, calcular() guardado."""
+        resultado = self.obtener(clave)
+        if resultado is None:
+            resultado = self.guardar(clave, calcular())
+        return resultado
+
+    def limpiar(self):
+        self.memoria.limpiar()
+
+    def info(self):
+        return self.memoria.info()
+
+
+almacen = AlmacenResultados()
+registrar_cache("estadistica.resultados", almacen)
+
+
+def resultado_sesion(estado, nombre, entradas, calcular, pulsado):
+    """
+    Resultado que una página debe mostrar en este rerun. `estado` es
+    st.session_state (cualquier diccionario), `nombre` identifica el
+    resultado dentro de la página y `entradas` son todos los valores de los
+    que depende.
+
+    Si se pulsó el botón se calcula (o se recupera del almacén) y la sesión
+    recuerda la clave. En los demás reruns se devuelve el mismo resultado
+    mientras las entradas no cambien; si cambiaron, devuelve None, como si
+    no se hubiera pulsado.
+    """
+    clave = almacen.clave(nombre, entradas)
+    llave_sesion = f"resultado_{nombre}"
+    if not pulsado and estado.get(llave_sesion) != clave:
+        return None
+    # Si el almacén ya lo descartó se vuelve a calcular; solo se mide si se calcula
+    resultado = almacen.calcular(clave, medir(f"calculo:{nombre}")(calcular))
+    estado[llave_sesion] = clave
+    return resultado
@@ -0,0 +1,225 @@
+"""
+Simulación de Monte Carlo de la potencia de las pruebas y de la cobertura
+de los intervalos de confianza.
+
+Por cada tamaño de muestra se generan matrices (réplicas x n) de datos
+estandarizados (media 0, desviación 1) por bloques de memoria acotada y se
+guardan solo la media y la desviación muestral de cada réplica. Como las
+pruebas y los intervalos dependen de los datos solo a través de esos dos
+valores, cada escenario (media verdadera μ + σ·Z) se evalúa sin volver a
+generar datos: todos los puntos de una curva usan las mismas réplicas, por
+lo que las curvas salen suaves. Las proporciones se simulan con conteos
+binomiales, equivalentes a sumar cada fila de ceros y unos.
+
+Las pruebas y los intervalos son las mismas funciones de inferencia.py que
+usan las páginas, aplicadas a arreglos (escenarios x réplicas) con las
+cachés desactivadas.
+"""
+import numpy as np
+
+from .bootstrap import MAX_BYTES_BLOQUE
+from .cache import cache_desactivada, memoizar
+from .inferencia import (
+    COLAS,
+    critico_z,
+    intervalo_diferencia_medias,
+    intervalo_media,
+    intervalo_proporcion,
+    prueba_dos_medias,
+    prueba_media,
+    prueba_proporcion,
+    prueba_t_dos_medias,
+    prueba_t_media,
+)
+from .paralelo import MINIMO_PARALELO, grupo_procesos, procesos_disponibles
+
+ESCENARIOS = ("media", "proporcion", "dos_medias")
+DISTRIBUCIONES = ("normal", "lognormal", "exponencial", "uniforme")
+PRUEBAS = ("z", "t")
+
+REPLICAS_POR_DEFECTO = 10_000
+REPLICAS_POR_TAREA = 5_000
+
+
+def _estandarizados(rng, distribucion, forma):
+    """Datos con media 0 y desviación 1 de la distribución indicada."""
+    if distribucion == "normal":
+        return rng.standard_normal(forma)
+    if distribucion == "lognormal":
+        # Lognormal con σ = 1 en escala logarítmica (asimetría ≈ 6.2)
+        datos = np.exp(rng.standard_normal(forma))
+        datos -= np.exp(0.5)
+        datos /= np.sqrt((np.e - 1) * np.e)
+        return datos
+    if distribucion == "exponencial":
+        datos = rng.standard_exponential(forma)
+        datos -= 1
+        return datos
+    datos = rng.random(forma)
+    datos -= 0.5
+    datos *= np.sqrt(12)
+    return datos
+
+
+def _tarea(distribucion, n, grupos, replicas, semilla):
+    """Media y desviación muestral de cada réplica estandarizada: dos arreglos (grupos x réplicas)."""
+    rng = np.random.default_rng(semilla)
+    medias = np.empty((grupos, replicas))
+    desviaciones = np.empty((grupos, replicas))
+    bloque = max(1, MAX_BYTES_BLOQUE // (8 * n))
+    for grupo in range(grupos):
+        for inicio in range(0, replicas, bloque):
+            fin = min(inicio + bloque, replicas)
+            datos = _estandarizados(rng, distribucion, (fin - inicio, n))
+            medias[grupo, inicio:fin] = datos.mean(axis=1)
+            desviaciones[grupo, inicio:fin] = datos.std(axis=1, ddof=1)
+    return medias, desviaciones
+
+
+def _momentos(distribucion, tamanos, grupos, replicas, semilla, procesos):
+    """Lista con (medias, desviaciones) de cada tamaño de muestra."""
+    tareas = []
+    for n, semilla_n in zip(tamanos, np.random.SeedSequence(semilla).spawn(len(tamanos))):
+        partes = [REPLICAS_POR_TAREA] * (replicas // REPLICAS_POR_TAREA)
+        if replicas % REPLICAS_POR_TAREA:
+            partes.append(replicas % REPLICAS_POR_TAREA)
+        tareas += [(distribucion, n, grupos, r, s) for r, s in zip(partes, semilla_n.spawn(len(partes)))]
+
+    procesos = min(procesos or procesos_disponibles(), len(tareas))
+    if procesos <= 1 or grupos * replicas * sum(tamanos) < MINIMO_PARALELO:
+        resultados = [_tarea(*tarea) for tarea in tareas]
+    else:
+        with grupo_procesos(procesos) as grupo:
+            resultados = list(grupo.map(_tarea, *zip(*tareas)))
+
+    momentos = []
+    for n in tamanos:
+        propias = [resultado for tarea, resultado in zip(tareas, resultados) if tarea[1] == n]
+        momentos.append(tuple(np.concatenate(partes, axis=1) for partes in zip(*propias)))
+    return momentos
+
+
+def _validar(escenario, tamanos, distribucion, replicas):
+    if escenario not in ESCENARIOS:
+        raise ValueError(f"Escenario no válido: se esperaba uno de {ESCENARIOS}.")
+    if distribucion not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución no válida: se esperaba una de {DISTRIBUCIONES}.")
+    tamanos = [int(n) for n in np.atleast_1d(tamanos)]
+    if min(tamanos) < 2:
+        raise ValueError("El tamaño de muestra debe ser al menos 2.")
+    if replicas < 100:
+        raise ValueError("Se necesitan al menos 100 réplicas.")
+    return tamanos
+
+
+def _error_monte_carlo(proporcion, replicas):
+    return np.sqrt(proporcion * (1 - proporcion) / replicas)
+
+
+@memoizar(maxsize=16)
+def simular_potencia(escenario, tamanos, valores, valor_h0=0.0, desviacion=1.0, distribucion="normal",
+                     prueba="t", alpha=0.05, cola="bilateral", replicas=REPLICAS_POR_DEFECTO, semilla=0,
+                     procesos=None):
+    """
+    Potencia simulada (proporción de réplicas que rechazan H₀) para cada
+    tamaño de muestra de `tamanos` y cada valor verdadero de `valores`:
+
+    - "media": media verdadera μ frente a H₀: μ = valor_h0.
+    - "proporcion": proporción verdadera p frente a H₀: p = valor_h0.
+    - "dos_medias": diferencia verdadera μ₁ - μ₂ frente a H₀: μ₁ = μ₂, con n
+      y `desviacion` iguales en los dos grupos.
+
+    `prueba` es "z" (σ conocida) o "t" (desviación muestral; Welch para dos
+    medias). Devuelve un diccionario con la matriz de potencia (tamaños x
+    valores) y su error de Monte Carlo.
+    """
+    tamanos = _validar(escenario, tamanos, distribucion, replicas)
+    if prueba not in PRUEBAS:
+        raise ValueError(f"Prueba no válida: se esperaba una de {PRUEBAS}.")
+    if cola not in COLAS:
+        raise ValueError(f"Tipo de prueba no válido: se esperaba uno de {COLAS}.")
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    potencia = np.empty((len(tamanos), valores.size))
+
+    with cache_desactivada():
+        if escenario == "proporcion":
+            if np.any((valores < 0) | (valores > 1)) or not 0 < valor_h0 < 1:
+                raise ValueError("Las proporciones deben estar entre 0 y 1.")
+            for i, (n, semilla_n) in enumerate(zip(tamanos, np.random.SeedSequence(semilla).spawn(len(tamanos)))):
+                exitos = np.random.default_rng(semilla_n).binomial(n, valores[:, None], size=(valores.size, replicas))
+                potencia[i] = prueba_proporcion(exitos, n, valor_h0, alpha, cola)["rechazar"].mean(axis=1)
+        else:
+            grupos = 2 if escenario == "dos_medias" else 1
+            momentos = _momentos(distribucion, tamanos, grupos, replicas, semilla, procesos)
+            for i, (n, (medias, desviaciones)) in enumerate(zip(tamanos, momentos)):
+                # Escenarios en las filas y réplicas en las columnas
+                media_1 = valores[:, None] + desviacion * medias[0]
+                s_1 = desviacion * desviaciones[0]
+                if escenario == "media" and prueba == "z":
+                    resultado = prueba_media(media_1, valor_h0, desviacion, n, alpha, cola)
+                elif escenario == "media":
+                    resultado = prueba_t_media(media_1, valor_h0, s_1, n, alpha, cola)
+                elif prueba == "z":
+                    resultado = prueba_dos_medias(media_1, desviacion, n, desviacion * medias[1], desviacion, n,
+                                                  alpha, cola)
+                else:
+                    resultado = prueba_t_dos_medias(media_1, s_1, n, desviacion * medias[1],
+                                                    desviacion * desviaciones[1], n, alpha, cola)
+                potencia[i] = np.asarray(resultado["rechazar"]).mean(axis=1)
+
+    return {
+        "tamanos": np.array(tamanos),
+        "valores": valores,
+        "potencia": potencia,
+        "error": _error_monte_carlo(potencia, replicas),
+        "replicas": replicas,
+    }
+
+
+@memoizar(maxsize=16)
+def simular_cobertura(escenario, tamanos, valor, desviacion=1.0, distribucion="normal", nivel=0.95,
+                      replicas=REPLICAS_POR_DEFECTO, semilla=0, procesos=None):
+    """
+    Cobertura empírica de los intervalos de las páginas 4 y 5 (x̄ ± z·s/√n,
+    p̂ ± z·√(p̂q̂/n) y diferencia de medias) para cada tamaño de muestra:
+    proporción de réplicas cuyo intervalo contiene el valor verdadero
+    `valor` (μ, p o μ₁ - μ₂). Devuelve la cobertura, su error de Monte
+    Carlo y el ancho medio de los intervalos.
+    """
+    tamanos = _validar(escenario, tamanos, distribucion, replicas)
+    cobertura = np.empty(len(tamanos))
+    ancho = np.empty(len(tamanos))
+
+    with cache_desactivada():
+        z = critico_z(nivel)
+        if escenario == "proporcion":
+            if not 0 <= valor <= 1:
+                raise ValueError("La proporción debe estar entre 0 y 1.")
+            limites = []
+            for n, semilla_n in zip(tamanos, np.random.SeedSequence(semilla).spawn(len(tamanos))):
+                exitos = np.random.default_rng(semilla_n).binomial(n, valor, size=replicas)
+                limites.append(intervalo_proporcion(exitos, n, z))
+        else:
+            grupos = 2 if escenario == "dos_medias" else 1
+            momentos = _momentos(distribucion, tamanos, grupos, replicas, semilla, procesos)
+            limites = []
+            for n, (medias, desviaciones) in zip(tamanos, momentos):
+                media_1 = valor + desviacion * medias[0]
+                s_1 = desviacion * desviaciones[0]
+                if escenario == "media":
+                    limites.append(intervalo_media(media_1, s_1, n, z))
+                else:
+                    s_2 = desviacion * desviaciones[1]
+                    limites.append(intervalo_diferencia_medias(media_1, np.square(s_1), n, desviacion * medias[1],
+                                                               np.square(s_2), n, z)[2:])
+        for i, (inferior, superior) in enumerate(limites):
+            cobertura[i] = np.mean((inferior <= valor) & (valor <= superior))
+            ancho[i] = np.mean(superior - inferior)
+
+    return {
+        "tamanos": np.array(tamanos),
+        "cobertura": cobertura,
+        "error": _error_monte_carlo(cobertura, replicas),
+        "ancho_medio": ancho,
+        "replicas": replicas,
+    }
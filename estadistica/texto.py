@@ -0,0 +1,111 @@
+"""
+Lectura de listas de números pegadas en los cuadros de texto.
+
+El texto se normaliza a un valor por línea y lo convierte el lector CSV de
+PyArrow (en C), sin crear un objeto de Python por valor. Se aceptan como
+separadores comas, punto y coma, espacios, tabulaciones y saltos de línea,
+y la coma decimal ("1,5; 2,25").
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from .instrumentacion import medir
+
+DECIMALES = ("auto", ".", ",")
+
+# Números que acepta la conversión de texto a float64 de Arrow
+_PATRON_NUMERO = r"^[+-]?((\d+\.?\d*|\.\d+)(e[+-]?\d+)?|inf|infinity|nan)$"
+
+_ESPACIOS = b" \t\r\n\f\v"
+_DIGITOS = np.zeros(256, dtype=bool)
+_DIGITOS[ord("0"):ord("9") + 1] = True
+_SEPARADORES = np.zeros(256, dtype=bool)
+_SEPARADORES[list(_ESPACIOS + b";")] = True
+
+
+def coma_decimal(datos):
+    """
+    Decide si las comas de `datos` (bytes) son decimales: hay punto y coma
+    como separador, o los valores se separan con espacios o saltos de línea
+    y cada coma está entre dos dígitos, a lo sumo una por valor.
+    """
+    if b"," not in datos:
+        return False
+    if b";" in datos:
+        return True
+    bytes_ = np.frombuffer(datos.strip(), dtype=np.uint8)
+    comas = np.flatnonzero(bytes_ == ord(","))
+    if comas[0] == 0 or comas[-1] == bytes_.size - 1:
+        return False
+    if not (_DIGITOS[bytes_[comas - 1]].all() and _DIGITOS[bytes_[comas + 1]].all()):
+        return False
+    separador = _SEPARADORES[bytes_]
+    if not separador.any():
+        return False
+    # Entre dos comas consecutivas debe haber al menos un separador
+    separadores_antes = np.cumsum(separador)[comas]
+    return bool(np.all(np.diff(separadores_antes) > 0))
+
+
+def _tabla_separadores(coma):
+    tabla = bytearray(range(256))
+    for separador in _ESPACIOS + b";" + (b"," if coma else b""):
+        tabla[separador] = ord("\n")
+    if not coma:
+        tabla[ord(",")] = ord(".")
+    return bytes(tabla)
+
+
+# Tabla de bytes.translate: los separadores pasan a salto de línea y, con
+# coma decimal, la coma pasa a punto
+_TRADUCCION = {".": _tabla_separadores(coma=True), ",": _tabla_separadores(coma=False)}
+
+
+def _leer_columna(datos, tipo):
+    tabla = pacsv.read_csv(
+        pa.py_buffer(datos),
+        read_options=pacsv.ReadOptions(column_names=["valor"]),
+        parse_options=pacsv.ParseOptions(quote_char=False),
+        convert_options=pacsv.ConvertOptions(column_types={"valor": tipo}, null_values=[],
+                                             strings_can_be_null=False),
+    )
+    return tabla.column(0)
+
+
+@medir("lectura")
+def leer_numeros(texto, decimal="auto"):
+    """
+    Convierte el texto en un arreglo float64. Devuelve (valores, invalidos),
+    donde `invalidos` es una lista de (posición, token) con los tokens que no
+    son números; la posición empieza en 1. `decimal` es "auto", "." o ",".
+    """
+    if decimal not in DECIMALES:
+        raise ValueError(f"Separador decimal no válido: se esperaba uno de {DECIMALES}.")
+    datos = texto.encode("utf-8")
+    if decimal == "auto":
+        decimal = "," if coma_decimal(datos) else "."
+
+    datos = datos.translate(_TRADUCCION[decimal])
+    if not datos.strip():
+        return np.empty(0), []
+
+    try:
+        return _leer_columna(datos, pa.float64()).to_numpy(), []
+    except pa.ArrowInvalid:
+        pass
+
+    # Hay tokens inválidos: se leen como texto y se ubican todos a la vez
+    tokens = _leer_columna(datos, pa.string()).combine_chunks()
+    validos = pc.match_substring_regex(tokens, _PATRON_NUMERO, ignore_case=True)
+    valores = pc.cast(pc.filter(tokens, validos), pa.float64()).to_numpy()
+    posiciones = np.flatnonzero(~validos.to_numpy(zero_copy_only=False))
+    return valores, list(zip((posiciones + 1).tolist(), tokens.take(posiciones).to_pylist()))
+
+
+def resumen_invalidos(invalidos, maximo=10):
+    """Texto con los primeros tokens inválidos: "'x' (posición 2), ... y 3 más"."""
+    partes = [f"'{token}' (posición {posicion})" for posicion, token in invalidos[:maximo]]
+    resto = len(invalidos) - maximo
+    return ", ".join(partes) + (f" y {resto} más" if resto > 0 else "")
@@ -1,40 +1,97 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-from scipy import stats
+
+from estadistica import (
+    EXTENSIONES,
+    agregar_archivo,
+    almacen_conjuntos,
+    calcular_metricas,
+    columnas_archivo,
+    huella_archivo,
+    leer_columnas_archivo,
+    leer_numeros,
+    mediana_exacta_columna,
+    medir,
+    metricas_frecuencias,
+    metricas_intervalos,
+    metricas_por_grupo,
+    metricas_todas_columnas,
+    precargar,
+    resultado_sesion,
+    resumen_columna,
+    resumen_invalidos,
+    vista_previa,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
 
 st.set_page_config(layout="wide")
+precargar()
+iniciar_pagina("tendencia_central")
 st.title(":green[Valores de Tendencia Central y Dispersión]",
          text_alignment ="center",
          )
 
 
-def mostrar_metrica(data, tipo):
+METODOS_MODA = {
+    "AUTOMÁTICO": "auto",
+    "CONTEO": "conteo",
+    "HISTOGRAMA": "histograma",
+    "KDE": "kde",
+}
+
+METODOS_MEDIANA = {
+    "EXACTA": "exacta",
+    "APROXIMADA (SKETCH KLL)": "aproximada",
+}
+
+SEPARADORES_DECIMALES = {
+    "AUTOMÁTICO": "auto",
+    "PUNTO (1.5)": ".",
+    "COMA (1,5)": ",",
+}
+
+
+def calcular_datos(texto, decimal, tipo, metodo_moda="auto", ancho_clase=None, metodo_mediana="exacta",
+                   error_mediana=0.01):
     """
-    Calcula y muestra las métricas estadísticas.
-    Toda la lógica de cálculo y visualización se mueve aquí.
+    Lee los datos pegados y calcula sus métricas. Devuelve {"invalidos": ...}
+    si hay valores que no son números y, si no, {"metricas": ...} (None sin datos).
     """
-    if not data:
+    datos, invalidos = leer_numeros(texto, decimal)
+    if invalidos:
+        return {"invalidos": invalidos}
+    if len(datos) == 0:
+        return {"metricas": None}
+    # El arreglo lo crea leer_numeros, así que la mediana exacta puede reordenarlo sin copiarlo
+    return {"metricas": calcular_metricas(np.asarray(datos, dtype=np.float64), tipo, metodo_moda, ancho_clase,
+                                          metodo_mediana, error_mediana, sobrescribir=True)}
+
+
+def mostrar_metrica(resultado, tipo):
+    """Muestra el resultado de calcular_datos: los valores inválidos o las métricas estadísticas."""
+    if "invalidos" in resultado:
+        invalidos = resultado["invalidos"]
+        st.error(f"ERROR: {len(invalidos)} VALORES NO SON NÚMEROS: {resumen_invalidos(invalidos)}")
+        return
+    st.success("LOS DATOS SE CARGARON CORRECTAMENTE")
+    if resultado["metricas"] is None:
         st.warning("No hay datos para calcular.")
         return
+    mostrar_resultados(resultado["metricas"], tipo)
 
-    # Convertir a numpy array para asegurar consistencia
-    data_array = np.array(data)
-
-    n = len(data_array)
-    media = np.mean(data_array)
-    mediana = np.median(data_array)
 
-    # Uso corregido de scipy.stats.mode
-    mode_result = stats.mode(data_array)
-    # Asegurar que el resultado de la moda sea siempre un array
-    moda_array = np.atleast_1d(mode_result.mode)
-    moda = moda_array[0] if moda_array.size > 0 else "N/A"
-
-    # ddof=1 para muestra, ddof=0 para población
-    ddof_val = 1 if tipo == "MUESTRAL" else 0
-    varianza = np.var(data_array, ddof=ddof_val)
-    desviacion_estandar = np.std(data_array, ddof=ddof_val)
+@medir("dibujo")
+def mostrar_resultados(metricas, tipo):
+    """
+    Muestra las métricas ya calculadas, ya sea desde una lista de datos
+    o desde el motor por bloques de los archivos.
+    """
+    n = metricas["n"]
+    media = metricas["media"]
+    mediana = metricas["mediana"]
+    moda = metricas["moda"]
+    varianza = metricas["varianza"]
+    desviacion_estandar = metricas["desviacion_estandar"]
 
     st.divider()
     st.subheader(f"Resultados para el cálculo {tipo}")
@@ -47,12 +104,22 @@ def mostrar_metrica(data, tipo):
 
     with c2:
         st.metric(label="Mediana", value=f"{mediana:.4f}")
+        if metricas.get("error_mediana"):
+            st.caption(f"Mediana aproximada: error de rango de a lo sumo {metricas['error_mediana']:.2%} de n.")
 
     with c3:
         # Maneja el caso donde la moda no es numérica
         moda_display = f"{moda:.4f}" if isinstance(moda, (int, float)) else moda
         st.metric(label="Moda", value=moda_display)
 
+        modas = metricas.get("modas")
+        if modas is not None and len(modas) > 1:
+            listado = ", ".join(f"{m:.4f}" for m in modas[:10])
+            st.caption(f"Distribución multimodal ({len(modas)} modas): {listado}{' ...' if len(modas) > 10 else ''}")
+        if metricas.get("metodo_moda") in ("histograma", "kde"):
+            st.caption(f"Moda estimada por {metricas['metodo_moda']} "
+                       f"con ancho de clase {metricas['ancho_clase']:.4f}.")
+
     with c4:
         label_media = "Media Muestral (x̄)" if tipo == "MUESTRAL" else "Media Poblacional (μ)"
         st.metric(label=label_media, value=f"{media:.4f}")
@@ -70,86 +137,357 @@ def mostrar_metrica(data, tipo):
         st.metric(label=label_dev, value=f"{desviacion_estandar:.4f}")
 
 
-tab1, tab2, tab3 = st.tabs(["MUESTRAL", "POBLACIONAL", "ARCHIVOS"])
+@medir("dibujo")
+def mostrar_tabla_columnas(nombres, metricas, tipo, etiqueta="Columna", plural="columnas",
+                           nombre_archivo="estadisticas_columnas.csv"):
+    """Muestra las métricas de varias columnas (o grupos) como una tabla exportable."""
+    import pandas as pd
+
+    sufijo = "Muestral" if tipo == "MUESTRAL" else "Poblacional"
+    tabla = pd.DataFrame({
+        etiqueta: nombres,
+        "n" if tipo == "MUESTRAL" else "N": metricas["n"],
+        f"Media {sufijo}": metricas["media"],
+        "Mediana": metricas["mediana"],
+        "Moda": metricas["moda"],
+        f"Varianza {sufijo}": metricas["varianza"],
+        f"Desviación Estándar {sufijo}": metricas["desviacion_estandar"],
+    })
+
+    st.divider()
+    st.subheader(f"Resultados para el cálculo {tipo} de {len(tabla):,} {plural}")
+    st.dataframe(tabla, hide_index=True, width="stretch")
+    st.download_button(
+        "DESCARGAR RESULTADOS (CSV)",
+        data=tabla.to_csv(index=False).encode("utf-8"),
+        file_name=nombre_archivo,
+        mime="text/csv",
+        on_click="ignore",
+        key=f"descargar_{nombre_archivo}"
+    )
+
+
+with st.expander("OPCIONES DE LA MODA"):
+    metodo_moda = METODOS_MODA[st.radio(
+        "Método de cálculo de la moda:",
+        list(METODOS_MODA.keys()),
+        horizontal=True,
+        key="metodo_moda",
+        help="AUTOMÁTICO usa conteo para datos discretos y el histograma cuando ningún valor se repite."
+    )]
+    ancho_clase = st.number_input(
+        "Ancho de clase para datos continuos (0 = automático):",
+        min_value=0.0,
+        value=0.0,
+        format="%.4f",
+        key="ancho_clase_moda"
+    ) or None
+
+with st.expander("OPCIONES DE LA MEDIANA"):
+    metodo_mediana = METODOS_MEDIANA[st.radio(
+        "Método de cálculo de la mediana:",
+        list(METODOS_MEDIANA.keys()),
+        horizontal=True,
+        key="metodo_mediana",
+        help="La aproximada usa memoria constante; conviene para columnas muy grandes."
+    )]
+    error_mediana = st.number_input(
+        "Error máximo de rango de la mediana aproximada (%):",
+        min_value=0.01,
+        max_value=10.0,
+        value=1.0,
+        step=0.1,
+        disabled=metodo_mediana == "exacta",
+        key="error_mediana"
+    ) / 100
+
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["MUESTRAL", "POBLACIONAL", "ARCHIVOS", "TABLA DE FRECUENCIAS",
+                                        "DATOS INCREMENTALES"])
 
 with tab1:
     st.header("Estadísticos Muestrales")
     st.text('Calcula las medidas estadísticas de una muestra de datos.')
-    st.info("Ingresa los datos para calcular las Medidas Muestrales. Por favor, Separe los números con comas.")
+    st.info("Ingresa los datos para calcular las Medidas Muestrales. Por favor, Separe los números con comas, punto y coma, espacios o saltos de línea.")
 
     data_input_m = st.text_area("Datos (Muestrales):", height=100, key="input_muestral")
+    decimal_m = SEPARADORES_DECIMALES[st.radio("Separador decimal:", list(SEPARADORES_DECIMALES.keys()),
+                                                 horizontal=True, key="decimal_muestral")]
 
     # Se añade una clave única al botón
-    if st.button("CALCULAR DATOS", key="btn_muestral"):
-        try:
-            data_list = [float(x.strip()) for x in data_input_m.split(",") if x.strip()]
-            st.success("LOS DATOS SE CARGARON CORRECTAMENTE")
-            mostrar_metrica(data_list, "MUESTRAL")
-        except ValueError:
-            st.error("ERROR: REVISAR EL FORMATO DE LOS DATOS. SOLO SE ADMITEN NÚMEROS SEPARADOS POR COMAS.")
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
+    pulsado = st.button("CALCULAR DATOS", key="btn_muestral")
+    entradas = (data_input_m, decimal_m, "MUESTRAL", metodo_moda, ancho_clase, metodo_mediana, error_mediana)
+    try:
+        resultado = resultado_sesion(st.session_state, "muestral", entradas, lambda: calcular_datos(*entradas), pulsado)
+        if resultado is not None:
+            mostrar_metrica(resultado, "MUESTRAL")
+    except ValueError:
+        st.error("ERROR: REVISAR EL FORMATO DE LOS DATOS. SOLO SE ADMITEN NÚMEROS SEPARADOS POR COMAS.")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 
 with tab2:
     st.header("Estadísticos Poblacionales")
     st.text("Calcula las medidas estadísticas de una población de datos.")
-    st.info("Ingresa los datos para calcular las Medidas Poblacionales. Por favor, Separe los números con comas.")
+    st.info("Ingresa los datos para calcular las Medidas Poblacionales. Por favor, Separe los números con comas, punto y coma, espacios o saltos de línea.")
 
     data_input_p = st.text_area("Datos (Poblacionales):", height=100, key="input_poblacional")
+    decimal_p = SEPARADORES_DECIMALES[st.radio("Separador decimal:", list(SEPARADORES_DECIMALES.keys()),
+                                                 horizontal=True, key="decimal_poblacional")]
 
     # Se añade una clave única al botón
-    if st.button("CALCULAR DATOS", key="btn_poblacional"):
-        try:
-            data_list = [float(x.strip()) for x in data_input_p.split(",") if x.strip()]
-            st.success("LOS DATOS SE CARGARON CORRECTAMENTE")
-            mostrar_metrica(data_list, "POBLACIONAL")
-        except ValueError:
-            st.error("ERROR: REVISAR EL FORMATO DE LOS DATOS. SOLO SE ADMITEN NÚMEROS SEPARADOS POR COMAS.")
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
+    pulsado = st.button("CALCULAR DATOS", key="btn_poblacional")
+    entradas = (data_input_p, decimal_p, "POBLACIONAL", metodo_moda, ancho_clase, metodo_mediana, error_mediana)
+    try:
+        resultado = resultado_sesion(st.session_state, "poblacional", entradas, lambda: calcular_datos(*entradas), pulsado)
+        if resultado is not None:
+            mostrar_metrica(resultado, "POBLACIONAL")
+    except ValueError:
+        st.error("ERROR: REVISAR EL FORMATO DE LOS DATOS. SOLO SE ADMITEN NÚMEROS SEPARADOS POR COMAS.")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 
 with tab3:
     st.header("Cargar Datos desde Archivo")
-    st.text("Carga un archivo CSV o Excel para calcular las medidas estadísticas.")
+    st.text("Carga un archivo CSV, Excel, Parquet o Arrow para calcular las medidas estadísticas.")
 
-    uploaded_file = st.file_uploader("Sube tu archivo", type=["csv", "xlsx"])
+    uploaded_file = st.file_uploader("Sube tu archivo", type=EXTENSIONES)
 
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
+            # El archivo se convierte una sola vez por contenido a formato
+            # columnar; cambiar de columna o de tipo de cálculo solo lee la
+            # columna seleccionada.
+            huella = huella_archivo(uploaded_file)
+            df = vista_previa(uploaded_file, huella)
 
             st.write("Vista previa de los datos cargados:", df.head())
 
-            columna = st.selectbox("Selecciona la columna para análisis estadístico:", df.columns)
+            modo_analisis = st.radio("Columnas a analizar:",
+                                     ["UNA COLUMNA", "TODAS LAS COLUMNAS NUMÉRICAS", "POR GRUPOS"],
+                                     horizontal=True, key="modo_archivo",
+                                     help="POR GRUPOS calcula las medidas de una columna para cada categoría "
+                                          "de otra columna.")
 
-            tipo_calculo = st.radio("Selecciona el tipo de cálculo:", ["MUESTRAL", "POBLACIONAL"], key="radio_archivo")
+            columna = columna_grupo = None
+            if modo_analisis == "UNA COLUMNA":
+                columna = st.selectbox("Selecciona la columna para análisis estadístico:", df.columns)
+            elif modo_analisis == "POR GRUPOS":
+                columna_grupo = st.selectbox("Columna de categorías (grupos):", df.columns, key="columna_grupo")
+                columna = st.selectbox("Columna numérica a analizar:", df.columns, key="columna_valor_grupo")
 
-            if st.button("CALCULAR DATOS DEL ARCHIVO", key="btn_archivo"):
-                # Asegurarse de que la columna exista
-                if columna in df.columns:
-                    # Convertir a numérico, los errores se convierten en NaN
-                    datos_numericos = pd.to_numeric(df[columna], errors='coerce')
-                    # Eliminar los valores NaN
-                    datos_limpios = datos_numericos.dropna().tolist()
+            tipo_calculo = st.radio("Selecciona el tipo de cálculo:", ["MUESTRAL", "POBLACIONAL"], key="radio_archivo")
 
-                    if datos_limpios:
-                        mostrar_metrica(datos_limpios, tipo=tipo_calculo)
+            def calcular_archivo():
+                if modo_analisis == "TODAS LAS COLUMNAS NUMÉRICAS":
+                    nombres, metricas = metricas_todas_columnas(uploaded_file, tipo_calculo, huella)
+                    return {"nombres": nombres, "metricas": metricas}
+                if modo_analisis == "POR GRUPOS":
+                    grupos, metricas = metricas_por_grupo(uploaded_file, columna_grupo, columna, tipo_calculo, huella)
+                    return {"nombres": grupos, "metricas": metricas}
+                # Los valores no numéricos se descartan en cada bloque
+                resumen = resumen_columna(uploaded_file, columna, huella,
+                                          error_mediana if metodo_mediana == "aproximada" else None)
+                if resumen.n == 0:
+                    return {"metricas": None}
+                metricas = resumen.metricas(tipo_calculo)
+                if metodo_mediana == "exacta" and not metricas["mediana_exacta"]:
+                    metricas["mediana"] = mediana_exacta_columna(uploaded_file, columna, huella)
+                    metricas["mediana_exacta"] = True
+                    metricas["error_mediana"] = 0.0
+                return {"metricas": metricas}
+
+            pulsado = st.button("CALCULAR DATOS DEL ARCHIVO", key="btn_archivo")
+            entradas = (huella, modo_analisis, columna, columna_grupo, tipo_calculo, metodo_mediana, error_mediana)
+            resultado = resultado_sesion(st.session_state, "archivo", entradas, calcular_archivo, pulsado)
+            if resultado is not None:
+                metricas = resultado["metricas"]
+                if modo_analisis == "TODAS LAS COLUMNAS NUMÉRICAS":
+                    if resultado["nombres"]:
+                        mostrar_tabla_columnas(resultado["nombres"], metricas, tipo_calculo)
+                    else:
+                        st.error("ERROR: EL ARCHIVO NO CONTIENE COLUMNAS NUMÉRICAS.")
+                elif modo_analisis == "POR GRUPOS":
+                    if metricas["n"].sum() > 0:
+                        mostrar_tabla_columnas(resultado["nombres"], metricas, tipo_calculo, etiqueta=columna_grupo,
+                                               plural="grupos", nombre_archivo="estadisticas_grupos.csv")
                     else:
                         st.error("ERROR: LA COLUMNA SELECCIONADA NO CONTIENE DATOS NUMÉRICOS VÁLIDOS.")
+                elif metricas is not None:
+                    mostrar_resultados(metricas, tipo=tipo_calculo)
+                    if not metricas["mediana_exacta"] or not metricas["moda_exacta"]:
+                        st.caption("La mediana y/o la moda son aproximadas debido al tamaño del archivo.")
                 else:
-                    st.error("La columna seleccionada no existe en el archivo.")
+                    st.error("ERROR: LA COLUMNA SELECCIONADA NO CONTIENE DATOS NUMÉRICOS VÁLIDOS.")
 
         except Exception as e:
             st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
 
+with tab4:
+    st.header("Estadísticos Desde Una Tabla De Frecuencias")
+    st.text("Calcula las medidas desde datos ya agrupados, sin expandirlos fila por fila: pares de valor y "
+            "frecuencia o intervalos de clase.")
+
+    formato = st.radio("Formato de la tabla:", ["VALOR Y FRECUENCIA", "INTERVALOS DE CLASE"], horizontal=True,
+                       key="formato_frecuencias")
+    intervalos = formato == "INTERVALOS DE CLASE"
+    nombres_tabla = ["Límite Inferior", "Límite Superior", "Frecuencia"] if intervalos else ["Valor", "Frecuencia"]
+    origen = st.radio("Origen de los datos:", ["PEGAR VALORES", "CARGAR ARCHIVO"], horizontal=True,
+                      key="origen_frecuencias")
+
+    archivo_frecuencias = huella_frecuencias = None
+    textos_tabla, columnas_tabla = [], []
+    if origen == "PEGAR VALORES":
+        st.info("Ingresa cada columna de la tabla en su cuadro, en el mismo orden. Por favor, Separe los números "
+                "con comas, punto y coma, espacios o saltos de línea.")
+        textos_tabla = []
+        for col, nombre in zip(st.columns(len(nombres_tabla)), nombres_tabla):
+            with col:
+                textos_tabla.append(st.text_area(f"{nombre}:", height=150,
+                                                 key=f"frecuencias_{formato}_{nombre}"))
+    else:
+        archivo_frecuencias = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key="archivo_frecuencias")
+        if archivo_frecuencias is not None:
+            try:
+                huella_frecuencias = huella_archivo(archivo_frecuencias)
+                opciones = columnas_archivo(archivo_frecuencias, huella_frecuencias)
+                columnas_tabla = []
+                for i, (col, nombre) in enumerate(zip(st.columns(len(nombres_tabla)), nombres_tabla)):
+                    with col:
+                        columnas_tabla.append(st.selectbox(f"Columna de {nombre.lower()}:", opciones,
+                                                           index=min(i, len(opciones) - 1),
+                                                           key=f"columna_frecuencias_{formato}_{nombre}"))
+            except Exception as e:
+                st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
+                archivo_frecuencias = None
+
+    tipo_frecuencias = st.radio("Selecciona el tipo de cálculo:", ["MUESTRAL", "POBLACIONAL"],
+                                key="tipo_frecuencias")
+
+    def calcular_frecuencias():
+        if origen == "CARGAR ARCHIVO":
+            if archivo_frecuencias is None:
+                raise ValueError("SUBE UN ARCHIVO CON LA TABLA DE FRECUENCIAS.")
+            with medir("lectura"):
+                tabla = leer_columnas_archivo(archivo_frecuencias, columnas_tabla, huella_frecuencias)
+        else:
+            tabla = []
+            for nombre, texto in zip(nombres_tabla, textos_tabla):
+                valores, invalidos = leer_numeros(texto)
+                if invalidos:
+                    raise ValueError(f"{len(invalidos)} VALORES DE {nombre.upper()} NO SON NÚMEROS: "
+                                     f"{resumen_invalidos(invalidos)}")
+                tabla.append(valores)
+        if intervalos:
+            return metricas_intervalos(*tabla, tipo_frecuencias)
+        return metricas_frecuencias(*tabla, tipo_frecuencias)
+
+    pulsado = st.button("CALCULAR DESDE LA TABLA", key="btn_frecuencias")
+    entradas = (formato, origen, tuple(textos_tabla), huella_frecuencias, tuple(columnas_tabla), tipo_frecuencias)
+    try:
+        metricas = resultado_sesion(st.session_state, "frecuencias", entradas, calcular_frecuencias, pulsado)
+        if metricas is not None:
+            mostrar_resultados(metricas, tipo_frecuencias)
+            if intervalos:
+                st.caption("La media y la varianza usan la marca de clase; la mediana y la moda, las fórmulas "
+                           "de datos agrupados.")
+    except ValueError as e:
+        st.error(f"ERROR: {e}")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
+
+with tab5:
+    st.header("Conjunto De Datos Incremental")
+    st.text("Guarda el resumen de un conjunto de datos y actualízalo subiendo solo las filas nuevas de cada lote: "
+            "el cálculo depende del tamaño del lote y cada lote se puede deshacer.")
+
+    try:
+        almacen = almacen_conjuntos()
+        nombres_conjuntos = almacen.conjuntos()
+    except Exception as e:
+        st.error(f"ERROR AL ABRIR LOS CONJUNTOS GUARDADOS: {e}")
+        nombres_conjuntos = None
+
+    if nombres_conjuntos is not None:
+        conjunto = st.selectbox("Conjunto de datos:", ["NUEVO CONJUNTO"] + nombres_conjuntos,
+                                key="conjunto_incremental")
+        nuevo = conjunto == "NUEVO CONJUNTO"
+        if nuevo:
+            nombre_conjunto = st.text_input("Nombre del nuevo conjunto:", key="nombre_conjunto")
+
+        archivo_lote = st.file_uploader("Sube el lote nuevo", type=EXTENSIONES, key="archivo_lote")
+        columnas_lote = None
+        if archivo_lote is not None and nuevo:
+            try:
+                opciones = columnas_archivo(archivo_lote)
+                columnas_lote = st.multiselect("Columnas del conjunto:", opciones, key="columnas_conjunto")
+            except Exception as e:
+                st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
+
+        if st.button("AGREGAR LOTE", key="btn_agregar_lote"):
+            creado = None
+            try:
+                if archivo_lote is None:
+                    raise ValueError("SUBE UN ARCHIVO CON EL LOTE NUEVO.")
+                if nuevo:
+                    conjunto = creado = almacen.crear(nombre_conjunto)
+                with medir("calculo"):
+                    lote = agregar_archivo(conjunto, archivo_lote, columnas_lote, almacen=almacen)
+                st.success(f"LOTE {lote} AGREGADO AL CONJUNTO '{conjunto}'.")
+                nuevo = False
+            except ValueError as e:
+                st.error(f"ERROR: {e}")
+            except Exception as e:
+                st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
+            finally:
+                # Un conjunto nuevo cuyo primer lote falló no se conserva
+                if creado is not None and nuevo:
+                    almacen.eliminar(creado)
+
+        if not nuevo:
+            try:
+                lotes = almacen.lotes(conjunto)
+                if lotes:
+                    archivos_lotes = {lote["id"]: lote["archivo"] for lote in lotes}
+                    c1, c2 = st.columns([3, 1], vertical_alignment="bottom")
+                    with c1:
+                        # El último lote aparece primero y vuelve a elegirse cuando llega uno nuevo
+                        lote_deshacer = st.selectbox("Lote a deshacer:", list(archivos_lotes)[::-1],
+                                                     format_func=lambda i: f"{i}: {archivos_lotes[i]}",
+                                                     key=f"lote_deshacer_{conjunto}_{lotes[-1]['id']}")
+                    with c2:
+                        if st.button("DESHACER LOTE", key="btn_deshacer_lote"):
+                            with medir("calculo"):
+                                almacen.deshacer_lote(conjunto, lote_deshacer)
+                            st.success(f"LOTE {lote_deshacer} DESHECHO.")
+                            lotes = almacen.lotes(conjunto)
+
+                import pandas as pd
+
+                st.dataframe(pd.DataFrame({
+                    "Lote": [lote["id"] for lote in lotes],
+                    "Archivo": [lote["archivo"] for lote in lotes],
+                    "Agregado": pd.to_datetime([lote["agregado"] for lote in lotes], unit="s"),
+                    "Valores": [", ".join(f"{c}: {n:,}" for c, n in lote["valores"].items()) for lote in lotes],
+                }), hide_index=True, width="stretch")
+
+                tipo_conjunto = st.radio("Selecciona el tipo de cálculo:", ["MUESTRAL", "POBLACIONAL"],
+                                         key="tipo_conjunto")
+                resumenes = almacen.resumenes(conjunto)
+                if resumenes:
+                    lista = [r.metricas(tipo_conjunto) for r in resumenes.values()]
+                    metricas = {clave: np.array([m[clave] for m in lista]) for clave in
+                                ("n", "media", "mediana", "moda", "varianza", "desviacion_estandar")}
+                    mostrar_tabla_columnas(list(resumenes), metricas, tipo_conjunto,
+                                           nombre_archivo=f"conjunto_{conjunto}.csv")
+                    if not all(m["mediana_exacta"] and m["moda_exacta"] for m in lista):
+                        st.caption("La mediana y/o la moda son aproximadas debido al tamaño del conjunto.")
+                else:
+                    st.info("EL CONJUNTO TODAVÍA NO TIENE LOTES.")
 
+                if st.button("ELIMINAR CONJUNTO", key="btn_eliminar_conjunto"):
+                    almacen.eliminar(conjunto)
+                    st.success(f"CONJUNTO '{conjunto}' ELIMINADO.")
+            except Exception as e:
+                st.error(f"ERROR AL LEER EL CONJUNTO: {e}")
 
-
-
-
-
-
-
+mostrar_panel()
@@ -1,12 +1,89 @@
 import streamlit as st
 import numpy as np
-from scipy import stats
+
+from estadistica import (
+    EXTENSIONES,
+    columnas_archivo,
+    huella_archivo,
+    leer_columna_archivo,
+    leer_numeros,
+    medir,
+    precargar,
+    probabilidad_acumulada,
+    resultado_sesion,
+    resumen_invalidos,
+    valor_z as calcular_valor_z,
+    z_desde_probabilidad,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
 
 st.set_page_config(page_title="Valor Z",
                    layout= "wide")
+precargar()
+iniciar_pagina("valor_z")
 st.title(":green[Valor Z]",
             text_alignment ="center",)
 
+
+def entrada_lote(etiqueta, key):
+    """
+    Muestra los controles para ingresar un lote de valores, pegados en un
+    cuadro de texto o desde una columna de un archivo CSV/XLSX/Parquet/Arrow.
+    Devuelve (texto, archivo, columna); los datos se leen al calcular.
+    """
+    origen = st.radio("Origen de los datos:", ["PEGAR VALORES", "CARGAR ARCHIVO"],
+                      horizontal=True, key=f"origen_{key}")
+
+    if origen == "PEGAR VALORES":
+        texto = st.text_area(f"{etiqueta} (uno por línea o separados por comas):", height=150,
+                             key=f"texto_{key}")
+        return texto, None, None
+
+    archivo = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key=f"archivo_{key}")
+    if archivo is None:
+        return "", None, None
+    columna = st.selectbox(f"Columna con {etiqueta.lower()}:", columnas_archivo(archivo),
+                           key=f"columna_{key}")
+    return "", archivo, columna
+
+
+def clave_lote(texto, archivo, columna):
+    """Entradas de las que depende un lote: el archivo se identifica por su huella, no por sus bytes."""
+    return texto, huella_archivo(archivo) if archivo is not None else None, columna
+
+
+def cargar_lote(texto, archivo, columna):
+    """
+    Convierte la entrada del lote en un arreglo float64 en una sola pasada.
+    Lanza ValueError con los tokens que no son números.
+    """
+    if archivo is not None:
+        with medir("lectura"):
+            return leer_columna_archivo(archivo, columna)
+    valores, invalidos = leer_numeros(texto)
+    if invalidos:
+        raise ValueError(f"{len(invalidos)} VALORES NO SON NÚMEROS: {resumen_invalidos(invalidos)}")
+    return valores
+
+
+@medir("dibujo")
+def ofrecer_descarga(columnas, nombre_archivo, key):
+    """Muestra las columnas (un diccionario) como tabla y ofrece descargarlas en CSV."""
+    # pandas solo se importa cuando hay una tabla que mostrar
+    import pandas as pd
+
+    tabla = pd.DataFrame(columnas)
+    st.dataframe(tabla, width="stretch")
+    st.download_button(
+        "DESCARGAR RESULTADOS (CSV)",
+        data=tabla.to_csv(index=False).encode("utf-8"),
+        file_name=nombre_archivo,
+        mime="text/csv",
+        on_click="ignore",
+        key=key
+    )
+
+
 tab1, tab2 = st.tabs(["CALCULAR VALOR Z", "CALCULAR DESDE PROBABILIDAD"])
 
 with tab1:
@@ -42,37 +119,80 @@ with tab1:
             key="desviacion_estandar"
         )
 
-    if st.button("CALCULAR VALOR Z", key="btn_calcular_valor_z"):
-        try:
-            if desviacion_estandar == 0:
-                st.error("La Desviación Estándar no puede ser cero.")
+    def calcular_valor_z_datos():
+        valor_z = calcular_valor_z(puntaje_bruto_x, media_poblacional, desviacion_estandar)
+        return valor_z, probabilidad_acumulada(valor_z)
+
+    pulsado = st.button("CALCULAR VALOR Z", key="btn_calcular_valor_z")
+    if pulsado and desviacion_estandar == 0:
+        st.error("La Desviación Estándar no puede ser cero.")
+        pulsado = False
+    try:
+        resultado = resultado_sesion(st.session_state, "valor_z", (puntaje_bruto_x, media_poblacional,
+                                                                   desviacion_estandar),
+                                     calcular_valor_z_datos, pulsado)
+        if resultado is not None:
+            valor_z, probabilidad = resultado
 
-            else:
-                valor_z = (puntaje_bruto_x - media_poblacional) / desviacion_estandar
+            st.divider()
+            st.subheader("Resultados Del Cálculo")
 
-                st.divider()
-                st.subheader("Resultados Del Cálculo")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.metric(label="Valor Z", value=f"{valor_z:.4f}")
 
-                c1, c2 = st.columns(2)
-                with c1:
-                    st.metric(label="Valor Z", value=f"{valor_z:.4f}")
+            with c2:
+                st.metric(label="Probabilidad Acumulada P(Z <= z)", value=f"{probabilidad:.4f}")
 
-                with c2:
-                    probabilidad = stats.norm.cdf(valor_z)
-                    st.metric(label="Probabilidad Acumulada P(Z <= z)", value=f"{probabilidad:.4f}")
+            st.divider()
 
-                st.divider()
+            st.info(f"""
+            **Interpretación**
+            - El puntaje {puntaje_bruto_x:.4f} está a {abs(valor_z):.4f} desviaciones estándar {'por encima' if valor_z > 0 else 'por debajo'} de la media poblacional {media_poblacional:.4f}.
+            - Aproximadamente el {probabilidad*100:.2f}% de los datos estan por debajo de este valor.
+            """)
 
-                st.info(f"""
-                **Interpretación**
-                - El puntaje {puntaje_bruto_x:.4f} está a {abs(valor_z):.4f} desviaciones estándar {'por encima' if valor_z > 0 else 'por debajo'} de la media poblacional {media_poblacional:.4f}.
-                - Aproximadamente el {probabilidad*100:.2f}% de los datos estan por debajo de este valor.
-                """)
+            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
-                st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
+
+    st.divider()
+    st.subheader("Cálculo Por Lotes")
+    st.info("Calcula el valor Z y la probabilidad acumulada de una columna completa de puntajes, "
+            "usando la media y la desviación estándar ingresadas arriba.")
+
+    try:
+        entrada_z = entrada_lote("Puntajes Brutos (X)", "lote_z")
+
+        def calcular_lote_z():
+            puntajes_lote = cargar_lote(*entrada_z)
+            # Lotes de un solo uso: sin la caché de memoizar, que guardaría (y hashearía) cada arreglo
+            valores_z_lote = np.atleast_1d(calcular_valor_z.sin_cache(puntajes_lote, media_poblacional,
+                                                                      desviacion_estandar))
+            return {
+                "X": puntajes_lote,
+                "Z": valores_z_lote,
+                "P(Z <= z)": probabilidad_acumulada.sin_cache(valores_z_lote),
+            }
+
+        pulsado = st.button("CALCULAR LOTE DE VALORES Z", key="btn_lote_z")
+        if pulsado and desviacion_estandar == 0:
+            st.error("La Desviación Estándar no puede ser cero.")
+            pulsado = False
+        entradas = (*clave_lote(*entrada_z), media_poblacional, desviacion_estandar)
+        resultado = resultado_sesion(st.session_state, "lote_z", entradas, calcular_lote_z, pulsado)
+        if resultado is not None:
+            if resultado["X"].size == 0:
+                st.warning("No hay datos para calcular.")
+            else:
+                st.success(f"SE CALCULARON {len(resultado['Z'])} VALORES Z.")
+                ofrecer_descarga(resultado, "valores_z.csv", "descargar_lote_z")
 
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
+    except ValueError as e:
+        st.error(f"ERROR: REVISAR EL FORMATO DE LOS DATOS. {e}")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 
 with tab2:
     st.header("Calcular Valor Z Desde Probabilidad")
@@ -96,10 +216,11 @@ with tab2:
     with col2:
         st.write("")
 
-    if st.button("CALCULAR VALOR Z DESDE PROBABILIDAD", key="btn_calcular_valor_z_probabilidad"):
-        try:
-            valor_z_inverso = stats.norm.ppf(probabilidad_input)
-
+    pulsado = st.button("CALCULAR VALOR Z DESDE PROBABILIDAD", key="btn_calcular_valor_z_probabilidad")
+    try:
+        valor_z_inverso = resultado_sesion(st.session_state, "valor_z_probabilidad", (probabilidad_input,),
+                                           lambda: z_desde_probabilidad(probabilidad_input), pulsado)
+        if valor_z_inverso is not None:
             st.divider()
             st.subheader("Resultado Del Cálculo")
 
@@ -121,15 +242,40 @@ with tab2:
 
             st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
-
-
-
-
-
-
-
-
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
+
+    st.divider()
+    st.subheader("Cálculo Por Lotes")
+    st.info("Calcula el valor Z de una columna completa de probabilidades acumuladas.")
+
+    try:
+        entrada_p = entrada_lote("Probabilidades (p)", "lote_p")
+
+        def calcular_lote_p():
+            probabilidades_lote = cargar_lote(*entrada_p)
+            fuera_de_rango = (probabilidades_lote <= 0) | (probabilidades_lote >= 1)
+            return {
+                "p": probabilidades_lote,
+                "Z": np.atleast_1d(z_desde_probabilidad.sin_cache(probabilidades_lote)),
+                "fuera_de_rango": bool(fuera_de_rango.any()),
+            }
+
+        pulsado = st.button("CALCULAR LOTE DESDE PROBABILIDADES", key="btn_lote_p")
+        resultado = resultado_sesion(st.session_state, "lote_p", clave_lote(*entrada_p), calcular_lote_p, pulsado)
+        if resultado is not None:
+            if resultado["p"].size == 0:
+                st.warning("No hay datos para calcular.")
+            elif resultado["fuera_de_rango"]:
+                st.error("ERROR: TODAS LAS PROBABILIDADES DEBEN ESTAR ENTRE 0 Y 1.")
+            else:
+                st.success(f"SE CALCULARON {resultado['p'].size} VALORES Z.")
+                ofrecer_descarga({"p": resultado["p"], "Z": resultado["Z"]},
+                                 "valores_z_desde_probabilidad.csv", "descargar_lote_p")
 
+    except ValueError as e:
+        st.error(f"ERROR: REVISAR EL FORMATO DE LOS DATOS. {e}")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 
+mostrar_panel()
@@ -1,17 +1,135 @@
+import numpy as np
 import streamlit as st
 
+from estadistica import (
+    NIVELES_CONFIANZA,
+    cola_desde_etiqueta,
+    critico_z,
+    efecto_minimo_detectable,
+    grilla_tamano_muestra,
+    leer_numeros,
+    medir,
+    nivel_desde_etiqueta,
+    potencia_prueba,
+    precargar,
+    resultado_sesion,
+    resumen_invalidos,
+    tamano_muestra_finita,
+    tamano_muestra_infinita,
+    tamano_muestra_potencia,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
+
 st.set_page_config(page_title="Tamaño de Muestra",
                    layout="wide")
+precargar()
+iniciar_pagina("tamano_muestra")
 st.title(":green[Calculo De Tamaño De Muestra]",
             text_alignment="center",)
-valores_z = {
-    "90%": 1.645,
-    "95%": 1.96,
-    "97.5%": 2.241,
-    "99%": 2.576
-}
-
-tab1, tab2 = st.tabs(["POBLACION FINITA", "POBLACION INFINITA"])
+
+
+MAXIMO_EJE_MAPA = 50
+
+
+def rango(etiqueta, desde, hasta, pasos, key, min_value=None, max_value=None):
+    """Tres controles (desde, hasta, pasos) que definen un eje de la grilla; devuelve (desde, hasta, pasos)."""
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        inicio = st.number_input(f"{etiqueta} desde:", value=desde, min_value=min_value, max_value=max_value,
+                                 key=f"{key}_desde")
+    with c2:
+        fin = st.number_input(f"{etiqueta} hasta:", value=hasta, min_value=min_value, max_value=max_value,
+                              key=f"{key}_hasta")
+    with c3:
+        cantidad = st.number_input("Pasos:", value=pasos, min_value=1, max_value=10_000, step=1, key=f"{key}_pasos")
+    return inicio, fin, int(cantidad)
+
+
+def eje(inicio, fin, cantidad, escala_log=False):
+    """Valores de un eje de la grilla; con escala_log, espaciados geométricamente."""
+    if escala_log:
+        if inicio <= 0 or fin <= 0:
+            raise ValueError("El tamaño de la población debe ser mayor que cero.")
+        return np.geomspace(inicio, fin, cantidad)
+    return np.linspace(inicio, fin, cantidad)
+
+
+def tabla_grilla(grilla, poblaciones, confianzas, proporciones, errores):
+    """Grilla en formato largo (una fila por combinación) para exportar."""
+    import pandas as pd
+
+    indice = pd.MultiIndex.from_product(
+        [poblaciones, confianzas * 100, proporciones, errores * 100],
+        names=["N", "Confianza (%)", "p", "E (%)"],
+    )
+    return pd.DataFrame({"n": grilla.ravel()}, index=indice).reset_index()
+
+
+@medir("dibujo")
+def mostrar_grilla(grilla, poblaciones, confianzas, proporciones, errores):
+    # altair y pandas tardan en importarse: se cargan al mostrar la primera grilla
+    import altair as alt
+    import pandas as pd
+
+    st.success(f"SE CALCULARON {grilla.size:,} TAMAÑOS DE MUESTRA.")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        i_n = st.selectbox("Población (N):", range(len(poblaciones)),
+                           format_func=lambda i: f"{poblaciones[i]:,.0f}", key="grilla_corte_N")
+    with c2:
+        i_c = st.selectbox("Nivel de confianza:", range(len(confianzas)),
+                           format_func=lambda i: f"{confianzas[i]:.2%}", key="grilla_corte_confianza")
+
+    # Corte p x E para la población y confianza elegidas
+    corte = pd.DataFrame(np.round(grilla[i_n, i_c]),
+                         index=pd.Index(np.round(proporciones, 4), name="p"),
+                         columns=pd.Index(np.round(errores * 100, 4), name="E (%)"))
+    # El mapa de calor muestra a lo sumo MAXIMO_EJE_MAPA valores por eje
+    filas = np.unique(np.linspace(0, len(proporciones) - 1, MAXIMO_EJE_MAPA).astype(int))
+    columnas = np.unique(np.linspace(0, len(errores) - 1, MAXIMO_EJE_MAPA).astype(int))
+    largo = corte.iloc[filas, columnas].stack().rename("n").reset_index()
+    mapa = alt.Chart(largo).mark_rect().encode(
+        x=alt.X("E (%):O"),
+        y=alt.Y("p:O"),
+        color=alt.Color("n:Q", scale=alt.Scale(scheme="greens")),
+        tooltip=["p", "E (%)", "n"],
+    )
+    st.altair_chart(mapa, width="stretch")
+
+    # Curva de n contra E para cada nivel de confianza, con el p más cercano a 0.5
+    i_p = int(np.argmin(np.abs(proporciones - 0.5)))
+    curvas = pd.DataFrame(grilla[i_n, :, i_p, :].T,
+                          index=pd.Index(errores * 100, name="E (%)"),
+                          columns=[f"{c:.2%}" for c in confianzas])
+    st.caption(f"Tamaño de muestra contra el margen de error con p = {proporciones[i_p]:.4f}.")
+    st.line_chart(curvas)
+
+    st.dataframe(corte, width="stretch")
+    st.download_button(
+        "DESCARGAR GRILLA COMPLETA (CSV)",
+        # El CSV de la grilla completa solo se genera al hacer clic
+        data=lambda: tabla_grilla(grilla, poblaciones, confianzas, proporciones, errores)
+        .to_csv(index=False).encode("utf-8"),
+        file_name="grilla_tamano_muestra.csv",
+        mime="text/csv",
+        on_click="ignore",
+        key="descargar_grilla"
+    )
+
+
+def lista_valores(texto):
+    """Valores separados por comas de un cuadro de texto; lanza ValueError si hay tokens inválidos."""
+    valores, invalidos = leer_numeros(texto)
+    if invalidos:
+        raise ValueError(f"{len(invalidos)} VALORES NO SON NÚMEROS: {resumen_invalidos(invalidos)}")
+    if valores.size == 0:
+        raise ValueError("INGRESA AL MENOS UN VALOR EN CADA CUADRO.")
+    return valores
+
+
+tab1, tab2, tab3, tab4 = st.tabs(["POBLACION FINITA", "POBLACION INFINITA", "GRILLA DE SENSIBILIDAD",
+                                  "POTENCIA Y TAMAÑO DE MUESTRA"])
 with tab1:
     st.header("Calcular Tamaño de Muestra para Población Finita")
     st.text("Calcula el tamaño de muestra necesario para una población finita.")
@@ -28,11 +146,11 @@ with tab1:
         )
         nvl_confianza = st.selectbox(
             "Nivel de Confianza:",
-            options=list(valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index=1,
             key="confianza_poblacion_finita"
         )
-        z = valores_z[nvl_confianza]
 
     with col2:
         probabilidad = st.number_input(
@@ -55,20 +173,21 @@ with tab1:
         )
         e = margen_error / 100
 
-    if st.button("CALCULAR TAMAÑO DE MUESTRA", key="btn_calcular_tamano_muestra_finita"):
-        if tamano_poblacional > 0:
-            q = 1 - probabilidad
-
-            numerador = tamano_poblacional * (z ** 2) * probabilidad * q
-            denominador = ((e ** 2) * (tamano_poblacional - 1) + ((z ** 2) * probabilidad * q))
-
-            resultado = numerador / denominador if denominador != 0 else 0
-
+    pulsado = st.button("CALCULAR TAMAÑO DE MUESTRA", key="btn_calcular_tamano_muestra_finita")
+    if pulsado and tamano_poblacional <= 0:
+        st.error("ERROR: INGRESAR UNA POBLACIÓN VÁLIDA (N > 0).")
+        pulsado = False
+    try:
+        resultado = resultado_sesion(
+            st.session_state, "tamano_finita", (tamano_poblacional, nvl_confianza, probabilidad, e),
+            lambda: tamano_muestra_finita(tamano_poblacional, critico_z(nivel_desde_etiqueta(nvl_confianza)),
+                                          probabilidad, e),
+            pulsado)
+        if resultado is not None:
             st.success(f"El tamaño de muestra necesario es: {round(resultado)}")
             st.write(f"**Resultado Exacto:** {resultado:.4f}")
-
-        else:
-            st.error("ERROR: INGRESAR UNA POBLACIÓN VÁLIDA (N > 0).")
+    except ValueError as error:
+        st.error(f"ERROR: {error}")
 
 with tab2:
     st.header("Calcular Tamaño de Muestra para Población Infinita")
@@ -79,11 +198,11 @@ with tab2:
     with col1:
         nvl_confianza_inf = st.selectbox(
             "Nivel de Confianza:",
-            options=list(valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index=1,
             key="confianza_poblacion_infinita"
         )
-        z_inf = valores_z[nvl_confianza_inf]
 
     with col2:
         probabilidad_inf = st.number_input(
@@ -106,17 +225,153 @@ with tab2:
         )
         e_inf = margen_error_inf / 100
 
-    if st.button("CALCULAR TAMAÑO DE MUESTRA", key="btn_calcular_tamano_muestra_infinita"):
+    pulsado = st.button("CALCULAR TAMAÑO DE MUESTRA", key="btn_calcular_tamano_muestra_infinita")
+    try:
+        resultado_inf = resultado_sesion(
+            st.session_state, "tamano_infinita", (nvl_confianza_inf, probabilidad_inf, e_inf),
+            lambda: tamano_muestra_infinita(critico_z(nivel_desde_etiqueta(nvl_confianza_inf)), probabilidad_inf,
+                                            e_inf),
+            pulsado)
+        if resultado_inf is not None:
+            st.success(f"El tamaño de muestra necesario es: {round(resultado_inf)}")
+            st.write(f"**Resultado Exacto:** {resultado_inf:.4f}")
+    except ValueError as error:
+        st.error(f"ERROR: {error}")
+
+
+
+
+with tab3:
+    st.header("Grilla de Sensibilidad del Tamaño de Muestra")
+    st.text("Calcula el tamaño de muestra para todas las combinaciones de población, nivel de confianza, "
+            "probabilidad y margen de error.")
+    st.info("Ingresa el rango y la cantidad de pasos de cada parámetro.")
+
+    rango_N = rango("Población (N)", 100.0, 100000.0, 10, "grilla_N", min_value=1.0)
+    infinita = st.checkbox("Incluir población infinita", value=True, key="grilla_infinita")
+    rango_confianza = rango("Nivel de Confianza (%)", 90.0, 99.0, 4, "grilla_confianza", min_value=0.1,
+                            max_value=99.9)
+    rango_p = rango("Probabilidad Estimada (p)", 0.05, 0.95, 19, "grilla_p", min_value=0.001, max_value=0.999)
+    rango_E = rango("Margen de Error (E) (%)", 1.0, 10.0, 10, "grilla_E", min_value=0.01)
 
-        q_inf = 1 - probabilidad_inf
+    pulsado = st.button("CALCULAR GRILLA", key="btn_grilla")
+    try:
+        poblaciones = eje(*rango_N, escala_log=True)
+        if infinita:
+            poblaciones = np.append(poblaciones, np.inf)
+        confianzas = eje(*rango_confianza) / 100
+        proporciones = eje(*rango_p)
+        errores = eje(*rango_E) / 100
+        # La grilla queda en el almacén de resultados para poder cambiar el corte sin recalcularla
+        grilla = resultado_sesion(st.session_state, "grilla_tamano", (poblaciones, confianzas, proporciones, errores),
+                                  lambda: grilla_tamano_muestra(poblaciones, confianzas, proporciones, errores),
+                                  pulsado)
+        if grilla is not None:
+            mostrar_grilla(grilla, poblaciones, confianzas, proporciones, errores)
+    except ValueError as e:
+        st.error(f"ERROR: {e}")
 
-        numerador_inf = (z_inf ** 2) * probabilidad_inf * q_inf
-        denominador_inf = e_inf ** 2
 
-        resultado_inf = numerador_inf / denominador_inf if denominador_inf != 0 else 0
+with tab4:
+    st.header("Potencia y Tamaño de Muestra para Pruebas de Hipótesis")
+    st.text("Calcula el tamaño de muestra para detectar un efecto con la potencia deseada, la potencia con un "
+            "tamaño de muestra dado o el menor efecto detectable, para las pruebas de la página de Prueba de "
+            "Hipótesis.")
+    st.info("Ingresa uno o varios valores separados por comas: se resuelven todas las combinaciones a la vez.")
+
+    escenarios_potencia = {"MEDIA": "media", "DOS MEDIAS": "dos_medias", "PROPORCIÓN": "proporcion",
+                           "DOS PROPORCIONES": "dos_proporciones"}
+    escenario = escenarios_potencia[st.radio("Prueba:", list(escenarios_potencia), horizontal=True,
+                                             key="escenario_tamano_potencia")]
+    incognita = st.radio("Calcular:", ["TAMAÑO DE MUESTRA", "POTENCIA", "EFECTO MÍNIMO DETECTABLE"],
+                         horizontal=True, key="incognita_potencia")
+    medias = escenario in ("media", "dos_medias")
+    dos_grupos = escenario.startswith("dos")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cola_potencia = st.selectbox(
+            "Tipo de prueba:",
+            ["Bilateral (≠)", "Cola derecha (>)", "Cola izquierda (<)"],
+            key="cola_tamano_potencia"
+        )
+        alpha_potencia = st.number_input(
+            "Nivel de Significancia (α):",
+            min_value=0.001,
+            max_value=0.5,
+            value=0.05,
+            format="%.3f",
+            key="alpha_tamano_potencia"
+        )
+        if medias:
+            desviacion_potencia = st.number_input("Desviación Estándar (σ):", min_value=0.0001, value=1.0,
+                                                  format="%.4f", key="desviacion_tamano_potencia")
+            prueba_potencia = st.radio("Distribución:", ["Z", "T"], horizontal=True, key="prueba_tamano_potencia")
+            base_potencia = 0.5
+        else:
+            desviacion_potencia = 1.0
+            prueba_potencia = "Z"
+            etiqueta_base = "Proporción del Grupo 2 (p₂):" if dos_grupos else "Proporción Bajo H₀ (p₀):"
+            base_potencia = st.number_input(etiqueta_base, min_value=0.001, max_value=0.999, value=0.5, format="%.3f",
+                                            key="base_tamano_potencia")
+        razon_potencia = 1.0
+        if dos_grupos:
+            razon_potencia = st.number_input("Razón n₂ / n₁:", min_value=0.01, value=1.0, format="%.2f",
+                                             key="razon_tamano_potencia")
+
+    texto_efectos = texto_tamanos = texto_potencias = ""
+    with col2:
+        if medias:
+            etiqueta_efecto = "Efecto (μ - μ₀):" if escenario == "media" else "Efecto (μ₁ - μ₂):"
+        else:
+            etiqueta_efecto = "Efecto (p - p₀):" if escenario == "proporcion" else "Efecto (p₁ - p₂):"
+        if incognita != "EFECTO MÍNIMO DETECTABLE":
+            texto_efectos = st.text_input(etiqueta_efecto, value="0.1, 0.2, 0.3" if not medias else "0.2, 0.5, 0.8",
+                                          key="efectos_potencia")
+        if incognita != "TAMAÑO DE MUESTRA":
+            texto_tamanos = st.text_input("Tamaño de Muestra (n₁):", value="20, 50, 100, 200",
+                                          key="tamanos_tamano_potencia")
+        if incognita != "POTENCIA":
+            texto_potencias = st.text_input("Potencia Deseada (1 - β):", value="0.8, 0.9", key="potencias_potencia")
 
-        st.success(f"El tamaño de muestra necesario es: {round(resultado_inf)}")
-        st.write(f"**Resultado Exacto:** {resultado_inf:.4f}")
+    def calcular_potencia():
+        opciones = dict(alpha=alpha_potencia, cola=cola_desde_etiqueta(cola_potencia), desviacion=desviacion_potencia,
+                        base=base_potencia, razon=razon_potencia, prueba=prueba_potencia.lower())
+        # Filas: primer valor conocido; columnas: segundo valor conocido
+        if incognita == "TAMAÑO DE MUESTRA":
+            filas, columnas = lista_valores(texto_efectos), lista_valores(texto_potencias)
+            resultado = tamano_muestra_potencia(escenario, filas[:, None], columnas[None, :], **opciones)
+            return filas, columnas, resultado, (etiqueta_efecto.rstrip(":"), "Potencia")
+        if incognita == "POTENCIA":
+            filas, columnas = lista_valores(texto_efectos), lista_valores(texto_tamanos)
+            resultado = potencia_prueba(escenario, filas[:, None], columnas[None, :], **opciones)
+            return filas, columnas, resultado, (etiqueta_efecto.rstrip(":"), "n₁")
+        filas, columnas = lista_valores(texto_tamanos), lista_valores(texto_potencias)
+        resultado = efecto_minimo_detectable(escenario, filas[:, None], columnas[None, :], **opciones)
+        return filas, columnas, resultado, ("n₁", "Potencia")
 
+    pulsado = st.button("CALCULAR", key="btn_tamano_potencia")
+    entradas = (escenario, incognita, cola_potencia, alpha_potencia, desviacion_potencia, base_potencia,
+                razon_potencia, prueba_potencia, texto_efectos, texto_tamanos, texto_potencias)
+    try:
+        calculo = resultado_sesion(st.session_state, "tamano_potencia", entradas, calcular_potencia, pulsado)
+        if calculo is not None:
+            import pandas as pd
 
+            filas, columnas, resultado, nombres = calculo
+            with medir("dibujo"):
+                tabla = pd.DataFrame(resultado, index=pd.Index(filas, name=nombres[0]),
+                                     columns=pd.Index(columnas, name=nombres[1]))
+                st.success(f"SE CALCULARON {resultado.size:,} VALORES DE {incognita}.")
+                if len(filas) > 1:
+                    st.line_chart(tabla.set_axis([f"{nombres[1]} = {c:g}" for c in columnas], axis=1))
+                st.dataframe(tabla, width="stretch")
+                if np.isnan(resultado).any():
+                    st.warning("LAS CELDAS VACÍAS NO TIENEN SOLUCIÓN: EL EFECTO ES NULO, VA EN LA DIRECCIÓN "
+                               "CONTRARIA A LA COLA O NO SE ALCANZA LA POTENCIA.")
+                if dos_grupos and incognita == "TAMAÑO DE MUESTRA":
+                    st.caption(f"El grupo 2 necesita ceil({razon_potencia:g} · n₁) observaciones.")
+    except ValueError as error:
+        st.error(f"ERROR: {error}")
 
+mostrar_panel()
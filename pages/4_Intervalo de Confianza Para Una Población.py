@@ -1,18 +1,35 @@
+import numpy as np
 import streamlit as st
 
+from estadistica import (
+    EXTENSIONES,
+    NIVELES_CONFIANZA,
+    REMUESTRAS_POR_DEFECTO,
+    columnas_archivo,
+    critico_z,
+    etiqueta_nivel,
+    huella_archivo,
+    intervalo_bootstrap,
+    intervalo_media,
+    intervalo_proporcion,
+    leer_columna_archivo,
+    medir,
+    nivel_desde_etiqueta,
+    precargar,
+    resultado_sesion,
+    simular_cobertura,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
+
 st.set_page_config(page_title="Intervalo De Confianza Para Una Población",
                      layout="wide")
+precargar()
+iniciar_pagina("intervalo_confianza")
 
 st.title(":green[Intervalo De Confianza Para Una Población]",
          text_alignment="center")
 
-valores_z = {
-    "90%": 1.645,
-    "95%": 1.96,
-    "97.5%": 2.241,
-    "99%": 2.576
-}
-
+@medir("dibujo")
 def mostrar_resultados(limite_inferior, limite_superior, nivel_confianza):
     st.divider()
     st.subheader("Resultados Del Cálculo")
@@ -27,7 +44,8 @@ def mostrar_resultados(limite_inferior, limite_superior, nivel_confianza):
     - Con un nivel de confianza del {nivel_confianza}, el intervalo de confianza es
     de <{limite_inferior:.3f}, {limite_superior:.3f}>.""")
 
-tab1, tab2 = st.tabs(["INTERVALO DE LA MEDIA", "INTERVALO DE LA PROPORCIÓN"])
+tab1, tab2, tab3, tab4 = st.tabs(["INTERVALO DE LA MEDIA", "INTERVALO DE LA PROPORCIÓN", "INTERVALO BOOTSTRAP",
+                                  "COBERTURA SIMULADA"])
 with tab1:
     st.subheader("Calcular El Intervalo De Confianza Para La Media De Una Población",
               text_alignment="justify",)
@@ -59,26 +77,32 @@ with tab1:
         )
         nivel_confianza_media = st.selectbox(
             "Nivel de Confianza:",
-            options = list (valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index = 1,
             key="confianza_media"
         )
 
-    if st.button("CALCULAR INTERVALO DE CONFIANZA", key="calcular_intervalo_media"):
-        try:
-            z = valores_z[nivel_confianza_media]
-
-            margen_error_media = z * (desviacion_estandar_media / (tamano_muestra_media ** 0.5))
+    def calcular_intervalo_media():
+        nivel = nivel_desde_etiqueta(nivel_confianza_media)
+        limites = intervalo_media(media_muestral_media, desviacion_estandar_media, tamano_muestra_media,
+                                  critico_z(nivel))
+        return limites + (etiqueta_nivel(nivel),)
 
-            limite_inferior_media = media_muestral_media - margen_error_media
-            limite_superior_media = media_muestral_media + margen_error_media
+    pulsado = st.button("CALCULAR INTERVALO DE CONFIANZA", key="calcular_intervalo_media")
+    entradas = (tamano_muestra_media, media_muestral_media, desviacion_estandar_media, nivel_confianza_media)
+    try:
+        resultado = resultado_sesion(st.session_state, "intervalo_media", entradas, calcular_intervalo_media,
+                                     pulsado)
+        if resultado is not None:
+            limite_inferior_media, limite_superior_media, etiqueta_media = resultado
 
-            mostrar_resultados(limite_inferior_media, limite_superior_media, nivel_confianza_media)
+            mostrar_resultados(limite_inferior_media, limite_superior_media, etiqueta_media)
 
             st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 pass
 
 
@@ -108,33 +132,189 @@ with tab2:
     with col2:
         nivel_confianza_proporcion = st.selectbox(
             "Nivel De Confianza:",
-            options=list(valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index=1,
             key="confianza_proporcion"
         )
 
-    if st.button("CALCULAR INTERVALO DE CONFIANZA", key="calcular_intervalo_proporcion"):
-        try:
-            z = valores_z[nivel_confianza_proporcion]
+    def calcular_intervalo_proporcion():
+        nivel = nivel_desde_etiqueta(nivel_confianza_proporcion)
+        limites = intervalo_proporcion(proporcion_muestra_proporcion, tamano_muestra_proporcion, critico_z(nivel))
+        return limites + (etiqueta_nivel(nivel),)
 
-            p_hat = proporcion_muestra_proporcion / tamano_muestra_proporcion
+    pulsado = st.button("CALCULAR INTERVALO DE CONFIANZA", key="calcular_intervalo_proporcion")
+    entradas = (tamano_muestra_proporcion, proporcion_muestra_proporcion, nivel_confianza_proporcion)
+    try:
+        resultado = resultado_sesion(st.session_state, "intervalo_proporcion", entradas,
+                                     calcular_intervalo_proporcion, pulsado)
+        if resultado is not None:
+            limite_inferior_proporcion, limite_superior_proporcion, etiqueta_proporcion = resultado
 
-            q_hat = 1 - p_hat
+            mostrar_resultados(limite_inferior_proporcion, limite_superior_proporcion, etiqueta_proporcion)
 
-            margen_error_proporcion = z * (((p_hat * q_hat) / tamano_muestra_proporcion) ** 0.5)
+            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
-            limite_inferior_proporcion = p_hat - margen_error_proporcion
-            limite_superior_proporcion = p_hat + margen_error_proporcion
+    except Exception as e:
+        st.error(f"Ocurrió un error inesperado: {e}")
 
-            mostrar_resultados(limite_inferior_proporcion, limite_superior_proporcion, nivel_confianza_proporcion)
+pass
 
-            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
+with tab3:
+    st.subheader("Intervalo De Confianza Bootstrap Desde Datos",
+                 text_alignment="justify",)
+
+    st.info("Sube un archivo y elige una columna. El intervalo se obtiene remuestreando los datos, sin suponer "
+            "normalidad, por lo que sirve para métricas asimétricas. Para la proporción, la columna debe tener "
+            "solo ceros y unos (1 = éxito).")
+
+    archivo_bootstrap = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key="archivo_bootstrap")
+
+    if archivo_bootstrap is not None:
+        try:
+            huella = huella_archivo(archivo_bootstrap)
+            col1, col2 = st.columns(2)
+            with col1:
+                columna_bootstrap = st.selectbox("Columna:", columnas_archivo(archivo_bootstrap, huella),
+                                                 key="columna_bootstrap")
+                estadistico_bootstrap = st.radio("Estadístico:", ["MEDIA", "MEDIANA", "PROPORCIÓN"],
+                                                 horizontal=True, key="estadistico_bootstrap")
+                metodo_bootstrap = st.radio("Método:", ["PERCENTIL", "BCa"], horizontal=True,
+                                            key="metodo_bootstrap",
+                                            help="BCa corrige el sesgo y la asimetría de la distribución bootstrap.")
+            with col2:
+                remuestras_bootstrap = st.number_input(
+                    "Número de Remuestras:",
+                    min_value=100,
+                    max_value=1_000_000,
+                    value=REMUESTRAS_POR_DEFECTO,
+                    step=1000,
+                    key="remuestras_bootstrap"
+                )
+                nivel_confianza_bootstrap = st.selectbox(
+                    "Nivel De Confianza:",
+                    options=NIVELES_CONFIANZA,
+                    accept_new_options=True,
+                    index=1,
+                    key="confianza_bootstrap"
+                )
+
+            def calcular_bootstrap():
+                with medir("lectura"):
+                    valores = leer_columna_archivo(archivo_bootstrap, columna_bootstrap, huella)
+                if estadistico_bootstrap == "PROPORCIÓN" and not np.isin(valores, (0, 1)).all():
+                    raise ValueError("La columna debe contener solo ceros y unos (1 = éxito).")
+
+                with st.spinner("Remuestreando..."):
+                    resultado = intervalo_bootstrap(
+                        (valores,),
+                        "mediana" if estadistico_bootstrap == "MEDIANA" else "media",
+                        nivel_desde_etiqueta(nivel_confianza_bootstrap),
+                        metodo_bootstrap.lower(),
+                        int(remuestras_bootstrap),
+                    )
+                return dict(resultado, n=valores.size)
+
+            pulsado = st.button("CALCULAR INTERVALO BOOTSTRAP", key="calcular_intervalo_bootstrap")
+            entradas = (huella, columna_bootstrap, estadistico_bootstrap, metodo_bootstrap, remuestras_bootstrap,
+                        nivel_confianza_bootstrap)
+            resultado = resultado_sesion(st.session_state, "intervalo_bootstrap", entradas, calcular_bootstrap,
+                                         pulsado)
+            if resultado is not None:
+                nivel = nivel_desde_etiqueta(nivel_confianza_bootstrap)
+                mostrar_resultados(resultado["inferior"], resultado["superior"], etiqueta_nivel(nivel))
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    st.metric(label="Estimación", value=f"{resultado['estimacion']:.3f}")
+                with c2:
+                    st.metric(label="Error Estándar Bootstrap", value=f"{resultado['error_estandar']:.3f}")
+                with c3:
+                    st.metric(label="Sesgo Bootstrap", value=f"{resultado['sesgo']:.3f}")
+                if metodo_bootstrap == "BCa":
+                    st.caption(f"Corrección de sesgo z₀ = {resultado['z0']:.4f}; "
+                               f"aceleración a = {resultado['aceleracion']:.4f}.")
+                st.caption(f"n = {resultado['n']:,}; {resultado['remuestras']:,} remuestras.")
+
+                st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
+
+        except ValueError as e:
+            st.error(f"ERROR: {e}")
         except Exception as e:
-            st.error(f"Ocurrió un error inesperado: {e}")
+            st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
 
-pass
 
+with tab4:
+    st.subheader("Cobertura Simulada De Los Intervalos",
+                 text_alignment="justify",)
 
+    st.info("Genera muchas muestras con un valor verdadero conocido y cuenta en qué proporción de ellas el "
+            "intervalo de las otras pestañas lo contiene. Con muestras pequeñas, datos asimétricos o "
+            "proporciones cercanas a 0 o 1 la cobertura real queda por debajo del nivel nominal.")
 
+    col1, col2 = st.columns(2)
+    with col1:
+        parametro_cobertura = st.radio("Intervalo:", ["MEDIA", "PROPORCIÓN"], horizontal=True,
+                                       key="parametro_cobertura")
+        tamanos_cobertura = st.text_input("Tamaños de Muestra (separados por comas):", value="5, 10, 30, 100",
+                                          key="tamanos_cobertura")
+        if parametro_cobertura == "MEDIA":
+            distribucion_cobertura = st.selectbox("Distribución de los Datos:",
+                                                  ["NORMAL", "LOGNORMAL", "EXPONENCIAL", "UNIFORME"],
+                                                  key="distribucion_cobertura")
+        else:
+            p_cobertura = st.number_input("Proporción Verdadera (p):", min_value=0.001, max_value=0.999,
+                                          value=0.1, format="%.3f", key="p_cobertura")
+    with col2:
+        nivel_confianza_cobertura = st.selectbox(
+            "Nivel De Confianza:",
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
+            index=1,
+            key="confianza_cobertura"
+        )
+        replicas_cobertura = st.number_input(
+            "Número de Réplicas:",
+            min_value=100,
+            max_value=1_000_000,
+            value=10_000,
+            step=1000,
+            key="replicas_cobertura"
+        )
 
+    def calcular_cobertura():
+        nivel = nivel_desde_etiqueta(nivel_confianza_cobertura)
+        tamanos = [int(t) for t in tamanos_cobertura.replace(";", ",").split(",") if t.strip()]
+        if not tamanos:
+            raise ValueError("Ingresa al menos un tamaño de muestra.")
+        with st.spinner("Simulando..."):
+            if parametro_cobertura == "MEDIA":
+                return simular_cobertura("media", tamanos, 0.0, 1.0, distribucion_cobertura.lower(), nivel,
+                                         int(replicas_cobertura))
+            return simular_cobertura("proporcion", tamanos, p_cobertura, nivel=nivel,
+                                     replicas=int(replicas_cobertura))
+
+    pulsado = st.button("SIMULAR COBERTURA", key="simular_cobertura")
+    entradas = (parametro_cobertura, tamanos_cobertura,
+                distribucion_cobertura if parametro_cobertura == "MEDIA" else p_cobertura,
+                nivel_confianza_cobertura, replicas_cobertura)
+    try:
+        resultado = resultado_sesion(st.session_state, "cobertura", entradas, calcular_cobertura, pulsado)
+        if resultado is not None:
+            nivel = nivel_desde_etiqueta(nivel_confianza_cobertura)
+            with medir("dibujo"):
+                st.divider()
+                tabla = {
+                    "n": [str(n) for n in resultado["tamanos"]],
+                    "Cobertura": resultado["cobertura"],
+                    "Error de Monte Carlo": resultado["error"],
+                    "Ancho Medio": resultado["ancho_medio"],
+                }
+                st.bar_chart(tabla, x="n", y="Cobertura")
+                st.write(tabla)
+                st.caption(f"Nivel nominal: {etiqueta_nivel(nivel)}. Para la media el ancho está en unidades de σ.")
+
+    except ValueError as e:
+        st.error(f"ERROR: {e}")
+
+mostrar_panel()
@@ -1,19 +1,35 @@
+import numpy as np
 import streamlit as st
 
+from estadistica import (
+    EXTENSIONES,
+    NIVELES_CONFIANZA,
+    REMUESTRAS_POR_DEFECTO,
+    columnas_archivo,
+    critico_z,
+    etiqueta_nivel,
+    huella_archivo,
+    intervalo_bootstrap,
+    intervalo_diferencia_medias,
+    intervalo_diferencia_proporciones,
+    leer_columna_archivo,
+    medir,
+    nivel_desde_etiqueta,
+    precargar,
+    prueba_permutacion,
+    resultado_sesion,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
+
 st.set_page_config(page_title="Comparación entre Dos Poblaciones",
                    layout="wide")
+precargar()
+iniciar_pagina("dos_poblaciones")
 
 st.title(":green[Comparación entre Dos Poblaciones]",
             text_alignment="center")
 
-valores_z = {
-    "90%": 1.645,
-    "95%": 1.96,
-    "97.5%": 2.241,
-    "99%": 2.576
-}
-
-tab1, tab2 = st.tabs(["COMPARACIÓN DE MEDIAS", "COMPARACIÓN DE PROPORCIONES"])
+tab1, tab2, tab3 = st.tabs(["COMPARACIÓN DE MEDIAS", "COMPARACIÓN DE PROPORCIONES", "COMPARACIÓN BOOTSTRAP"])
 with tab1:
     st.subheader("Comparar Dos Medias Poblacionales",)
     st.info("ingresa los datos necesarios para comparar dos medias poblacionales.")
@@ -70,21 +86,28 @@ with tab1:
         )
         nivel_confianza_medias = st.selectbox(
             "Nivel de Confianza:",
-            options=list(valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index=1,
             key="confianza_comparacion_medias"
         )
 
-    if st.button("COMPARAR MEDIAS", key="comparar_medias"):
-        try:
-            z = valores_z[nivel_confianza_medias]
-
-            diferencia_medias = media_muestral_1 - media_muestral_2
-
-            error_estandar_medias = ((varianza_1 / tamano_muestra_1) + (varianza_2 / tamano_muestra_2)) ** 0.5
-
-            intervalo_confianza_superior = diferencia_medias + (z * error_estandar_medias)
-            intervalo_confianza_inferior = diferencia_medias - (z * error_estandar_medias)
+    def calcular_comparacion_medias():
+        nivel = nivel_desde_etiqueta(nivel_confianza_medias)
+        return intervalo_diferencia_medias(
+            media_muestral_1, varianza_1, tamano_muestra_1,
+            media_muestral_2, varianza_2, tamano_muestra_2, critico_z(nivel)
+        ) + (etiqueta_nivel(nivel),)
+
+    pulsado = st.button("COMPARAR MEDIAS", key="comparar_medias")
+    entradas = (tamano_muestra_1, media_muestral_1, varianza_1, tamano_muestra_2, media_muestral_2, varianza_2,
+                nivel_confianza_medias)
+    try:
+        resultado = resultado_sesion(st.session_state, "comparacion_medias", entradas, calcular_comparacion_medias,
+                                     pulsado)
+        if resultado is not None:
+            (diferencia_medias, error_estandar_medias, intervalo_confianza_inferior,
+             intervalo_confianza_superior, nivel_confianza_medias) = resultado
 
             st.divider()
 
@@ -113,8 +136,8 @@ with tab1:
             - {conclusion}
             """)
 
-        except Exception as e:
-            st.error(f"Ocurrió Un Error Inesperado: {e}")
+    except Exception as e:
+        st.error(f"Ocurrió Un Error Inesperado: {e}")
 pass
 
 with tab2:
@@ -160,24 +183,28 @@ with tab2:
         )
         nivel_confianza_proporciones = st.selectbox(
             "Nivel de Confianza:",
-            options=list(valores_z.keys()),
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
             index=1,
             key="confianza_comparacion_proporciones"
         )
 
-    if st.button("COMPARAR PROPORCIONES", key="comparar_proporciones"):
-        try:
-            z = valores_z[nivel_confianza_proporciones]
-
-            diferencia_proporciones = proporcion_1 - proporcion_2
-
-            q1 = 1 - proporcion_1
-            q2 = 1 - proporcion_2
-
-            error_estandar_proporciones =(((proporcion_1 * q1) / tamano_muestra_proporcion_1) + ((proporcion_2 * q2) / tamano_muestra_proporcion_2)) ** 0.5
-
-            intervalo_confianza_superior_prop = diferencia_proporciones + (z * error_estandar_proporciones)
-            intervalo_confianza_inferior_prop = diferencia_proporciones - (z * error_estandar_proporciones)
+    def calcular_comparacion_proporciones():
+        nivel = nivel_desde_etiqueta(nivel_confianza_proporciones)
+        return intervalo_diferencia_proporciones(
+            proporcion_1, tamano_muestra_proporcion_1,
+            proporcion_2, tamano_muestra_proporcion_2, critico_z(nivel)
+        ) + (etiqueta_nivel(nivel),)
+
+    pulsado = st.button("COMPARAR PROPORCIONES", key="comparar_proporciones")
+    entradas = (tamano_muestra_proporcion_1, proporcion_1, tamano_muestra_proporcion_2, proporcion_2,
+                nivel_confianza_proporciones)
+    try:
+        resultado = resultado_sesion(st.session_state, "comparacion_proporciones", entradas,
+                                     calcular_comparacion_proporciones, pulsado)
+        if resultado is not None:
+            (diferencia_proporciones, error_estandar_proporciones, intervalo_confianza_inferior_prop,
+             intervalo_confianza_superior_prop, nivel_confianza_proporciones) = resultado
 
             st.divider()
 
@@ -205,21 +232,139 @@ with tab2:
             - {conclusion_prop}
             """)
 
-        except Exception as e:
-            st.error(f"Ocurrió Un Error Inesperado: {e}")
+    except Exception as e:
+        st.error(f"Ocurrió Un Error Inesperado: {e}")
 
 pass
 
 
+with tab3:
+    st.subheader("Comparar Dos Poblaciones Con Bootstrap")
 
+    st.info("Sube un archivo y elige la columna de cada muestra. Cada muestra se remuestrea por separado y el "
+            "intervalo es para la diferencia (muestra 1 - muestra 2), sin suponer normalidad. Para las "
+            "proporciones, las columnas deben tener solo ceros y unos (1 = éxito).")
 
+    archivo_bootstrap = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key="archivo_bootstrap_dos")
 
+    if archivo_bootstrap is not None:
+        try:
+            huella = huella_archivo(archivo_bootstrap)
+            columnas = columnas_archivo(archivo_bootstrap, huella)
+            col1, col2 = st.columns(2)
+            with col1:
+                columna_1 = st.selectbox("Muestra 1:", columnas, key="columna_bootstrap_1")
+                columna_2 = st.selectbox("Muestra 2:", columnas, index=min(1, len(columnas) - 1),
+                                         key="columna_bootstrap_2")
+                estadistico_bootstrap = st.radio("Diferencia de:", ["MEDIAS", "MEDIANAS", "PROPORCIONES"],
+                                                 horizontal=True, key="estadistico_bootstrap_dos")
+            with col2:
+                metodo_bootstrap = st.radio("Método:", ["PERCENTIL", "BCa"], horizontal=True,
+                                            key="metodo_bootstrap_dos",
+                                            help="BCa corrige el sesgo y la asimetría de la distribución bootstrap.")
+                remuestras_bootstrap = st.number_input(
+                    "Número de Remuestras:",
+                    min_value=100,
+                    max_value=1_000_000,
+                    value=REMUESTRAS_POR_DEFECTO,
+                    step=1000,
+                    key="remuestras_bootstrap_dos"
+                )
+                nivel_confianza_bootstrap = st.selectbox(
+                    "Nivel de Confianza:",
+                    options=NIVELES_CONFIANZA,
+                    accept_new_options=True,
+                    index=1,
+                    key="confianza_bootstrap_dos"
+                )
+                incluir_permutacion = st.checkbox(
+                    "Incluir prueba de permutación (H₀: no hay diferencia)",
+                    key="permutacion_dos",
+                    help="Exacta con muestras pequeñas o con proporciones; si no, Monte Carlo hasta que el "
+                         "error del p-valor sea menor que 0.001."
+                )
+
+            def calcular_comparacion():
+                with medir("lectura"):
+                    muestras = tuple(leer_columna_archivo(archivo_bootstrap, c, huella)
+                                     for c in (columna_1, columna_2))
+                if estadistico_bootstrap == "PROPORCIONES" and not all(np.isin(m, (0, 1)).all() for m in muestras):
+                    raise ValueError("Las columnas deben contener solo ceros y unos (1 = éxito).")
+                estadistico = "mediana" if estadistico_bootstrap == "MEDIANAS" else "media"
+
+                with st.spinner("Remuestreando..."):
+                    intervalo = intervalo_bootstrap(
+                        muestras,
+                        estadistico,
+                        nivel_desde_etiqueta(nivel_confianza_bootstrap),
+                        metodo_bootstrap.lower(),
+                        int(remuestras_bootstrap),
+                    )
+                permutacion = None
+                if incluir_permutacion:
+                    with st.spinner("Permutando..."):
+                        permutacion = prueba_permutacion(muestras, estadistico)
+                return {"intervalo": intervalo, "permutacion": permutacion, "n": tuple(m.size for m in muestras)}
+
+            pulsado = st.button("CALCULAR COMPARACIÓN BOOTSTRAP", key="comparar_bootstrap")
+            entradas = (huella, columna_1, columna_2, estadistico_bootstrap, metodo_bootstrap, remuestras_bootstrap,
+                        nivel_confianza_bootstrap, incluir_permutacion)
+            comparacion = resultado_sesion(st.session_state, "comparacion_bootstrap", entradas, calcular_comparacion,
+                                           pulsado)
+            if comparacion is not None:
+                nivel = nivel_desde_etiqueta(nivel_confianza_bootstrap)
+                resultado = comparacion["intervalo"]
+                inferior, superior = resultado["inferior"], resultado["superior"]
+
+                st.divider()
+
+                st.subheader("Resultados Del Cálculo")
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    st.metric(label=f"Diferencia de {estadistico_bootstrap.capitalize()}",
+                              value=f"{resultado['estimacion']:.3f}")
+                with c2:
+                    st.metric(label="Error Estándar Bootstrap", value=f"{resultado['error_estandar']:.3f}")
+                with c3:
+                    st.metric(label="IC Límite Superior", value=f"{superior:.3f}")
+                    st.metric(label="IC Límite Inferior", value=f"{inferior:.3f}")
+                if metodo_bootstrap == "BCa":
+                    st.caption(f"Corrección de sesgo z₀ = {resultado['z0']:.4f}; "
+                               f"aceleración a = {resultado['aceleracion']:.4f}.")
+                st.caption(f"n₁ = {comparacion['n'][0]:,}; n₂ = {comparacion['n'][1]:,}; "
+                           f"{resultado['remuestras']:,} remuestras.")
+
+                st.divider()
+
+                if inferior > 0 or superior < 0:
+                    conclusion = "Hay evidencia suficiente para afirmar que las poblaciones son diferentes."
+                else:
+                    conclusion = "No hay evidencia suficiente para afirmar que las poblaciones son diferentes."
+
+                st.info(f"""
+                **Interpretación**
+                - Con un nivel de confianza del {etiqueta_nivel(nivel)}, el intervalo bootstrap para la diferencia es
+                de <{inferior:.3f}, {superior:.3f}>.
+                - {conclusion}
+                """)
+
+                permutacion = comparacion["permutacion"]
+                if permutacion is not None:
+                    c1, c2 = st.columns(2)
+                    with c1:
+                        st.metric(label="P-Valor (Permutación Bilateral)", value=f"{permutacion['p_valor']:.4f}")
+                    with c2:
+                        st.metric(label="Permutaciones", value=f"{permutacion['permutaciones']:,}")
+                    if permutacion["metodo"] == "Monte Carlo":
+                        st.caption(f"Monte Carlo: error del p-valor ± {permutacion['error_p']:.4f}; "
+                                   f"cálculo original a {permutacion['permutaciones_por_segundo']:,.0f} permutaciones por "
+                                   f"segundo.")
+                    else:
+                        st.caption(f"Prueba {permutacion['metodo']}.")
+
+        except ValueError as e:
+            st.error(f"ERROR: {e}")
+        except Exception as e:
+            st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
 
-
-
-
-
-
-
-
-
+mostrar_panel()
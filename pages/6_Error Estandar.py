@@ -1,7 +1,12 @@
 import streamlit as st
 
+from estadistica import error_estandar_media, error_estandar_proporcion, precargar, resultado_sesion
+from rendimiento import iniciar_pagina, mostrar_panel
+
 st.set_page_config(page_title="Error Estandar",
                         layout="wide")
+precargar()
+iniciar_pagina("error_estandar")
 
 st.title(":green[Error Estándar]",
             text_alignment="center")
@@ -31,18 +36,21 @@ with tab1:
             key="n_tamano_muestra_media"
         )
 
-    if st.button("CÁLCULAR ERROR ESTÁNDAR", key = "calcular_error_media"):
-        try:
-            if tamano_muestra_media <= 0:
-                st.error("El tamaño muestral debe ser mayor que cero.")
-            else:
-                error_estandar_media = desviacion_estandar_media / (tamano_muestra_media ** 0.5)
-                st.divider()
-                st.subheader("Resultados Del Cálculo")
-                st.metric(label="Error Estándar De La Media (SE)", value=f"{error_estandar_media:.3f}")
-                st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
-        except Exception as e:
-            st.error(f"Ocurrio Un Error Inesperado: {e}")
+    pulsado = st.button("CÁLCULAR ERROR ESTÁNDAR", key = "calcular_error_media")
+    if pulsado and tamano_muestra_media <= 0:
+        st.error("El tamaño muestral debe ser mayor que cero.")
+        pulsado = False
+    try:
+        error_estandar_media_calc = resultado_sesion(
+            st.session_state, "error_media", (desviacion_estandar_media, tamano_muestra_media),
+            lambda: error_estandar_media(desviacion_estandar_media, tamano_muestra_media), pulsado)
+        if error_estandar_media_calc is not None:
+            st.divider()
+            st.subheader("Resultados Del Cálculo")
+            st.metric(label="Error Estándar De La Media (SE)", value=f"{error_estandar_media_calc:.3f}")
+            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
+    except Exception as e:
+        st.error(f"Ocurrio Un Error Inesperado: {e}")
 
 pass
 
@@ -69,19 +77,21 @@ with tab2:
             key="n_tamano_muestra_proporcion"
         )
 
-    if st.button("CÁLCULAR ERROR ESTÁNDAR", key = "calcular_error_proporcion"):
-        try:
-            if tamano_muestra_proporcion <= 0:
-                st.error("El tamaño muestral debe ser mayor que cero.")
-            else:
-                error_estandar_proporcion = ((proporcion_muestral * (1 - proporcion_muestral)) / tamano_muestra_proporcion) ** 0.5
-                st.divider()
-                st.subheader("Resultados Del Cálculo")
-                st.metric(label="Error Estándar De La Proporción (SE)", value=f"{error_estandar_proporcion:.3f}")
-                st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
-
-        except Exception as e:
-            st.error(f"Ocurrio Un Error Inesperado: {e}")
-
-
-
+    pulsado = st.button("CÁLCULAR ERROR ESTÁNDAR", key = "calcular_error_proporcion")
+    if pulsado and tamano_muestra_proporcion <= 0:
+        st.error("El tamaño muestral debe ser mayor que cero.")
+        pulsado = False
+    try:
+        error_estandar_proporcion_calc = resultado_sesion(
+            st.session_state, "error_proporcion", (proporcion_muestral, tamano_muestra_proporcion),
+            lambda: error_estandar_proporcion(proporcion_muestral, tamano_muestra_proporcion), pulsado)
+        if error_estandar_proporcion_calc is not None:
+            st.divider()
+            st.subheader("Resultados Del Cálculo")
+            st.metric(label="Error Estándar De La Proporción (SE)", value=f"{error_estandar_proporcion_calc:.3f}")
+            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
+
+    except Exception as e:
+        st.error(f"Ocurrio Un Error Inesperado: {e}")
+
+mostrar_panel()
@@ -1,7 +1,20 @@
 import streamlit as st
 
+from estadistica import (
+    NIVELES_CONFIANZA,
+    critico_t,
+    etiqueta_nivel,
+    nivel_desde_etiqueta,
+    precargar,
+    resultado_sesion,
+    valor_t,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
+
 st.set_page_config(page_title="Error Estándar",
                         layout="wide")
+precargar()
+iniciar_pagina("calculo_t")
 
 st.title(":green[Cálculo t student]",
          text_alignment="center")
@@ -43,22 +56,42 @@ with tab1:
             step=1,
             key="n_tamano_muestra_t_student"
         )
+        nivel_confianza = st.selectbox(
+            "Nivel de Confianza (valor crítico):",
+            options=NIVELES_CONFIANZA,
+            accept_new_options=True,
+            index=1,
+            key="confianza_t_student"
+        )
+
+    def calcular_t_student():
+        nivel = nivel_desde_etiqueta(nivel_confianza)
+        t_student = valor_t(media_muestral, media_poblacional, desviacion_estandar, tamano_muestra)
+        return t_student, nivel, critico_t(nivel, tamano_muestra - 1)
 
-    if st.button("CÁLCULAR VALOR T STUDENT", key = "calcular_t_student"):
-        try:
-            if tamano_muestra <= 1:
-                st.error("El tamaño de la muestra debe ser mayor que uno.")
-            else:
-                error_estandar = desviacion_estandar / (tamano_muestra ** 0.5)
-                t_student = (media_muestral - media_poblacional) / error_estandar
+    pulsado = st.button("CÁLCULAR VALOR T STUDENT", key = "calcular_t_student")
+    if pulsado and tamano_muestra <= 1:
+        st.error("El tamaño de la muestra debe ser mayor que uno.")
+        pulsado = False
+    entradas = (media_muestral, media_poblacional, desviacion_estandar, tamano_muestra, nivel_confianza)
+    try:
+        resultado = resultado_sesion(st.session_state, "t_student", entradas, calcular_t_student, pulsado)
+        if resultado is not None:
+            t_student, nivel, t_critico = resultado
 
-                st.divider()
+            st.divider()
 
-                st.subheader("Resultados Del Cálculo")
+            st.subheader("Resultados Del Cálculo")
+            c1, c2 = st.columns(2)
+            with c1:
                 st.metric(label = "Valor T Student (t)" , value = f"{t_student:.3f}")
+            with c2:
+                st.metric(label = f"Valor Crítico Bilateral al {etiqueta_nivel(nivel)} ({tamano_muestra - 1} gl)",
+                          value = f"±{t_critico:.3f}")
 
-                st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
+            st.success("EL CÁLCULO SE HA REALIZADO CON ÉXITO.")
 
-        except Exception as e:
-            st.error(f"Ocurrio Un Error Inesperado: {e}")
+    except Exception as e:
+        st.error(f"Ocurrio Un Error Inesperado: {e}")
 
+mostrar_panel()
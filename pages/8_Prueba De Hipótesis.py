@@ -1,10 +1,40 @@
-import streamlit as st
 import numpy as np
-from scipy.stats import norm
+import streamlit as st
+
+from estadistica import (
+    COLUMNAS_LOTE,
+    CORRECCIONES,
+    ERROR_PERMUTACION,
+    EXTENSIONES,
+    PERMUTACIONES_POR_DEFECTO,
+    cola_desde_etiqueta,
+    columnas_archivo,
+    huella_archivo,
+    leer_columna_archivo,
+    leer_tabla_archivo,
+    medir,
+    precargar,
+    prueba_dos_medias,
+    prueba_dos_muestras,
+    prueba_media,
+    prueba_pareada,
+    prueba_permutacion,
+    prueba_proporcion,
+    prueba_proporcion_muestra,
+    prueba_una_muestra,
+    pruebas_lote,
+    resultado_sesion,
+    simular_potencia,
+    sumas_columna,
+    sumas_diferencias,
+)
+from rendimiento import iniciar_pagina, mostrar_panel
 
 
 st.set_page_config(page_title="Prueba de Hipótesis",
                    layout="wide")
+precargar()
+iniciar_pagina("prueba_hipotesis")
 
 st.title("Prueba de Hipótesis",
          text_alignment="center",)
@@ -15,11 +45,22 @@ st.info("Selecciona el tipo de prueba que deseas realizar y completa los paráme
 
 
 
+def region_critica(cola, z_critico, estadistico="Z"):
+    if cola == "bilateral":
+        return f"{estadistico} < -{z_critico:.4f} o {estadistico} > {z_critico:.4f}"
+    elif cola == "derecha":
+        return f"{estadistico} > {z_critico:.4f}"
+    return f"{estadistico} < {z_critico:.4f}"
+
+
 # Crear pestañas
-tab1, tab2, tab3 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "PRUEBA PARA LA MEDIA",
     "PRUEBA PARA LA PROPORCIÓN",
-    "PRUEBA PARA DOS MEDIAS"
+    "PRUEBA PARA DOS MEDIAS",
+    "PRUEBAS EN LOTE",
+    "PRUEBAS CON DATOS",
+    "SIMULACIÓN DE POTENCIA"
 ])
 
 # --- PESTAÑA 1: Prueba para Media ---
@@ -83,24 +124,16 @@ with tab1:
             key="alpha_media"
         )
 
-    if st.button("CALCULAR PRUEBA PARA MEDIA", type="secondary", key="btn_media"):
-        # Calcular estadístico Z
-        error_estandar = desv_std / np.sqrt(tamano_muestra)
-        z_calc = (media_muestral - media_poblacional) / error_estandar
-
-        # Calcular p-valor según tipo de prueba
-        if tipo_prueba_media == "Bilateral (≠)":
-            p_valor = 2 * (1 - norm.cdf(abs(z_calc)))
-            z_critico = norm.ppf(1 - nivel_significancia/2)
-            region = f"Z < -{z_critico:.4f} o Z > {z_critico:.4f}"
-        elif tipo_prueba_media == "Cola derecha (>)":
-            p_valor = 1 - norm.cdf(z_calc)
-            z_critico = norm.ppf(1 - nivel_significancia)
-            region = f"Z > {z_critico:.4f}"
-        else:  # Cola izquierda
-            p_valor = norm.cdf(z_calc)
-            z_critico = norm.ppf(nivel_significancia)
-            region = f"Z < {z_critico:.4f}"
+    pulsado = st.button("CALCULAR PRUEBA PARA MEDIA", type="secondary", key="btn_media")
+    # Calcular estadístico Z y p-valor según tipo de prueba
+    cola = cola_desde_etiqueta(tipo_prueba_media)
+    entradas = (media_muestral, media_poblacional, desv_std, tamano_muestra, nivel_significancia, cola)
+    resultado = resultado_sesion(st.session_state, "prueba_media", entradas, lambda: prueba_media(*entradas),
+                                 pulsado)
+    if resultado is not None:
+        z_calc = resultado["estadistico"]
+        p_valor = resultado["p_valor"]
+        region = region_critica(cola, resultado["critico"])
 
         # Mostrar resultados
         st.markdown("---")
@@ -207,9 +240,12 @@ with tab2:
             key="alpha_prop"
         )
 
-    if st.button("CALCULAR PRUEBA PARA PROPORCIÓN", type="secondary", key="btn_prop"):
-        prop_muestral = exitos / tamano_muestra_prop
-
+    pulsado = st.button("CALCULAR PRUEBA PARA PROPORCIÓN", type="secondary", key="btn_prop")
+    cola = cola_desde_etiqueta(tipo_prueba_prop)
+    entradas = (exitos, tamano_muestra_prop, prop_poblacional, nivel_significancia_prop, cola)
+    resultado = resultado_sesion(st.session_state, "prueba_proporcion", entradas,
+                                 lambda: prueba_proporcion(*entradas), pulsado)
+    if resultado is not None:
         # Verificar condiciones para aproximación normal
         np_val = tamano_muestra_prop * prop_poblacional
         nq_val = tamano_muestra_prop * (1 - prop_poblacional)
@@ -223,23 +259,10 @@ with tab2:
             Se recomienda que ambos valores sean ≥ 5.
             """)
 
-        # Calcular estadístico Z
-        error_estandar = np.sqrt((prop_poblacional * (1 - prop_poblacional)) / tamano_muestra_prop)
-        z_calc = (prop_muestral - prop_poblacional) / error_estandar
-
-        # Calcular p-valor
-        if tipo_prueba_prop == "Bilateral (≠)":
-            p_valor = 2 * (1 - norm.cdf(abs(z_calc)))
-            z_critico = norm.ppf(1 - nivel_significancia_prop/2)
-            region = f"Z < -{z_critico:.4f} o Z > {z_critico:.4f}"
-        elif tipo_prueba_prop == "Cola derecha (>)":
-            p_valor = 1 - norm.cdf(z_calc)
-            z_critico = norm.ppf(1 - nivel_significancia_prop)
-            region = f"Z > {z_critico:.4f}"
-        else:
-            p_valor = norm.cdf(z_calc)
-            z_critico = norm.ppf(nivel_significancia_prop)
-            region = f"Z < {z_critico:.4f}"
+        prop_muestral = resultado["proporcion_muestral"]
+        z_calc = resultado["estadistico"]
+        p_valor = resultado["p_valor"]
+        region = region_critica(cola, resultado["critico"])
 
         # Mostrar resultados
         st.markdown("---")
@@ -370,25 +393,18 @@ with tab3:
         key="alpha_dos"
     )
 
-    if st.button("CÁLCULAR PRUEBA PARA DOS MEDIAS", type="secondary", key="btn_dos"):
-        # Calcular estadístico Z
-        diferencia_medias = media1 - media2
-        error_std = np.sqrt((desv1**2 / n1) + (desv2**2 / n2))
-        z_calc = diferencia_medias / error_std
-
-        # Calcular p-valor
-        if tipo_prueba_dos == "Bilateral (μ₁ ≠ μ₂)":
-            p_valor = 2 * (1 - norm.cdf(abs(z_calc)))
-            z_critico = norm.ppf(1 - nivel_significancia_dos/2)
-            region = f"Z < -{z_critico:.4f} o Z > {z_critico:.4f}"
-        elif tipo_prueba_dos == "Cola derecha (μ₁ > μ₂)":
-            p_valor = 1 - norm.cdf(z_calc)
-            z_critico = norm.ppf(1 - nivel_significancia_dos)
-            region = f"Z > {z_critico:.4f}"
-        else:
-            p_valor = norm.cdf(z_calc)
-            z_critico = norm.ppf(nivel_significancia_dos)
-            region = f"Z < {z_critico:.4f}"
+    pulsado = st.button("CÁLCULAR PRUEBA PARA DOS MEDIAS", type="secondary", key="btn_dos")
+    # Calcular estadístico Z y p-valor
+    cola = cola_desde_etiqueta(tipo_prueba_dos)
+    entradas = (media1, desv1, n1, media2, desv2, n2, nivel_significancia_dos, cola)
+    resultado = resultado_sesion(st.session_state, "prueba_dos_medias", entradas,
+                                 lambda: prueba_dos_medias(*entradas), pulsado)
+    if resultado is not None:
+        diferencia_medias = resultado["diferencia"]
+        error_std = resultado["error_estandar"]
+        z_calc = resultado["estadistico"]
+        p_valor = resultado["p_valor"]
+        region = region_critica(cola, resultado["critico"])
 
         # Mostrar resultados
         st.markdown("---")
@@ -444,6 +460,380 @@ with tab3:
             poblacionales son iguales al nivel de significancia de {nivel_significancia_dos*100}%.
             """)
 
+# --- PESTAÑA 4: Pruebas en lote ---
+with tab4:
+    st.header("Pruebas de Hipótesis en Lote")
+
+    st.markdown("""
+    Sube un archivo con una prueba por fila. Las columnas **alpha** y **cola**
+    (bilateral, derecha, izquierda, ≠, >, <) son opcionales; si faltan se usan
+    los valores de abajo. Los p-valores se corrigen por comparaciones múltiples
+    con Bonferroni, Holm y Benjamini-Hochberg (BH).
+    """)
+
+    tipos_lote = {"MEDIA": "media", "PROPORCIÓN": "proporcion", "DOS MEDIAS": "dos_medias"}
+    tipo_lote = tipos_lote[st.radio("Tipo de prueba:", list(tipos_lote), horizontal=True, key="tipo_lote")]
+    distribucion_lote = "z"
+    if tipo_lote != "proporcion":
+        distribucion_lote = st.radio("Distribución:", ["Z", "T"], horizontal=True, key="dist_lote").lower()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        alpha_lote = st.number_input(
+            "Nivel de Significancia por Defecto (α):",
+            min_value=0.001,
+            max_value=0.5,
+            value=0.05,
+            format="%.3f",
+            key="alpha_lote"
+        )
+    with col2:
+        cola_lote = st.selectbox(
+            "Tipo de prueba por defecto:",
+            ["Bilateral (≠)", "Cola derecha (>)", "Cola izquierda (<)"],
+            key="cola_lote"
+        )
+
+    columnas_lote = COLUMNAS_LOTE[tipo_lote]
+    st.download_button(
+        "DESCARGAR PLANTILLA (CSV)",
+        data=(",".join([*columnas_lote, "alpha", "cola"]) + "\n").encode("utf-8"),
+        file_name=f"plantilla_{tipo_lote}.csv",
+        mime="text/csv",
+        key="plantilla_lote"
+    )
+
+    archivo_lote = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key="archivo_lote")
+
+    if archivo_lote is not None:
+        pulsado = st.button("CALCULAR PRUEBAS EN LOTE", type="secondary", key="btn_lote")
+        try:
+            huella = huella_archivo(archivo_lote)
+            resultado = resultado_sesion(
+                st.session_state,
+                "pruebas_lote",
+                (huella, tipo_lote, distribucion_lote, alpha_lote, cola_lote),
+                lambda: pruebas_lote(leer_tabla_archivo(archivo_lote, huella), tipo_lote, distribucion_lote,
+                                     alpha_lote, cola_desde_etiqueta(cola_lote)),
+                pulsado,
+            )
+            if resultado is not None:
+                st.markdown("---")
+                st.subheader("Resultados")
+
+                cols = st.columns(2 + len(CORRECCIONES))
+                cols[0].metric("Pruebas", f"{len(resultado):,}")
+                cols[1].metric("Rechazos (sin corregir)", f"{int(resultado['rechazar'].sum()):,}")
+                nombres_correccion = {"bonferroni": "Bonferroni", "holm": "Holm", "bh": "BH"}
+                for col, metodo in zip(cols[2:], CORRECCIONES):
+                    col.metric(f"Rechazos ({nombres_correccion[metodo]})",
+                               f"{int(resultado[f'rechazar_{metodo}'].sum()):,}")
+
+                invalidas = int(resultado["p_valor"].isna().sum())
+                if invalidas:
+                    st.warning(f"{invalidas:,} FILAS CON DATOS INVÁLIDOS QUEDARON SIN RESULTADO.")
+
+                st.write("Primeras filas:", resultado.head(100))
+                st.download_button(
+                    "DESCARGAR RESULTADOS (CSV)",
+                    # El CSV completo solo se genera al hacer clic
+                    data=lambda: resultado.to_csv(index=False).encode("utf-8"),
+                    file_name=f"pruebas_{tipo_lote}.csv",
+                    mime="text/csv",
+                    key="descarga_lote"
+                )
+        except ValueError as e:
+            st.error(f"ERROR: {e}")
+        except Exception as e:
+            st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
+
+# --- PESTAÑA 5: Pruebas con datos crudos ---
+with tab5:
+    st.header("Pruebas de Hipótesis con Datos")
+
+    st.markdown("""
+    Sube un archivo y elige una o dos columnas. Cada columna se resume en una sola
+    pasada (n, suma y suma de cuadrados), sin cargarla completa en memoria.
+    - **Una muestra / Pareada:** prueba t (n - 1 gl); la pareada usa las diferencias por fila.
+    - **Dos muestras:** prueba t de Welch, sin suponer varianzas iguales.
+    - **Proporción:** prueba Z sobre una columna de ceros y unos (1 = éxito).
+    - **Permutación:** compara dos columnas sin suponer normalidad. Es exacta con muestras pequeñas o con
+      proporciones (columnas de ceros y unos); si no, usa Monte Carlo y se detiene cuando el error del
+      p-valor es menor que la tolerancia.
+    """)
+
+    archivo_datos = st.file_uploader("Sube tu archivo", type=EXTENSIONES, key="archivo_datos")
+
+    if archivo_datos is not None:
+        try:
+            huella = huella_archivo(archivo_datos)
+            columnas = columnas_archivo(archivo_datos, huella)
+
+            tipo_datos = st.radio(
+                "Prueba:",
+                ["UNA MUESTRA (t)", "DOS MUESTRAS (t de Welch)", "PAREADA (t)", "PROPORCIÓN (Z)",
+                 "PERMUTACIÓN (dos muestras)"],
+                horizontal=True,
+                key="tipo_datos"
+            )
+            permutacion = tipo_datos.startswith("PERMUTACIÓN")
+            dos_columnas = tipo_datos.startswith(("DOS", "PAREADA")) or permutacion
+
+            col1, col2 = st.columns(2)
+            with col1:
+                columna_1 = st.selectbox("Columna:" if not dos_columnas else "Columna 1:", columnas,
+                                         key="columna_datos_1")
+                if dos_columnas:
+                    columna_2 = st.selectbox("Columna 2:", columnas, index=min(1, len(columnas) - 1),
+                                             key="columna_datos_2")
+                if permutacion:
+                    estadistico_permutacion = st.radio("Diferencia de:", ["MEDIAS", "MEDIANAS", "PROPORCIONES"],
+                                                       horizontal=True, key="estadistico_permutacion")
+                elif tipo_datos.startswith("PROPORCIÓN"):
+                    valor_h0 = st.number_input("Proporción Bajo H₀ (p₀):", min_value=0.001, max_value=0.999,
+                                               value=0.5, format="%.3f", key="h0_datos_p")
+                else:
+                    etiqueta_h0 = "Media Bajo H₀ (μ₀):" if tipo_datos.startswith("UNA") else "Diferencia Bajo H₀:"
+                    valor_h0 = st.number_input(etiqueta_h0, value=0.0, format="%.4f", key="h0_datos",
+                                               disabled=tipo_datos.startswith("DOS"))
+            with col2:
+                cola_datos = st.selectbox(
+                    "Tipo de prueba:",
+                    ["Bilateral (≠)", "Cola derecha (>)", "Cola izquierda (<)"],
+                    key="cola_datos"
+                )
+                alpha_datos = st.number_input(
+                    "Nivel de Significancia (α):",
+                    min_value=0.001,
+                    max_value=0.5,
+                    value=0.05,
+                    format="%.3f",
+                    key="alpha_datos"
+                )
+                if permutacion:
+                    maximo_permutaciones = st.number_input(
+                        "Máximo de Permutaciones:",
+                        min_value=1_000,
+                        max_value=10_000_000,
+                        value=PERMUTACIONES_POR_DEFECTO,
+                        step=10_000,
+                        key="maximo_permutaciones"
+                    )
+                    error_permutacion = st.number_input(
+                        "Tolerancia del Error del P-Valor:",
+                        min_value=0.0001,
+                        max_value=0.05,
+                        value=ERROR_PERMUTACION,
+                        format="%.4f",
+                        key="error_permutacion"
+                    )
+
+            def calcular_datos():
+                cola = cola_desde_etiqueta(cola_datos)
+                if tipo_datos.startswith("UNA"):
+                    return prueba_una_muestra(sumas_columna(archivo_datos, columna_1, huella),
+                                              valor_h0, alpha_datos, cola)
+                if tipo_datos.startswith("DOS"):
+                    return prueba_dos_muestras(sumas_columna(archivo_datos, columna_1, huella),
+                                               sumas_columna(archivo_datos, columna_2, huella),
+                                               alpha_datos, cola)
+                if tipo_datos.startswith("PAREADA"):
+                    return prueba_pareada(sumas_diferencias(archivo_datos, columna_1, columna_2, huella),
+                                          valor_h0, alpha_datos, cola)
+                if permutacion:
+                    with medir("lectura"):
+                        muestras = tuple(leer_columna_archivo(archivo_datos, c, huella)
+                                         for c in (columna_1, columna_2))
+                    if estadistico_permutacion == "PROPORCIONES" and not all(np.isin(m, (0, 1)).all() for m in muestras):
+                        raise ValueError("Las columnas deben contener solo ceros y unos (1 = éxito).")
+                    with st.spinner("Permutando..."):
+                        resultado = dict(prueba_permutacion(
+                            muestras,
+                            "mediana" if estadistico_permutacion == "MEDIANAS" else "media",
+                            cola,
+                            int(maximo_permutaciones),
+                            error_permutacion,
+                        ))
+                    resultado["n"] = (muestras[0].size, muestras[1].size)
+                    return resultado
+                return prueba_proporcion_muestra(sumas_columna(archivo_datos, columna_1, huella),
+                                                 valor_h0, alpha_datos, cola)
+
+            pulsado = st.button("CALCULAR PRUEBA CON DATOS", type="secondary", key="btn_datos")
+            entradas = (
+                huella,
+                tipo_datos,
+                columna_1,
+                columna_2 if dos_columnas else None,
+                estadistico_permutacion if permutacion else valor_h0,
+                cola_datos,
+                alpha_datos,
+                (maximo_permutaciones, error_permutacion) if permutacion else None,
+            )
+            resultado = resultado_sesion(st.session_state, "prueba_datos", entradas, calcular_datos, pulsado)
+            if resultado is not None:
+                cola = cola_desde_etiqueta(cola_datos)
+                es_t = "gl" in resultado
+                simbolo = "t" if es_t else "Z"
+                p_valor = resultado["p_valor"]
+
+                st.markdown("---")
+                st.subheader("Resultados")
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    n = resultado["n"]
+                    st.metric(label="Tamaño de Muestra (n)",
+                              value=f"{n[0]:,} / {n[1]:,}" if isinstance(n, tuple) else f"{n:,}")
+                with col2:
+                    if tipo_datos.startswith("PROPORCIÓN"):
+                        st.metric(label="Proporción Muestral (p̂)", value=f"{resultado['proporcion_muestral']:.4f}")
+                    elif tipo_datos.startswith("DOS"):
+                        st.metric(label="Diferencia (x̄₁ - x̄₂)", value=f"{resultado['diferencia']:.4f}")
+                    elif tipo_datos.startswith("PAREADA"):
+                        st.metric(label="Diferencia Media (d̄)", value=f"{resultado['media']:.4f}")
+                    elif permutacion:
+                        st.metric(label=f"Diferencia de {estadistico_permutacion.capitalize()}",
+                                  value=f"{resultado['estadistico']:.4f}")
+                    else:
+                        st.metric(label="Media Muestral (x̄)", value=f"{resultado['media']:.4f}")
+                with col3:
+                    if permutacion:
+                        st.metric(label="Permutaciones", value=f"{resultado['permutaciones']:,}")
+                    else:
+                        st.metric(label=f"Estadístico {simbolo}", value=f"{resultado['estadistico']:.4f}")
+                with col4:
+                    st.metric(label="P-Valor", value=f"{p_valor:.4f}")
+
+                if permutacion and resultado["metodo"] == "Monte Carlo":
+                    st.caption(f"Método: Monte Carlo; p-valor {p_valor:.4f} ± {resultado['error_p']:.4f} "
+                               f"(error de Monte Carlo). Cálculo original: {resultado['permutaciones_por_segundo']:,.0f} "
+                               f"permutaciones por segundo ({resultado['segundos']:.2f} s).")
+                elif permutacion:
+                    st.caption(f"Método: {resultado['metodo']}.")
+                else:
+                    if es_t:
+                        st.caption(f"Grados de libertad: {resultado['gl']:,.2f}")
+                    st.info(f"**Región Crítica:** {region_critica(cola, resultado['critico'], simbolo)}")
+
+                st.subheader("INTERPRETACIÓN Y DECISIÓN")
+                if p_valor < alpha_datos:
+                    st.error(f"""
+                    **Se rechaza H₀**
+
+                    El p-valor ({p_valor:.4f}) es menor que α ({alpha_datos:.3f}).
+                    """)
+                else:
+                    st.success(f"""
+                    **No se rechaza H₀**
+
+                    El p-valor ({p_valor:.4f}) es mayor o igual que α ({alpha_datos:.3f}).
+                    """)
+        except ValueError as e:
+            st.error(f"ERROR: {e}")
+        except Exception as e:
+            st.error(f"ERROR AL PROCESAR EL ARCHIVO: {e}")
+
+# --- PESTAÑA 6: Simulación de potencia ---
+with tab6:
+    st.header("Simulación de Potencia")
+
+    st.markdown("""
+    Genera muchas muestras sintéticas para cada tamaño de muestra y valor verdadero del parámetro, y
+    calcula qué proporción de ellas rechaza H₀ con la misma prueba de las otras pestañas. En H₀ la
+    curva muestra el error tipo I real; con datos asimétricos puede alejarse de α.
+    """)
+
+    escenarios_potencia = {"MEDIA": "media", "PROPORCIÓN": "proporcion", "DOS MEDIAS": "dos_medias"}
+    escenario_potencia = escenarios_potencia[st.radio("Escenario:", list(escenarios_potencia), horizontal=True,
+                                                      key="escenario_potencia")]
+    proporcion_potencia = escenario_potencia == "proporcion"
+
+    col1, col2 = st.columns(2)
+    with col1:
+        tamanos_potencia = st.text_input("Tamaños de Muestra (separados por comas):", value="10, 30, 100",
+                                         key="tamanos_potencia")
+        if proporcion_potencia:
+            h0_potencia = st.number_input("Proporción Bajo H₀ (p₀):", min_value=0.001, max_value=0.999,
+                                          value=0.5, format="%.3f", key="h0_potencia")
+            desde, hasta = st.slider("Proporción Verdadera (p):", min_value=0.0, max_value=1.0,
+                                     value=(0.3, 0.7), step=0.01, key="rango_potencia_p")
+        else:
+            h0_potencia = 0.0
+            if escenario_potencia == "media":
+                h0_potencia = st.number_input("Media Bajo H₀ (μ₀):", value=0.0, format="%.4f", key="h0_potencia_m")
+            desviacion_potencia = st.number_input("Desviación Estándar Poblacional (σ):", min_value=0.0001,
+                                                  value=1.0, format="%.4f", key="desviacion_potencia")
+            etiqueta_efecto = "Media Verdadera (μ):" if escenario_potencia == "media" else "Diferencia (μ₁ - μ₂):"
+            desde, hasta = st.slider(etiqueta_efecto, min_value=h0_potencia - 3 * desviacion_potencia,
+                                     max_value=h0_potencia + 3 * desviacion_potencia,
+                                     value=(h0_potencia - desviacion_potencia, h0_potencia + desviacion_potencia),
+                                     key="rango_potencia")
+            distribucion_potencia = st.selectbox("Distribución de los Datos:",
+                                                 ["NORMAL", "LOGNORMAL", "EXPONENCIAL", "UNIFORME"],
+                                                 key="distribucion_potencia")
+            prueba_potencia = st.radio("Prueba:", ["T", "Z (σ conocida)"], horizontal=True, key="prueba_potencia")
+    with col2:
+        cola_potencia = st.selectbox(
+            "Tipo de prueba:",
+            ["Bilateral (≠)", "Cola derecha (>)", "Cola izquierda (<)"],
+            key="cola_potencia"
+        )
+        alpha_potencia = st.number_input(
+            "Nivel de Significancia (α):",
+            min_value=0.001,
+            max_value=0.5,
+            value=0.05,
+            format="%.3f",
+            key="alpha_potencia"
+        )
+        replicas_potencia = st.number_input(
+            "Réplicas por Punto:",
+            min_value=100,
+            max_value=1_000_000,
+            value=10_000,
+            step=1000,
+            key="replicas_potencia"
+        )
+
+    def calcular_simulacion():
+        tamanos = [int(t) for t in tamanos_potencia.replace(";", ",").split(",") if t.strip()]
+        if not tamanos:
+            raise ValueError("Ingresa al menos un tamaño de muestra.")
+        valores = np.linspace(desde, hasta, 21)
+        with st.spinner("Simulando..."):
+            if proporcion_potencia:
+                return simular_potencia("proporcion", tamanos, valores, h0_potencia,
+                                        alpha=alpha_potencia, cola=cola_desde_etiqueta(cola_potencia),
+                                        replicas=int(replicas_potencia))
+            return simular_potencia(escenario_potencia, tamanos, valores, h0_potencia,
+                                    desviacion_potencia, distribucion_potencia.lower(),
+                                    prueba_potencia[0].lower(), alpha_potencia,
+                                    cola_desde_etiqueta(cola_potencia), int(replicas_potencia))
+
+    pulsado = st.button("SIMULAR POTENCIA", type="secondary", key="btn_potencia")
+    entradas = (escenario_potencia, tamanos_potencia, h0_potencia, desde, hasta, cola_potencia, alpha_potencia,
+                replicas_potencia)
+    if not proporcion_potencia:
+        entradas += (desviacion_potencia, distribucion_potencia, prueba_potencia)
+    try:
+        resultado = resultado_sesion(st.session_state, "simulacion_potencia", entradas, calcular_simulacion, pulsado)
+        if resultado is not None:
+            import pandas as pd
+
+            with medir("dibujo"):
+                st.markdown("---")
+                st.subheader("Curvas de Potencia")
+                curvas = pd.DataFrame(resultado["potencia"].T,
+                                      index=pd.Index(resultado["valores"], name="Valor verdadero"),
+                                      columns=[f"n = {n}" for n in resultado["tamanos"]])
+                st.line_chart(curvas, y_label="Potencia")
+                st.write(curvas)
+                st.caption(f"{resultado['replicas']:,} réplicas por punto; error de Monte Carlo máximo "
+                           f"± {resultado['error'].max():.4f}.")
+    except ValueError as e:
+        st.error(f"ERROR: {e}")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -451,4 +841,6 @@ st.markdown("""
     <small>Tip: El p-valor representa la probabilidad de obtener resultados al menos tan extremos 
     como los observados, asumiendo que H₀ es verdadera.</small>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+mostrar_panel()
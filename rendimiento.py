@@ -0,0 +1,105 @@
+"""
+Panel de rendimiento de la barra lateral, común a la portada y a las páginas.
+
+Cada página llama a iniciar_pagina() al principio, que activa el registro de
+tiempos de la sesión, y a mostrar_panel() al final, que guarda la duración
+del rerun. El panel está oculto: aparece al abrir la aplicación con
+?rendimiento=1 en la URL (se recuerda durante la sesión) o en todas las
+sesiones con ESTADISTICA_PANEL_RENDIMIENTO=1.
+"""
+import json
+import os
+import time
+
+import streamlit as st
+
+from estadistica import (
+    activar_sesion,
+    info_caches,
+    instantanea,
+    memoria_actual,
+    memoria_maxima,
+    registrar,
+    sesion_activa,
+    texto_prometheus,
+    tiempos_precarga,
+)
+
+PANEL_SIEMPRE = os.environ.get("ESTADISTICA_PANEL_RENDIMIENTO", "") == "1"
+
+_INICIO = "_inicio_rerun"
+_PANEL = "_panel_rendimiento"
+
+
+def iniciar_pagina(pagina):
+    """Activa el registro de la sesión para `pagina` y empieza a medir el rerun."""
+    activar_sesion(st.session_state, pagina)
+    st.session_state[_INICIO] = time.perf_counter()
+    if st.query_params.get("rendimiento") == "1":
+        st.session_state[_PANEL] = True
+
+
+def _megabytes(valor):
+    return f"{valor / 1024 ** 2:,.0f} MB" if valor else "N/D"
+
+
+def mostrar_panel():
+    """Guarda la duración del rerun y, si el panel está activado, lo dibuja en la barra lateral."""
+    inicio = st.session_state.pop(_INICIO, None)
+    if inicio is not None:
+        registrar("rerun", time.perf_counter() - inicio)
+    if not (PANEL_SIEMPRE or st.session_state.get(_PANEL)):
+        return
+
+    sesion = sesion_activa()
+    filas = sesion.resumen()
+    with st.sidebar.expander("RENDIMIENTO DE LA SESIÓN", expanded=True):
+        if filas:
+            st.dataframe({
+                "Página": [f["pagina"] for f in filas],
+                "Etapa": [f["etapa"] for f in filas],
+                "Llamadas": [f["llamadas"] for f in filas],
+                "Errores": [f["errores"] for f in filas],
+                "p50 (ms)": [f["p50"] * 1e3 for f in filas],
+                "p90 (ms)": [f["p90"] * 1e3 for f in filas],
+                "p99 (ms)": [f["p99"] * 1e3 for f in filas],
+                "Máximo (ms)": [f["maximo"] * 1e3 for f in filas],
+                "Memoria máx. (MB)": [f["memoria_maxima"] / 1024 ** 2 for f in filas],
+            }, hide_index=True, width="stretch")
+        else:
+            st.caption("Todavía no hay mediciones en esta sesión.")
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Memoria actual", _megabytes(memoria_actual()))
+        c2.metric("Pico de la sesión", _megabytes(sesion.memoria_maxima))
+        c3.metric("Pico del proceso", _megabytes(memoria_maxima()))
+
+        caches = info_caches().values()
+        aciertos = sum(c["aciertos"] for c in caches)
+        consultas = aciertos + sum(c["fallos"] for c in caches)
+        if consultas:
+            st.caption(f"Cachés del proceso: {aciertos:,} aciertos de {consultas:,} consultas "
+                       f"({aciertos / consultas:.0%}).")
+        precarga = tiempos_precarga()
+        if precarga:
+            st.caption("Precarga: " + ", ".join(f"{m} {s * 1e3:.0f} ms" for m, s in precarga.items()))
+
+        st.download_button(
+            "MÉTRICAS DEL PROCESO (PROMETHEUS)",
+            data=texto_prometheus().encode("utf-8"),
+            file_name="metricas.prom",
+            mime="text/plain",
+            on_click="ignore",
+            key="descargar_metricas_prometheus"
+        )
+        st.download_button(
+            "MÉTRICAS DE LA SESIÓN (JSON)",
+            data=json.dumps(instantanea(sesion), ensure_ascii=False, indent=2).encode("utf-8"),
+            file_name="metricas_sesion.json",
+            mime="application/json",
+            on_click="ignore",
+            key="descargar_metricas_json"
+        )
+        if st.button("REINICIAR MEDICIONES", key="btn_reiniciar_metricas"):
+            sesion.limpiar()
+            st.rerun()